@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+from country_index import CountryIndex
+
+# ==============================================================================
+#  1. SHARED, CACHED AFFILIATION PARSER
+# ==============================================================================
+# Precompiled once per process instead of on every parse() call
+US_STATE_PATTERN = re.compile(r'^([A-Z]{2})\s+(?:\d{5})?.*$')
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z]')
+DEFAULT_CACHE_SIZE = 65536
+# Bump when a change to the parsing logic makes saved results stale
+CACHE_VERSION = 1
+
+
+class AffiliationParser:
+    """
+    This class is a direct implementation of the user's affiliation parsing logic.
+    Results are memoized in a bounded LRU cache keyed on the stripped affiliation
+    text, optionally persisted to a JSON file so later runs start warm.
+    """
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, cache_path=None):
+        self.countries = self._get_comprehensive_country_list()
+        self.business_suffixes = {'ltd', 'inc', 'co', 'llc', 'corp', 'gmbh', 'ag', 'bv', 'srl', 'spa', 'pty'}
+        self.country_index = CountryIndex(self.countries)
+        # Saved caches are only reused by a parser of the same class, country list and suffixes
+        config = '\n'.join([type(self).__name__, *self.countries, *sorted(self.business_suffixes)])
+        self.cache_config = hashlib.sha1(config.encode('utf-8')).hexdigest()
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self._cache = OrderedDict()
+        self.hits, self.misses = 0, 0
+        if cache_path and os.path.exists(cache_path):
+            self.load_cache(cache_path)
+        print("✅ AffiliationParser initialized with user-provided logic.")
+
+    def _get_comprehensive_country_list(self):
+        countries = [
+            'Afghanistan', 'Albania', 'Algeria', 'Andorra', 'Angola', 'Antigua and Barbuda', 'Argentina', 'Armenia',
+            'Australia', 'Austria', 'Azerbaijan', 'Bahamas', 'Bahrain', 'Bangladesh', 'Barbados', 'Belarus', 'Belgium',
+            'Belize', 'Benin', 'Bermuda', 'Bhutan', 'Bolivia', 'Bosnia and Herzegovina', 'Botswana', 'Brazil', 'Brunei', 'Brunei Darussalam',
+            'Bulgaria', 'Burkina Faso', 'Burundi', 'Cabo Verde', 'Cambodia', 'Cameroon', 'Canada', 'Central African Republic',
+            'Chad', 'Chile', 'China', 'Colombia', 'Comoros', 'Congo, Democratic Republic of the',
+            'Congo, Republic of the', 'Costa Rica', 'Cote d\'Ivoire', 'Croatia', 'Cuba', 'Cyprus', 'Czech Republic', 'Czechia',
+            'Denmark', 'Djibouti', 'Dominica', 'Dominican Republic', 'Ecuador', 'Egypt', 'El Salvador',
+            'Equatorial Guinea', 'Eritrea', 'Estonia', 'Eswatini', 'Ethiopia', 'Fiji', 'Finland', 'France', 'French Guiana', 'Gabon',
+            'Gambia', 'Georgia', 'Germany', 'Ghana', 'Greece', 'Grenada', 'Guam', 'Guatemala', 'Guinea', 'Guinea-Bissau',
+            'Guyana', 'Haiti', 'Honduras', 'Hong Kong', 'Hungary', 'Iceland', 'India', 'Indonesia', 'Iran', 'Iraq', 'Ireland',
+            'Israel', 'Italy', 'Jamaica', 'Japan', 'Jordan', 'Kazakhstan', 'Kenya', 'Kiribati', 'Kosovo', 'Kuwait',
+            'Kyrgyzstan', 'Laos', 'Latvia', 'Lebanon', 'Lesotho', 'Liberia', 'Libya', 'Liechtenstein', 'Lithuania',
+            'Luxembourg', 'Macao', 'Madagascar', 'Malawi', 'Malaysia', 'Maldives', 'Mali', 'Malta', 'Marshall Islands',
+            'Mauritania', 'Mauritius', 'Mexico', 'Micronesia', 'Moldova', 'Monaco', 'Mongolia', 'Montenegro',
+            'Morocco', 'Mozambique', 'Myanmar', 'Burma', 'Namibia', 'Nauru', 'Nepal', 'Netherlands', 'New Zealand',
+            'Nicaragua', 'Niger', 'Nigeria', 'North Korea', 'North Macedonia', 'Norway', 'Oman', 'Pakistan', 'Palau',
+            'Palestine', 'State of Palestine', 'Panama', 'Papua New Guinea', 'Paraguay', 'Peru', 'Philippines', 'Poland', 'Portugal',
+            'Puerto Rico', 'Qatar', 'Romania', 'Russia', 'Russian Federation', 'Rwanda', 'Saint Kitts and Nevis', 'Saint Lucia',
+            'Saint Vincent and the Grenadines', 'Samoa', 'San Marino', 'Sao Tome and Principe', 'Saudi Arabia',
+            'Senegal', 'Serbia', 'Seychelles', 'Sierra Leone', 'Singapore', 'Slovakia', 'Slovenia', 'Solomon Islands',
+            'Somalia', 'South Africa', 'South Korea', 'South Sudan', 'Spain', 'Sri Lanka', 'Sudan', 'Suriname',
+            'Sweden', 'Switzerland', 'Syria', 'Syrian Arab Republic', 'Taiwan', 'Tajikistan', 'Tanzania', 'Thailand', 'Timor-Leste',
+            'Togo', 'Tonga', 'Trinidad and Tobago', 'Tunisia', 'Turkey', 'Turkiye', 'Turkmenistan', 'Tuvalu', 'Uganda',
+            'Ukraine', 'United Arab Emirates', 'U Arab Emirates', 'UAE', 'United Kingdom', 'UK', 'United States of America', 'United States', 'USA',
+            'Uruguay', 'Uzbekistan', 'Vanuatu', 'Vatican City', 'Venezuela', 'Viet Nam', 'Vietnam', 'Yemen', 'Zambia', 'Zimbabwe',
+            'Peoples R China', 'England', 'Scotland', 'Wales', 'Northern Ireland', 'North Ireland'
+        ]
+        countries.sort(key=len, reverse=True)
+        return countries
+
+    def parse(self, affiliation_text):
+        """Returns the parsed affiliation, served from the LRU cache when possible."""
+        key = affiliation_text.strip()
+        result = self._cache.get(key)
+        if result is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        else:
+            self.misses += 1
+            result = self._parse_uncached(key)
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(result)
+
+    def cache_info(self):
+        """Hit/miss counters and current size of the result cache."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "max_size": self.cache_size}
+
+    def clear_cache(self):
+        self._cache.clear()
+        self.hits, self.misses = 0, 0
+
+    def load_cache(self, cache_path):
+        """
+        Loads results saved by `save_cache`, keeping at most `cache_size` of
+        them. Files written by another CACHE_VERSION or parser configuration
+        (or in the older bare-list format) are ignored. Returns the number of
+        entries loaded.
+        """
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if (self.cache_size <= 0 or not isinstance(data, dict) or data.get("version") != CACHE_VERSION
+                or data.get("config") != self.cache_config):
+            return 0
+        entries = data.get("entries", [])[-self.cache_size:]
+        for key, (institution, city, country) in entries:
+            self._cache[key] = {"institution_name": institution, "city": city, "country": country}
+        return len(entries)
+
+    def save_cache(self, cache_path=None):
+        """Writes the cache, least recently used first, so a reload keeps the hottest entries."""
+        cache_path = cache_path or self.cache_path
+        if not cache_path:
+            raise ValueError("No cache_path given for the affiliation cache.")
+        entries = [[key, [r["institution_name"], r["city"], r["country"]]] for key, r in self._cache.items()]
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "config": self.cache_config, "entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+
+    def _match_country(self, work_string):
+        """Returns (country, start of the ', <country>' suffix) or None."""
+        return self.country_index.match(work_string)
+
+    def _parse_uncached(self, affiliation_text):
+        country, city, institution = '', '', ''
+        work_string = affiliation_text.strip()
+        
+        # First, check for country at the end (aliases are normalized by the index)
+        country_match = self._match_country(work_string)
+        if country_match:
+            country, country_start = country_match
+            work_string = work_string[:country_start].strip()
+        
+        parts = [part.strip() for part in work_string.split(',') if part.strip()]
+        
+        # Handle US state code with zip (e.g., "GA 30332", "TX 78712")
+        if len(parts) > 0:
+            last_part = parts[-1]
+            # Check if last part matches pattern: STATE_CODE ZIP (e.g., "GA 30332", "TX USA")
+            us_pattern = US_STATE_PATTERN.match(last_part)
+            if us_pattern and not country:
+                # This is a US state code, extract it as city and set country to USA
+                city = us_pattern.group(1)  # Use state code as city identifier
+                country = 'United States'
+                parts.pop(-1)
+                institution = ', '.join(parts) if parts else 'Unknown'
+            else:
+                # Normal processing
+                if len(parts) > 1:
+                    potential_city = parts[-1]
+                    cleaned_suffix_check = NON_ALPHA_PATTERN.sub('', potential_city).lower()
+                    if cleaned_suffix_check in self.business_suffixes:
+                        institution = ', '.join(parts)
+                        city = ''
+                    else:
+                        city = parts.pop(-1)
+                        institution = ', '.join(parts)
+                elif len(parts) == 1:
+                    institution = parts[0]
+                else:
+                    institution = work_string
+        
+        return {"institution_name": institution or "Unknown", "city": city or "Unknown", "country": country or "Unknown"}
+
+
+_shared_parser = None
+
+
+def get_affiliation_parser(cache_path=None):
+    """
+    Returns the process-wide AffiliationParser, creating it on first use, so every
+    source parser shares one CountryIndex (the country suffix lookup) and one
+    result cache. `cache_path` names the file that cache is loaded from, and
+    that `save_cache()` writes to.
+    """
+    global _shared_parser
+    if _shared_parser is None:
+        _shared_parser = AffiliationParser(cache_path=cache_path)
+    elif cache_path and not _shared_parser.cache_path:
+        _shared_parser.cache_path = cache_path
+        if os.path.exists(cache_path):
+            _shared_parser.load_cache(cache_path)
+    return _shared_parser
@@ -0,0 +1,332 @@
+import gzip
+import json
+import os
+import sys
+
+from parser_core import UNIFIED_COLUMNS, stable_id, to_unified_row
+from record_dedup import normalize_text
+
+STATE_FILENAME = '.author_clusters.json.gz'
+# A mention joins the best-scoring compatible cluster once its evidence reaches this
+DEFAULT_THRESHOLD = 1.0
+# Evidence weights; shared coauthors and affiliations are counted up to the cap.
+# Venue and full-name agreement only add to a shared coauthor or affiliation.
+COAUTHOR_WEIGHT = 1.0
+AFFILIATION_WEIGHT = 1.0
+VENUE_WEIGHT = 0.5
+FULL_NAME_WEIGHT = 0.5
+MAX_SHARED = 2
+ID_FIELDS = ['scopus_author_id', 'wos_researcher_id', 'orcid']
+
+# ==============================================================================
+#  1. NAME KEYS
+# ==============================================================================
+def name_parts(first_name, last_name):
+    """('Zhi-Hong', 'Chen') -> ('chen', ['zhi', 'hong'])."""
+    return normalize_text(last_name), normalize_text(first_name).split()
+
+
+def block_key(first_name, last_name):
+    """Blocking key: normalized last name and first initial, e.g. 'chen z'."""
+    last, given = name_parts(first_name, last_name)
+    return f"{last} {given[0][0]}" if given else last
+
+
+def names_compatible(given_a, given_b):
+    """
+    Whether two given-name token lists can belong to one person: tokens agree
+    pairwise, where an initial matches any name starting with it ('j' ~
+    'john'), and a missing middle name is no conflict. 'zhi hong' and
+    'zhihong' are the same name written differently.
+    """
+    if not given_a or not given_b or ''.join(given_a) == ''.join(given_b):
+        return True
+    for a, b in zip(given_a, given_b):
+        if a == b or (len(a) == 1 and b.startswith(a)) or (len(b) == 1 and a.startswith(b)):
+            continue
+        return False
+    return True
+
+
+def _features(affiliations, coauthors, venues):
+    """
+    Evidence values a cluster is indexed under. Affiliation and venue IDs are
+    UUIDs and coauthors are name keys, so the raw values cannot collide.
+    """
+    features = [*affiliations, *coauthors]
+    features.extend(venues)
+    return features
+
+
+def _is_full_name(given):
+    return any(len(token) > 1 for token in given)
+
+
+# ==============================================================================
+#  2. CLUSTERS
+# ==============================================================================
+class AuthorCluster:
+    """
+    One disambiguated author: a stable ID plus the evidence gathered from its
+    mentions, and the records they are on (one person is on a record once).
+    """
+    __slots__ = ('author_id', 'first_name', 'last_name', 'given', 'affiliations', 'coauthors', 'venues', 'ids', 'records')
+
+    def __init__(self, author_id, first_name, last_name, ids=None, given=None):
+        self.author_id = author_id
+        self.first_name, self.last_name = first_name or '', last_name or ''
+        self.given = name_parts(first_name, last_name)[1] if given is None else given
+        self.affiliations, self.coauthors, self.venues = set(), set(), set()
+        self.ids = dict(ids or {})
+        self.records = set()
+
+    def add(self, mention):
+        # The most complete spelling seen names the cluster
+        if len(mention.first_name) > len(self.first_name):
+            self.first_name, self.given = mention.first_name, mention.given
+        self.affiliations.update(mention.affiliations)
+        self.coauthors.update(mention.coauthors)
+        self.records.add(mention.record_id)
+        if mention.venue:
+            self.venues.add(mention.venue)
+
+    def to_row(self):
+        return {"author_id": self.author_id, "first_name": self.first_name, "last_name": self.last_name,
+                **{field: self.ids.get(field) for field in ID_FIELDS}}
+
+    def to_json(self):
+        return [self.author_id, self.first_name, self.last_name, sorted(self.affiliations), sorted(self.coauthors),
+                sorted(self.venues), self.ids, sorted(self.records)]
+
+    @classmethod
+    def from_json(cls, values):
+        author_id, first_name, last_name, affiliations, coauthors, venues, ids = values[:7]
+        cluster = cls(author_id, first_name, last_name, ids)
+        cluster.affiliations, cluster.coauthors, cluster.venues = set(affiliations), set(coauthors), set(venues)
+        # State saved before records were tracked has no eighth element
+        cluster.records = set(values[7]) if len(values) > 7 else set()
+        return cluster
+
+
+class _Mention:
+    """One author position on one record."""
+    __slots__ = ('key', 'record_id', 'author_id', 'first_name', 'last_name', 'given', 'block', 'affiliations', 'coauthors',
+                 'venue', 'features')
+
+    def __init__(self, record_id, name, affiliations, coauthors, venue):
+        self.record_id, self.author_id = record_id, name.author_id
+        self.first_name, self.last_name, self.given, self.block = name.first_name, name.last_name, name.given, name.block
+        self.key = f"{record_id}|{self.author_id}"
+        self.affiliations, self.coauthors, self.venue = affiliations, coauthors, venue
+        self.features = _features(affiliations, coauthors, [venue] if venue else [])
+
+
+class _AuthorName:
+    """Name keys of one parsed author, computed once however many records it is on."""
+    __slots__ = ('author_id', 'first_name', 'last_name', 'given', 'block')
+
+    def __init__(self, author):
+        self.author_id = author['author_id']
+        self.first_name, self.last_name = author.get('first_name') or '', author.get('last_name') or ''
+        last, self.given = name_parts(self.first_name, self.last_name)
+        self.block = f"{last} {self.given[0][0]}" if self.given else last
+
+
+# ==============================================================================
+#  3. DISAMBIGUATION
+# ==============================================================================
+class AuthorDisambiguator:
+    """
+    Splits and merges the authors that carry no ResearcherID, ORCID or Scopus
+    author ID, which the parsers can only key on the name string.
+
+    Every (record, author) pair is a mention. Mentions are blocked on last
+    name + first initial, so only mentions within a block are compared, and
+    within a block a mention is only scored against clusters it shares an
+    affiliation, coauthor or venue with (per-block inverted indexes). Work
+    is therefore close to linear in the number of mentions.
+
+    A mention joins the best-scoring cluster with a compatible given name
+    when the shared evidence reaches `threshold` and includes a coauthor or
+    an affiliation (a common full name in a common venue is not enough);
+    otherwise it starts a new cluster. A cluster that already has a mention
+    on the same record is never a candidate, so coauthors with similar names
+    stay apart. Authors with an ID are clusters from the start and keep
+    their ID, so unidentified spellings of them can join them.
+
+    Clusters and mention assignments persist in `state_path` (gzipped
+    JSON), so later batches are matched against earlier ones and an author
+    keeps its `author_id` across runs.
+    """
+    def __init__(self, state_path=None, threshold=DEFAULT_THRESHOLD):
+        self.state_path = state_path
+        self.threshold = threshold
+        self.clusters = {}
+        self.assignments = {}
+        # Block key -> evidence value -> IDs of the clusters that have it
+        self._index = {}
+        if state_path and os.path.exists(state_path):
+            self.load()
+
+    # --- persistence ---
+    def load(self):
+        with gzip.open(self.state_path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        for values in data.get("clusters", []):
+            self._register(AuthorCluster.from_json(values))
+        self.assignments.update(data.get("assignments", {}))
+
+    def save(self, path=None):
+        path = path or self.state_path
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({"clusters": [cluster.to_json() for cluster in self.clusters.values()],
+                       "assignments": self.assignments}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    # --- cluster bookkeeping ---
+    def _register(self, cluster, block=None):
+        self.clusters[cluster.author_id] = cluster
+        block = block_key(cluster.first_name, cluster.last_name) if block is None else block
+        index = self._index.setdefault(block, {})
+        for feature in _features(cluster.affiliations, cluster.coauthors, cluster.venues):
+            index.setdefault(feature, set()).add(cluster.author_id)
+
+    def _assign(self, mention, cluster):
+        index = self._index.setdefault(mention.block, {})
+        for feature in mention.features:
+            index.setdefault(feature, set()).add(cluster.author_id)
+        cluster.add(mention)
+        self.assignments[mention.key] = cluster.author_id
+
+    def _score(self, mention, cluster):
+        # Two authors of one record are never the same person
+        if mention.record_id in cluster.records or not names_compatible(mention.given, cluster.given):
+            return None
+        score = (COAUTHOR_WEIGHT * min(len(mention.coauthors & cluster.coauthors), MAX_SHARED)
+                 + AFFILIATION_WEIGHT * min(len(mention.affiliations & cluster.affiliations), MAX_SHARED))
+        if not score:
+            return None
+        if mention.venue in cluster.venues:
+            score += VENUE_WEIGHT
+        if _is_full_name(mention.given) and mention.given == cluster.given:
+            score += FULL_NAME_WEIGHT
+        return score
+
+    def _candidates(self, mention):
+        index = self._index.get(mention.block, {})
+        candidates = set()
+        for feature in mention.features:
+            candidates.update(index.get(feature, ()))
+        return candidates
+
+    def resolve(self, mention):
+        """Canonical author_id of `mention`, creating its cluster if nothing matches."""
+        author_id = self.assignments.get(mention.key)
+        if author_id is not None and author_id in self.clusters:
+            self._assign(mention, self.clusters[author_id])
+            return author_id
+        best, best_score = None, self.threshold
+        for candidate_id in sorted(self._candidates(mention)):
+            cluster = self.clusters[candidate_id]
+            score = self._score(mention, cluster)
+            if score is not None and score >= best_score and (best is None or score > best_score):
+                best, best_score = cluster, score
+        if best is None:
+            best = AuthorCluster(stable_id("authors", f"cluster:{mention.key}"), mention.first_name, mention.last_name,
+                                 given=mention.given)
+            self._register(best, mention.block)
+        self._assign(mention, best)
+        return best.author_id
+
+    # --- whole datasets ---
+    @staticmethod
+    def _mentions(data, names):
+        venues = {record['record_id']: record.get('venue_id') for record in data.get('records', [])}
+        # record_id -> {author_id: affiliation IDs}, in link order
+        record_authors = {}
+        for link in data.get('record_authors', []):
+            if link['author_id'] not in names:
+                continue
+            affiliations = record_authors.setdefault(link['record_id'], {}).setdefault(link['author_id'], set())
+            if link.get('affiliation_id'):
+                affiliations.add(link['affiliation_id'])
+
+        for record_id, linked in record_authors.items():
+            venue = venues.get(record_id)
+            for author_id, affiliations in linked.items():
+                coauthors = {names[other_id].block for other_id in linked if other_id != author_id}
+                yield _Mention(record_id, names[author_id], affiliations, coauthors, venue)
+
+    def disambiguate(self, data):
+        """
+        Returns a copy of `data` whose record_authors point at canonical author
+        IDs, with an authors table of one row per cluster this batch touched.
+        """
+        authors = {author['author_id']: author for author in data.get('authors', [])}
+        names = {author_id: _AuthorName(author) for author_id, author in authors.items()}
+        mentions = list(self._mentions(data, names))
+        # (record_id, parsed author_id) -> canonical author_id
+        mapping = {}
+        # Identified authors are clusters of their own, registered before any name is matched
+        for mention in mentions:
+            author = authors[mention.author_id]
+            ids = {field: author[field] for field in ID_FIELDS if author.get(field)}
+            if not ids:
+                continue
+            cluster = self.clusters.get(mention.author_id)
+            if cluster is None:
+                cluster = AuthorCluster(mention.author_id, mention.first_name, mention.last_name, ids, mention.given)
+                self._register(cluster, mention.block)
+            self._assign(mention, cluster)
+            mapping[mention.record_id, mention.author_id] = mention.author_id
+        for mention in mentions:
+            if (mention.record_id, mention.author_id) not in mapping:
+                mapping[mention.record_id, mention.author_id] = self.resolve(mention)
+
+        touched = set(mapping.values())
+        result = {table_name: [to_unified_row(table_name, row) for row in rows] if table_name in UNIFIED_COLUMNS else rows
+                  for table_name, rows in data.items() if table_name not in ('authors', 'record_authors')}
+        result['authors'] = [cluster.to_row() for author_id, cluster in self.clusters.items() if author_id in touched]
+        seen, links = set(), []
+        for link in data.get('record_authors', []):
+            link = to_unified_row('record_authors', link)
+            link['author_id'] = mapping.get((link['record_id'], link['author_id']), link['author_id'])
+            key = tuple(link.values())
+            if key not in seen:
+                seen.add(key)
+                links.append(link)
+        result['record_authors'] = links
+        return result
+
+
+def disambiguate_authors(data, state_path=None, **options):
+    """Clusters the ID-less authors of `data`; `options` go to AuthorDisambiguator."""
+    disambiguator = AuthorDisambiguator(state_path, **options)
+    before = len(data.get('authors', []))
+    result = disambiguator.disambiguate(data)
+    if state_path:
+        disambiguator.save()
+    print(f"✅ Author disambiguation: {before} parsed authors -> {len(result['authors'])} canonical authors.")
+    return result
+
+
+# ==============================================================================
+#  4. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    from exporters import export_data_to_csv
+    from parser_core import MultiSourceParser
+
+    if len(sys.argv) < 3:
+        print("Usage: python author_disambiguation.py OUTPUT_DIR EXPORT [EXPORT ...]")
+        sys.exit(1)
+    output_dir = sys.argv[1]
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        data = disambiguate_authors(MultiSourceParser().parse_files(sys.argv[2:]), os.path.join(output_dir, STATE_FILENAME))
+        export_data_to_csv(data, output_dir)
+    except FileNotFoundError as e:
+        print(f"ERROR: The file was not found: {e.filename}")
+    except ValueError as e:
+        print(f"ERROR: A validation error occurred: {e}")
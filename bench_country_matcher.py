@@ -0,0 +1,89 @@
+import csv
+import re
+import sys
+import time
+
+from affiliation_parser import AffiliationParser
+
+# ==============================================================================
+#  1. LEGACY REGEX MATCHER (REFERENCE IMPLEMENTATION)
+# ==============================================================================
+class RegexAffiliationParser(AffiliationParser):
+    """The affiliation parser as it was before CountryIndex: one big anchored alternation."""
+    def __init__(self):
+        super().__init__(cache_size=0)
+        country_pattern_string = r',\s*(' + '|'.join(re.escape(c) for c in self.countries) + r')\b *$'
+        self.country_regex = re.compile(country_pattern_string, re.IGNORECASE)
+
+    def _match_country(self, work_string):
+        country_match = self.country_regex.search(work_string)
+        if not country_match:
+            return None
+        country = country_match.group(1).strip()
+        if country.lower() == 'turkiye':
+            country = 'Turkey'
+        elif country.lower() == 'north ireland':
+            country = 'Northern Ireland'
+        elif country.lower() in ['u arab emirates', 'uae']:
+            country = 'United Arab Emirates'
+        return country, country_match.start()
+
+
+# ==============================================================================
+#  2. AFFILIATION STRINGS FROM THE BUNDLED EXPORTS
+# ==============================================================================
+def collect_affiliations(scopus_path='scopus.csv', wos_path='wos.csv'):
+    affiliations = []
+    with open(scopus_path, mode='r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            affiliations.extend(a.strip() for a in row.get('Affiliations', '').split(';') if a.strip())
+            for entry in row.get('Authors with affiliations', '').split(';'):
+                parts = [p.strip() for p in entry.split(',')]
+                if len(parts) >= 3:
+                    affiliations.append(', '.join(parts[2:]))
+    with open(wos_path, mode='r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            for _, affil_text in re.findall(r'\[(.*?)\]\s*(.*?)(?=\s*\[|$)', row.get('Addresses', '')):
+                affiliations.append(affil_text.strip().rstrip(';').strip())
+            affiliations.extend(a.strip() for a in row.get('Affiliations', '').split(';') if a.strip())
+    # Edge cases the bundled files do not cover
+    affiliations += [
+        'Univ Kinshasa, Kinshasa, Congo, Democratic Republic of the',
+        'Dept Civil Engn, Istanbul Tech Univ, Istanbul, Turkiye',
+        "Queen's Univ Belfast, Belfast, North Ireland",
+        'Khalifa Univ, Abu Dhabi, U Arab Emirates',
+        'Georgia Inst Technol, Atlanta, GA 30332',
+        'Acme Ltd, Atlantis',
+        'Nowhere Institute',
+    ]
+    return affiliations
+
+
+def _time(fn, strings, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for s in strings:
+            fn(s)
+    return time.perf_counter() - start
+
+
+# ==============================================================================
+#  3. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    strings = collect_affiliations()
+    legacy, current = RegexAffiliationParser(), AffiliationParser(cache_size=0)
+
+    mismatches = [s for s in strings if legacy._parse_uncached(s) != current._parse_uncached(s)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} affiliation(s) parse differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+    print(f"✅ Output check passed on {len(strings)} affiliation strings.")
+
+    regex_secs = _time(lambda s: legacy._match_country(s.strip()), strings, repeat)
+    index_secs = _time(lambda s: current._match_country(s.strip()), strings, repeat)
+    calls = len(strings) * repeat
+    print(f"  -> regex alternation: {regex_secs:.3f}s ({calls / regex_secs:,.0f} lookups/s)")
+    print(f"  -> country index:     {index_secs:.3f}s ({calls / index_secs:,.0f} lookups/s)")
+    print(f"  -> speedup: {regex_secs / index_secs:.1f}x")
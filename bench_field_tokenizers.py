@@ -0,0 +1,113 @@
+import csv
+import re
+import sys
+import time
+
+from field_tokenizers import id_suffix, iter_address_blocks, iter_scopus_affiliations, parse_scopus_author
+
+# ==============================================================================
+#  1. LEGACY REGEX / SPLIT TOKENIZERS (REFERENCE IMPLEMENTATIONS)
+# ==============================================================================
+def legacy_address_blocks(addresses):
+    return [(author_list, affil_text.strip().rstrip(';').strip())
+            for author_list, affil_text in re.findall(r'\[(.*?)\]\s*(.*?)(?=\s*\[|$)', addresses)]
+
+
+def legacy_id_suffix(entry):
+    match = re.search(r'/(.*)$', entry)
+    return match.group(1) if match else None
+
+
+def legacy_scopus_author(entry):
+    match = re.search(r'([^,]+),\s(.*?)\s\((\d+)\)', entry.strip())
+    if match:
+        last_name, first_name, author_id = match.groups()
+        return last_name.strip(), first_name.strip(), author_id.strip()
+    return None
+
+
+def legacy_scopus_affiliations(authors_with_affiliations):
+    pairs = []
+    for entry in authors_with_affiliations.split(';'):
+        parts = [p.strip() for p in entry.strip().split(',')]
+        if len(parts) >= 3:
+            pairs.append((f"{parts[0]}, {parts[1]}".strip(), ', '.join(parts[2:]).strip()))
+    return pairs
+
+
+# ==============================================================================
+#  2. FIELD VALUES FROM THE BUNDLED EXPORTS
+# ==============================================================================
+def collect_fields(scopus_path='scopus.csv', wos_path='wos.csv'):
+    """{field kind: [values]} from the bundled exports, plus edge cases they do not cover."""
+    fields = {"addresses": [], "ids": [], "scopus_authors": [], "scopus_affiliations": []}
+    with open(scopus_path, mode='r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            fields["scopus_authors"].extend(row.get('Author full names', '').split(';'))
+            fields["scopus_affiliations"].append(row.get('Authors with affiliations', ''))
+    with open(wos_path, mode='r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            fields["addresses"].append(row.get('Addresses', ''))
+            for column in ('Researcher Ids', 'ORCIDs'):
+                fields["ids"].extend(entry.strip() for entry in row.get(column, '').split(';'))
+    fields["addresses"] += [
+        '', 'Univ X, Paris, France', '[Doe, J.] ', '[Doe, J.; Roe, R.] Univ X;  [Roe, R.]Univ Y, Lyon, France; ',
+        '[Doe, J.] Univ [X] Lab, Rome, Italy', '[Doe, J. [Roe, R.] Univ X', '[Doe, J.] Univ X [unclosed',
+        '[Doe, J.] Univ X [Roe, R.] Univ Y;;', '[Doe, J.] Univ X\n[Roe, R.] Univ Y\n', '[] ; [Doe, J.]',
+    ]
+    fields["ids"] += ['', 'Doe, J.', 'Doe, J./', 'Doe, J./A-1234-2010/x', '/0000-0002-1825-0097', 'Doe,\nJ./A-1']
+    fields["scopus_authors"] += [
+        '', 'Doe, John', 'Doe, John (ABC)', 'Doe,John (123)', ',Doe, John (123)', 'Doe, (123)', 'Doe,  (123)',
+        'Doe, John (Jack) (123)', 'Doe, John(123) (456)', 'Doe, John (12a) x (34)', 'Doe, J. Jr., III (99)',
+        'Doe,\tJohn\t(7)', 'Doe, John (١٢)', 'Doe, John\n(123)', 'Doe, Jo\nhn (123)', 'Doe, John (123',
+    ]
+    fields["scopus_affiliations"] += [
+        '', 'Doe, J.', 'Doe, J., Univ X', 'Doe, J., Univ X,Paris, France', 'Doe, J., Univ X , Paris',
+        'Doe, J., Univ X,  Paris', 'Doe, J., Univ X, , Paris', 'Doe, J., Univ X,\tParis', 'Doe, J., Univ X, ',
+        'Doe, J., , Paris', ' Doe , J. ,Univ X; Roe, R., Univ Y, Lyon;Doe, J., Univ Z', 'Doe, J.,  Univ X',
+    ]
+    return fields
+
+
+def _checks(fields):
+    """(name, values, current tokenizer, legacy tokenizer) for every field kind."""
+    return [
+        ("WoS Addresses", fields["addresses"], lambda s: list(iter_address_blocks(s)), legacy_address_blocks),
+        ("WoS ID suffixes", fields["ids"], id_suffix, legacy_id_suffix),
+        ("Scopus authors", fields["scopus_authors"], parse_scopus_author, legacy_scopus_author),
+        ("Scopus affiliations", fields["scopus_affiliations"], lambda s: list(iter_scopus_affiliations(s)),
+         legacy_scopus_affiliations),
+    ]
+
+
+def _time(fn, values, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for s in values:
+            fn(s)
+    return time.perf_counter() - start
+
+
+# ==============================================================================
+#  3. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    checks = _checks(collect_fields())
+
+    failed = False
+    for name, values, current, legacy in checks:
+        mismatches = [s for s in values if current(s) != legacy(s)]
+        if mismatches:
+            print(f"❌ {name}: {len(mismatches)} value(s) tokenize differently, e.g. {mismatches[0]!r}")
+            failed = True
+        else:
+            print(f"✅ {name}: output check passed on {len(values)} values.")
+    if failed:
+        sys.exit(1)
+
+    for name, values, current, legacy in checks:
+        legacy_secs = _time(legacy, values, repeat)
+        current_secs = _time(current, values, repeat)
+        print(f"  -> {name:<20} legacy {legacy_secs:.3f}s   tokenizer {current_secs:.3f}s   "
+              f"speedup {legacy_secs / current_secs:.1f}x")
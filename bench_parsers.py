@@ -0,0 +1,163 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+
+from synthetic_corpus import CORPORA, write_corpus
+
+DEFAULT_SCALES = [10_000, 100_000]
+DEFAULT_DATA_DIR = 'bench_data'
+# Kept next to the generated corpora, which are not checked in
+DEFAULT_RESULTS_PATH = os.path.join(DEFAULT_DATA_DIR, 'bench_results.jsonl')
+
+# ==============================================================================
+#  1. STAGE TIMING
+# ==============================================================================
+class _TimedCall:
+    """Wraps a callable and accumulates the wall time spent inside it."""
+    def __init__(self, fn):
+        self.fn = fn
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def run_case(fmt, corpus_path):
+    """
+    Parses and exports one corpus with a cold affiliation cache, timing
+    parse_file, the AffiliationParser.parse calls made during it, and
+    export_data_to_csv. Meant to run in a fresh process so peak RSS is its own.
+    """
+    from affiliation_parser import AffiliationParser
+    from exporters import export_data_to_csv
+    from parser_core import FORMATS, available_formats
+
+    available_formats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        affiliation_parser = AffiliationParser()
+        timed_parse = affiliation_parser.parse = _TimedCall(affiliation_parser.parse)
+        parser = FORMATS[fmt](affiliation_parser)
+        start = time.perf_counter()
+        data = parser.parse_file(corpus_path)
+        parse_seconds = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            export_data_to_csv(data, output_dir)
+            export_seconds = time.perf_counter() - start
+
+    rows = len(data['records'])
+    return {
+        "rows": rows,
+        "rows_per_sec": rows / parse_seconds if parse_seconds else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "stages": {
+            "parse_file": round(parse_seconds, 4),
+            "affiliation_parse": round(timed_parse.seconds, 4),
+            "export_data_to_csv": round(export_seconds, 4),
+        },
+        "affiliation_calls": timed_parse.calls,
+        "affiliation_cache": affiliation_parser.cache_info(),
+        "table_sizes": {table_name: len(table) for table_name, table in data.items()},
+    }
+
+
+# ==============================================================================
+#  2. RESULT HISTORY
+# ==============================================================================
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(results_path):
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history, fmt, rows):
+    return next((entry for entry in reversed(history) if entry["format"] == fmt and entry["rows"] == rows), None)
+
+
+def append_result(results_path, entry):
+    os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+# ==============================================================================
+#  3. BENCHMARK DRIVER
+# ==============================================================================
+def corpus_path(data_dir, fmt, rows, seed):
+    """Generates the synthetic corpus once and reuses it on later runs."""
+    path = os.path.join(data_dir, f"synthetic_{fmt}_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"  -> Generating {rows:,} synthetic {fmt} rows into '{path}'...")
+        write_corpus(fmt, rows, path + '.tmp', seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def run_benchmarks(formats, scales, results_path=DEFAULT_RESULTS_PATH, data_dir=DEFAULT_DATA_DIR, seed=0):
+    history = load_history(results_path)
+    revision = _git_revision()
+    # A spawned process per case keeps peak RSS and the affiliation cache independent
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for fmt in formats:
+        for rows in scales:
+            path = corpus_path(data_dir, fmt, rows, seed)
+            with context.Pool(1) as pool:
+                result = pool.apply(run_case, (fmt, path))
+            entry = {"timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'), "revision": revision,
+                     "python": platform.python_version(), "format": fmt, "seed": seed, **result}
+            previous = previous_result(history, fmt, result["rows"])
+            stages = ', '.join(f"{stage} {secs:.2f}s" for stage, secs in result["stages"].items())
+            print(f"  -> {fmt} {rows:>10,} rows: {result['rows_per_sec']:,.0f} rows/s, "
+                  f"peak RSS {result['peak_rss_mb']:,.0f} MB ({stages})")
+            if previous and previous.get("rows_per_sec"):
+                change = result["rows_per_sec"] / previous["rows_per_sec"] - 1
+                print(f"     vs {previous.get('revision') or previous['timestamp']}: {change:+.1%} rows/s")
+            append_result(results_path, entry)
+            results.append(entry)
+    print(f"\n✅ Benchmark results appended to '{results_path}'.")
+    return results
+
+
+# ==============================================================================
+#  4. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Throughput benchmark for the Scopus and WoS parsers.")
+    arg_parser.add_argument('--formats', nargs='+', choices=list(CORPORA), default=list(CORPORA))
+    arg_parser.add_argument('--rows', nargs='+', type=int, default=DEFAULT_SCALES, help="corpus sizes, e.g. 10000 1000000")
+    arg_parser.add_argument('--results', default=DEFAULT_RESULTS_PATH, help="JSON-lines file the results are appended to")
+    arg_parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="where generated corpora are cached")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    run_benchmarks(args.formats, args.rows, args.results, args.data_dir, args.seed)
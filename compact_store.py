@@ -0,0 +1,175 @@
+from array import array
+
+from parser_core import ENTITY_ID_FIELDS, TABLE_NAMES
+from sinks import TableSink
+
+# Every ID column, whichever table it appears in, is coded against one interner
+ID_COLUMNS = {"record_id"} | set(ENTITY_ID_FIELDS.values())
+# Text up to this length is shared between rows (names, cities, keywords, types)
+STRING_INTERN_MAX = 80
+_MISSING = -1
+
+# ==============================================================================
+#  1. INTERNING
+# ==============================================================================
+class IdInterner:
+    """
+    Maps ID strings to dense integers 0, 1, 2, ... in first-seen order. Each
+    ID string is stored once here; tables hold its 4-byte code.
+    """
+    __slots__ = ('codes', 'values')
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def intern(self, value):
+        if value is None:
+            return _MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, code):
+        return None if code == _MISSING else self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class StringPool:
+    """Shares one str object between equal short values (a lighter, GC-friendly sys.intern)."""
+    __slots__ = ('strings',)
+
+    def __init__(self):
+        self.strings = {}
+
+    def intern(self, value):
+        if value.__class__ is not str or len(value) > STRING_INTERN_MAX:
+            return value
+        return self.strings.setdefault(value, value)
+
+
+# ==============================================================================
+#  2. COMPACT TABLES
+# ==============================================================================
+class CompactTable:
+    """
+    Column-oriented replacement for a list of row dicts. ID columns are
+    `array('i')` codes into the store's interners; other columns are lists
+    of (pooled) values. The column layout is fixed by the first row.
+
+    Behaves like the list it replaces (len, truth value, indexing and
+    iteration yield row dicts), so existing consumers keep working;
+    exporters use `iter_tuples` / `column` to skip building the dicts.
+    """
+    __slots__ = ('name', 'columns', '_data', '_interners', '_strings')
+
+    def __init__(self, name, interners, strings):
+        self.name = name
+        self.columns = None
+        self._data = {}
+        self._interners = interners
+        self._strings = strings
+
+    def _set_columns(self, columns):
+        self.columns = list(columns)
+        for column in self.columns:
+            self._data[column] = array('i') if column in ID_COLUMNS else []
+
+    def append(self, row):
+        if self.columns is None:
+            self._set_columns(row.keys())
+        get = row.get
+        for column in self.columns:
+            value = get(column)
+            if column in ID_COLUMNS:
+                self._data[column].append(self._interners[column].intern(value))
+            else:
+                self._data[column].append(value if value is None else self._strings.intern(value))
+
+    def __len__(self):
+        return len(self._data[self.columns[0]]) if self.columns else 0
+
+    def column(self, name, start=0, stop=None):
+        """Values of one column (IDs as strings) for rows [start, stop)."""
+        values = self._data[name][start:stop]
+        if name in ID_COLUMNS:
+            lookup = self._interners[name].lookup
+            return [lookup(code) for code in values]
+        return values
+
+    def codes(self, name):
+        """Dense integer codes of an ID column (-1 for None), without copying."""
+        return self._data[name]
+
+    def iter_tuples(self):
+        if not self.columns:
+            return iter(())
+        return zip(*(self.column(name) for name in self.columns))
+
+    def __iter__(self):
+        columns = self.columns or []
+        return (dict(zip(columns, values)) for values in self.iter_tuples())
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        index %= len(self)
+        return {name: self.column(name, index, index + 1)[0] for name in self.columns}
+
+    def __repr__(self):
+        return f"<CompactTable {self.name}: {len(self)} rows x {len(self.columns or [])} columns>"
+
+
+class CompactStore:
+    """The tables of one parse, sharing their ID interners and string pool."""
+    def __init__(self):
+        self.interners = {column: IdInterner() for column in ID_COLUMNS}
+        self.strings = StringPool()
+        self.tables = {}
+
+    def table(self, table_name):
+        table = self.tables.get(table_name)
+        if table is None:
+            table = self.tables[table_name] = CompactTable(table_name, self.interners, self.strings)
+        return table
+
+
+# ==============================================================================
+#  3. COLLECTING PARSED ROWS
+# ==============================================================================
+class CompactSink(TableSink):
+    """
+    Like MemorySink, but collects rows into CompactTables. `data` has the
+    dict-of-tables shape `parse_file` returns and can go straight to the
+    exporters.
+    """
+    def __init__(self, store=None):
+        self.store = store or CompactStore()
+        self.data = self.store.tables
+        self._tables = {}
+
+    def write(self, table_name, row):
+        table = self._tables.get(table_name)
+        if table is None:
+            table = self._tables[table_name] = self.store.table(table_name)
+        table.append(row)
+
+
+def parse_file_compact(parser, filepath):
+    """
+    Memory-lean counterpart of `parser.parse_file(filepath)`: the same tables,
+    held as CompactTables. Entity tables hold the entities in the order they
+    were first seen, as in `parse_file`.
+    """
+    print(f"🚀 Starting compact parsing for: {filepath}")
+    sink = CompactSink()
+    for table_name in TABLE_NAMES:
+        sink.store.table(table_name)
+    for table_name, row in parser.iter_parse(filepath):
+        sink.write(table_name, row)
+    print("✅ Compact parsing complete!")
+    return sink.data
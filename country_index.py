@@ -0,0 +1,48 @@
+# ==============================================================================
+#  1. TRAILING-SEGMENT COUNTRY INDEX
+# ==============================================================================
+# Spelling variants that are reported under a canonical name. Everything else is
+# returned as written in the source. Add an entry here (e.g. 'peoples r china':
+# 'China') rather than another branch in the affiliation parser.
+COUNTRY_ALIASES = {
+    'turkiye': 'Turkey',
+    'north ireland': 'Northern Ireland',
+    'u arab emirates': 'United Arab Emirates',
+    'uae': 'United Arab Emirates',
+}
+
+
+class CountryIndex:
+    """
+    Resolves the country at the end of an affiliation string with dictionary
+    lookups instead of a regex alternation over every country name.
+
+    A country can only be the text after one of the last few commas (as many as
+    the longest comma-containing name needs), so only those suffixes are
+    looked up. The leftmost matching suffix wins, which is what the
+    `,\\s*(A|B|...)\\b *$` search it replaces returned.
+    """
+    def __init__(self, countries, aliases=COUNTRY_ALIASES):
+        self._names = {country.lower() for country in countries}
+        self._aliases = {alias.lower(): canonical for alias, canonical in aliases.items()}
+        self._max_commas = max((country.count(',') for country in countries), default=0)
+
+    def match(self, text):
+        """
+        Returns (country, comma_position) for a trailing ', <country>' in `text`,
+        or None. The country keeps its source spelling unless it is an alias.
+        """
+        text = text.rstrip(' ')
+        candidates = []
+        pos = len(text)
+        for _ in range(self._max_commas + 1):
+            pos = text.rfind(',', 0, pos)
+            if pos == -1:
+                break
+            candidates.append(pos)
+        for pos in reversed(candidates):
+            country = text[pos + 1:].lstrip()
+            lowered = country.lower()
+            if lowered in self._names:
+                return self._aliases.get(lowered, country), pos
+        return None
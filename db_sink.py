@@ -0,0 +1,288 @@
+import sqlite3
+from collections import ChainMap
+
+from sinks import TableSink
+
+# ==============================================================================
+#  1. RELATIONAL SCHEMA
+# ==============================================================================
+# Column definitions use types that SQLite and PostgreSQL both accept.
+SCHEMA = {
+    "venues": {
+        "columns": [("venue_id", "TEXT PRIMARY KEY"), ("venue_name", "TEXT"), ("venue_type", "TEXT"), ("issn", "TEXT")],
+        "primary_key": "venue_id", "natural_keys": ["issn"],
+    },
+    "authors": {
+        "columns": [("author_id", "TEXT PRIMARY KEY"), ("first_name", "TEXT"), ("last_name", "TEXT"),
+                    ("scopus_author_id", "TEXT"), ("wos_researcher_id", "TEXT"), ("orcid", "TEXT")],
+        "primary_key": "author_id", "natural_keys": ["scopus_author_id", "wos_researcher_id", "orcid"],
+    },
+    "keywords": {
+        "columns": [("keyword_id", "TEXT PRIMARY KEY"), ("keyword", "TEXT")],
+        "primary_key": "keyword_id", "natural_keys": ["keyword"],
+    },
+    "affiliations": {
+        "columns": [("affiliation_id", "TEXT PRIMARY KEY"), ("institution_name", "TEXT"), ("city", "TEXT"), ("country", "TEXT")],
+        "primary_key": "affiliation_id", "natural_keys": [],
+    },
+    "records": {
+        "columns": [("record_id", "TEXT PRIMARY KEY"), ("title", "TEXT"), ("abstract", "TEXT"), ("document_type", "TEXT"),
+                    ("publication_year", "INTEGER"), ("doi", "TEXT"), ("eid", "TEXT"), ("wos_ut", "TEXT"),
+                    ("venue_id", "TEXT REFERENCES venues (venue_id)")],
+        "primary_key": "record_id", "natural_keys": ["eid", "wos_ut"],
+    },
+    "record_authors": {
+        "columns": [("record_id", "TEXT NOT NULL REFERENCES records (record_id)"),
+                    ("author_id", "TEXT NOT NULL REFERENCES authors (author_id)"),
+                    ("affiliation_id", "TEXT REFERENCES affiliations (affiliation_id)")],
+        "primary_key": None, "natural_keys": [], "indexes": ["record_id", "author_id", "affiliation_id"],
+    },
+    "record_keywords": {
+        "columns": [("record_id", "TEXT NOT NULL REFERENCES records (record_id)"),
+                    ("keyword_id", "TEXT NOT NULL REFERENCES keywords (keyword_id)")],
+        "primary_key": None, "natural_keys": [], "indexes": ["record_id", "keyword_id"],
+    },
+    "record_citations": {
+        "columns": [("record_id", "TEXT NOT NULL REFERENCES records (record_id)"),
+                    ("cited_record_id", "TEXT REFERENCES records (record_id) DEFERRABLE INITIALLY DEFERRED"),
+                    ("reference_key", "TEXT")],
+        "primary_key": None, "natural_keys": [], "indexes": ["record_id", "cited_record_id", "reference_key"],
+    },
+}
+# Parents before children, so foreign keys always resolve
+LOAD_ORDER = ["venues", "authors", "keywords", "affiliations", "records", "record_authors", "record_keywords",
+              "record_citations"]
+LINK_TABLES = ["record_authors", "record_keywords", "record_citations"]
+FOREIGN_KEYS = {
+    "records": ["venue_id"],
+    "record_authors": ["record_id", "author_id", "affiliation_id"],
+    "record_keywords": ["record_id", "keyword_id"],
+    "record_citations": ["record_id", "cited_record_id"],
+}
+# WoS records call the year column 'year'
+COLUMN_ALIASES = {"year": "publication_year"}
+INTEGER_COLUMNS = {table_name: [name for name, definition in spec["columns"] if definition.startswith("INTEGER")]
+                   for table_name, spec in SCHEMA.items()}
+DEFAULT_BATCH_SIZE = 5000
+# Stay well below SQLite's bound-parameter limit in IN (...) lookups
+LOOKUP_CHUNK = 500
+
+
+def create_schema(conn):
+    """Creates the tables, natural-key unique indexes and link-table indexes if missing."""
+    cursor = conn.cursor()
+    for table_name in LOAD_ORDER:
+        spec = SCHEMA[table_name]
+        columns = ', '.join(f"{name} {definition}" for name, definition in spec["columns"])
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns})")
+        for column in spec["natural_keys"]:
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table_name}_{column} ON {table_name} ({column})")
+        for column in spec.get("indexes", []):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{column} ON {table_name} ({column})")
+    conn.commit()
+
+
+def connect_sqlite(path):
+    """Opens a SQLite database tuned for bulk loading."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def to_integer(value):
+    """Value for an INTEGER column: ints pass through, digit strings ('2021 ') are converted, anything else is NULL."""
+    if value is None or isinstance(value, int):
+        return value
+    value = str(value).strip()
+    return int(value) if value.isdigit() else None
+
+
+# ==============================================================================
+#  2. BATCHED UPSERTING DATABASE SINK
+# ==============================================================================
+class DatabaseSink(TableSink):
+    """
+    Loads streamed rows into a DB-API connection with batched `executemany`
+    calls, one transaction per flush.
+
+    With upsert=True, entities and records are merged on their natural keys
+    (ISSN, Scopus author ID, ResearcherID, ORCID, keyword, EID, UT). When any
+    natural key of a row is already stored, the row takes the stored ID, is
+    upserted on the primary key, and later link rows are rewritten to it.
+    A stored value is never cleared by a row that has it missing or empty.
+    A re-ingested record has its old author/keyword/citation links replaced.
+    A citation whose cited record is not stored yet is held back until a
+    flush after that record arrives, or the final one in `close()`.
+    A flush that fails is rolled back and leaves its rows buffered.
+
+    `paramstyle` is 'qmark' for sqlite3 and 'format' for psycopg-style drivers.
+    The connection is closed with the sink only when it was opened by it
+    (`DatabaseSink.open` or `owns_connection=True`).
+    """
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE, upsert=True, paramstyle='qmark', create=True,
+                 owns_connection=False):
+        self.conn = conn
+        self.owns_connection = owns_connection
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.placeholder = '?' if paramstyle == 'qmark' else '%s'
+        self._buffers = {table_name: [] for table_name in LOAD_ORDER}
+        self._pending = 0
+        # Incoming ID -> ID already stored for the same natural key
+        self._remap = {}
+        self.row_counts = {}
+        if create:
+            create_schema(conn)
+
+    @classmethod
+    def open(cls, path, **options):
+        """Sink over a SQLite database file; its connection is closed with the sink."""
+        return cls(connect_sqlite(path), owns_connection=True, **options)
+
+    def write(self, table_name, row):
+        row = {COLUMN_ALIASES.get(k, k): v for k, v in row.items()}
+        for column in INTEGER_COLUMNS[table_name]:
+            if column in row:
+                row[column] = to_integer(row[column])
+        self._buffers[table_name].append(row)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self, final=False):
+        if not self._pending and not (final and self._buffers["record_citations"]):
+            return
+        cursor = self.conn.cursor()
+        # Buffers, ID remaps and counts only change once the transaction is committed
+        remap = ChainMap({}, self._remap)
+        remaining, written = {}, {}
+        try:
+            for table_name in LOAD_ORDER:
+                rows = self._buffers[table_name]
+                if not rows:
+                    continue
+                self._remap_references(table_name, rows, remap)
+                held = []
+                if table_name == "record_citations" and not final:
+                    rows, held = self._hold_forward_citations(cursor, rows)
+                if rows and self.upsert and SCHEMA[table_name]["primary_key"]:
+                    self._upsert(cursor, table_name, rows, remap)
+                elif rows:
+                    self._insert(cursor, table_name, rows)
+                remaining[table_name], written[table_name] = held, len(rows)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self._buffers.update(remaining)
+        self._remap.update(remap.maps[0])
+        for table_name, count in written.items():
+            self.row_counts[table_name] = self.row_counts.get(table_name, 0) + count
+        self._pending = 0
+
+    def close(self):
+        try:
+            self.flush(final=True)
+        finally:
+            if self.owns_connection:
+                self.conn.close()
+
+    def _remap_references(self, table_name, rows, remap):
+        if not remap:
+            return
+        for id_field in FOREIGN_KEYS.get(table_name, []):
+            for row in rows:
+                if row.get(id_field) in remap:
+                    row[id_field] = remap[row[id_field]]
+
+    def _hold_forward_citations(self, cursor, rows):
+        """Splits citation rows into (ready, held): held ones cite a record that is not stored yet."""
+        cited = list({row["cited_record_id"] for row in rows if row.get("cited_record_id")})
+        if not cited:
+            return rows, []
+        stored = self._select_existing(cursor, "records", "record_id", cited)
+        ready, held = [], []
+        for row in rows:
+            cited_id = row.get("cited_record_id")
+            (held if cited_id and cited_id not in stored else ready).append(row)
+        return ready, held
+
+    def _columns(self, table_name, rows):
+        present = set().union(*(row.keys() for row in rows))
+        return [name for name, _ in SCHEMA[table_name]["columns"] if name in present]
+
+    def _insert(self, cursor, table_name, rows, suffix=''):
+        columns = self._columns(table_name, rows)
+        values = ', '.join([self.placeholder] * len(columns))
+        sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({values}){suffix}"
+        cursor.executemany(sql, [tuple(row.get(c) for c in columns) for row in rows])
+
+    def _select_existing(self, cursor, table_name, key_column, keys):
+        primary_key = SCHEMA[table_name]["primary_key"]
+        existing = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            params = ', '.join([self.placeholder] * len(chunk))
+            cursor.execute(f"SELECT {key_column}, {primary_key} FROM {table_name} WHERE {key_column} IN ({params})", chunk)
+            existing.update(cursor.fetchall())
+        return existing
+
+    def _upsert(self, cursor, table_name, rows, remap):
+        spec = SCHEMA[table_name]
+        primary_key, natural_keys = spec["primary_key"], spec["natural_keys"]
+        # Natural key column -> value -> ID stored (or written earlier in this batch) under it
+        resolved = {}
+        for column in natural_keys:
+            for row in rows:
+                if row.get(column) == '':
+                    row[column] = None
+            values = list({row[column] for row in rows if row.get(column)})
+            resolved[column] = self._select_existing(cursor, table_name, column, values) if values else {}
+        if table_name == "records":
+            stored_ids = sorted({record_id for ids in resolved.values() for record_id in ids.values()})
+            if stored_ids:
+                self._delete_links(cursor, stored_ids)
+
+        for row in rows:
+            # The first natural key already known decides the row's ID (e.g. a merged record
+            # with both an EID and a UT); the row then conflicts on the primary key only
+            row_id = row[primary_key]
+            stored_id = next((resolved[c][row[c]] for c in natural_keys if row.get(c) and row[c] in resolved[c]), row_id)
+            if stored_id != row_id:
+                remap[row_id] = stored_id
+                row[primary_key] = stored_id
+            for column in natural_keys:
+                if row.get(column) and resolved[column].setdefault(row[column], stored_id) != stored_id:
+                    # The key belongs to another stored row, which keeps it
+                    row[column] = None
+
+        columns = self._columns(table_name, rows)
+        updates = [c for c in columns if c != primary_key]
+        if updates:
+            # A missing or empty incoming value keeps the stored one (e.g. a WoS row has no abstract)
+            action = "DO UPDATE SET " + ', '.join(
+                f"{c} = COALESCE(NULLIF(excluded.{c}, ''), {table_name}.{c})" for c in updates)
+        else:
+            action = "DO NOTHING"
+        self._insert(cursor, table_name, rows, suffix=f" ON CONFLICT ({primary_key}) {action}")
+
+    def _delete_links(self, cursor, record_ids):
+        for table_name in LINK_TABLES:
+            for start in range(0, len(record_ids), LOOKUP_CHUNK):
+                chunk = record_ids[start:start + LOOKUP_CHUNK]
+                params = ', '.join([self.placeholder] * len(chunk))
+                cursor.execute(f"DELETE FROM {table_name} WHERE record_id IN ({params})", chunk)
+
+
+def load_data(data, conn, **options):
+    """Bulk-loads `parse_file` output into `conn` through a DatabaseSink."""
+    print("\n🚀 Loading data into the database...")
+    with DatabaseSink(conn, **options) as sink:
+        for table_name in LOAD_ORDER:
+            for row in data.get(table_name, []):
+                sink.write(table_name, row)
+    for table_name, count in sink.row_counts.items():
+        print(f"  -> Loaded {count} rows into '{table_name}'")
+    print("\n✅ Database load complete!")
+    return sink.row_counts
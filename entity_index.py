@@ -0,0 +1,157 @@
+import csv
+import gzip
+import json
+import os
+
+from parser_core import ENTITY_ID_FIELDS, TABLE_NAMES
+from sinks import CsvSink
+
+INDEX_FILENAME = '.entity_index.json.gz'
+RECORD_KEY_FIELDS = ['eid', 'wos_ut']
+
+# ==============================================================================
+#  1. PERSISTENT KEY -> ID INDEX
+# ==============================================================================
+class EntityIndex:
+    """
+    Remembers, across runs, the ID used for every natural key (ISSN, Scopus
+    author ID, ResearcherID, keyword, affiliation text) and which records
+    (EID / UT) are already in the output tables. Stored as gzipped JSON.
+    IDs are derived from the keys (parser_core.stable_id), so the ID map
+    matters for tables written before that, whose random IDs it preserves.
+    It also keeps the size of each table CSV it describes, so rows appended
+    by a run that failed before saving the index can be cut off again.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entities = {table_name: {} for table_name in ENTITY_ID_FIELDS}
+        self.records = set()
+        # Table name -> size in bytes of its CSV when the index was saved
+        self.table_sizes = {}
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        for table_name, ids in data.get("entities", {}).items():
+            self.entities.setdefault(table_name, {}).update(ids)
+        self.records.update(data.get("records", []))
+        self.table_sizes.update(data.get("table_sizes", {}))
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        data = {"entities": self.entities, "records": sorted(self.records), "table_sizes": self.table_sizes}
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def record_table_sizes(self, output_dir):
+        """Notes the current size of every table CSV in `output_dir` (0 for missing ones)."""
+        for table_name in TABLE_NAMES:
+            file_path = os.path.join(output_dir, f"{table_name}.csv")
+            self.table_sizes[table_name] = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+
+    def truncate_unindexed_rows(self, output_dir):
+        """
+        Cuts every table CSV back to the size noted with the index, dropping
+        rows an interrupted run appended without saving it. Returns the names
+        of the tables that were truncated. Indexes saved before sizes were kept
+        note none, and nothing is truncated.
+        """
+        truncated = []
+        for table_name, size in self.table_sizes.items():
+            file_path = os.path.join(output_dir, f"{table_name}.csv")
+            if os.path.exists(file_path) and os.path.getsize(file_path) > size:
+                with open(file_path, 'r+b') as f:
+                    f.truncate(size)
+                truncated.append(table_name)
+        return truncated
+
+    def bootstrap_from_output_dir(self, output_dir):
+        """
+        Seeds the index from CSVs written before incremental mode was used.
+        Venues, authors, keywords and records can be re-keyed from their columns;
+        affiliations cannot (their key is the raw text, which is not exported),
+        so previously seen affiliations get new IDs on first incremental run.
+        """
+        def read_table(table_name):
+            file_path = os.path.join(output_dir, f"{table_name}.csv")
+            if not os.path.exists(file_path):
+                return []
+            with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                return list(csv.DictReader(f))
+
+        for row in read_table('venues'):
+            self.entities['venues'][row.get('issn') or row.get('venue_name', '').strip().lower()] = row['venue_id']
+        for row in read_table('authors'):
+            if 'scopus_author_id' in row:
+                key = row['scopus_author_id']
+            else:
+                name = f"{row['last_name']}, {row['first_name']}" if row.get('first_name') else row.get('last_name', '')
+                key = row.get('wos_researcher_id') or row.get('orcid') or name.lower()
+            self.entities['authors'][key] = row['author_id']
+        for row in read_table('keywords'):
+            self.entities['keywords'][row['keyword']] = row['keyword_id']
+        for row in read_table('records'):
+            record_key = next((row[field] for field in RECORD_KEY_FIELDS if row.get(field)), None)
+            if record_key:
+                self.records.add(record_key)
+
+    def attach(self, parser):
+        """
+        Hands `parser` the known IDs and turns on record skipping, so parsing
+        only emits entities and records that are new. Known entities are kept
+        apart from the parser's dedup stores, so `parse_file` does not return
+        them as rows.
+        """
+        parser._known_ids = {table_name: self.entities.get(table_name, {}) for table_name in ENTITY_ID_FIELDS}
+        parser._ingested_records = self.records
+
+    def update_from(self, parser):
+        """Records every key the parser has minted an ID for."""
+        for table_name, store in parser._entities.items():
+            id_field = ENTITY_ID_FIELDS[table_name]
+            ids = self.entities.setdefault(table_name, {})
+            for key, entity in store.items():
+                ids[key] = entity[id_field]
+        if parser._ingested_records is not None:
+            self.records.update(parser._ingested_records)
+
+
+# ==============================================================================
+#  2. INCREMENTAL INGESTION
+# ==============================================================================
+def ingest_incremental(parser, filepath, output_dir, index_path=None):
+    """
+    Parses `filepath` and appends only the new records, links and entities to the
+    CSV tables in `output_dir`, reusing the IDs from previous runs.
+
+    The tables and the index are written separately, so the index is saved
+    (with the table sizes) before anything is appended, and again after. A
+    run interrupted in between leaves rows past the saved sizes, which the
+    next run truncates before parsing the file again.
+    """
+    index_path = index_path or os.path.join(output_dir, INDEX_FILENAME)
+    os.makedirs(output_dir, exist_ok=True)
+    index = EntityIndex(index_path)
+    if os.path.exists(index_path):
+        truncated = index.truncate_unindexed_rows(output_dir)
+        if truncated:
+            print(f"  -> Dropped rows of an interrupted ingest from: {', '.join(truncated)}")
+    else:
+        index.bootstrap_from_output_dir(output_dir)
+        index.record_table_sizes(output_dir)
+        index.save()
+    known_records = len(index.records)
+    index.attach(parser)
+
+    with CsvSink(output_dir, append=True) as sink:
+        parser.stream_file(filepath, sink)
+
+    index.update_from(parser)
+    index.record_table_sizes(output_dir)
+    index.save()
+    print(f"✅ Incremental ingest complete: {len(index.records) - known_records} new records, "
+          f"{sum(sink.row_counts.values())} rows appended to '{output_dir}/'.")
+    return sink.row_counts
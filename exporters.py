@@ -0,0 +1,221 @@
+import csv
+import os
+import uuid
+
+from metrics import NULL_METRICS
+from parser_core import compact_id
+from sinks import TableSink, CsvSink
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa, pq = None, None
+
+# ==============================================================================
+#  1. TYPED TABLE SCHEMAS
+# ==============================================================================
+# Surrogate keys are stored as 16-byte UUIDs instead of 36-character strings
+UUID_COLUMNS = {'record_id', 'author_id', 'venue_id', 'keyword_id', 'affiliation_id'}
+INT_COLUMNS = {'publication_year', 'year'}
+# Low-cardinality text that repeats across rows is dictionary-encoded
+DICTIONARY_COLUMNS = {'document_type', 'venue_type', 'venue_name', 'institution_name', 'city', 'country'}
+DEFAULT_BATCH_SIZE = 65536
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar export needs pyarrow: pip install pyarrow")
+
+
+def column_type(column_name, compact_ids=False):
+    """Arrow type used for a column of the output tables."""
+    if column_name in UUID_COLUMNS:
+        return pa.int64() if compact_ids else pa.binary(16)
+    if column_name in INT_COLUMNS:
+        return pa.int32()
+    if column_name in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def table_schema(column_names, compact_ids=False):
+    return pa.schema([pa.field(name, column_type(name, compact_ids)) for name in column_names])
+
+
+def _convert(column_name, values, compact_ids=False):
+    if column_name in UUID_COLUMNS:
+        if compact_ids:
+            return [compact_id(v) if v else None for v in values]
+        return [uuid.UUID(v).bytes if v else None for v in values]
+    if column_name in INT_COLUMNS:
+        return [v if isinstance(v, int) else (int(v) if v and str(v).strip().isdigit() else None) for v in values]
+    return [None if v is None else str(v) for v in values]
+
+
+def columns_to_batch(schema, get_column):
+    """Builds a RecordBatch following `schema` from `get_column(name)` value lists."""
+    arrays = []
+    for field in schema:
+        # ID columns typed int64 come from a compact_ids schema
+        values = _convert(field.name, get_column(field.name), pa.types.is_int64(field.type))
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def rows_to_batch(schema, rows):
+    """Builds a RecordBatch from a list of row dicts following `schema`."""
+    return columns_to_batch(schema, lambda name: [row.get(name) for row in rows])
+
+
+# ==============================================================================
+#  2. COLUMNAR SINKS
+# ==============================================================================
+class ColumnarSink(TableSink):
+    """
+    Buffers rows per table and writes them as Arrow record batches of
+    `batch_size` rows. The schema of each table is fixed by its first row.
+    With compact_ids=True the ID columns are written as int64 (see
+    parser_core.compact_id) instead of 16-byte UUIDs.
+    """
+    extension = None
+
+    def __init__(self, output_dir, batch_size=DEFAULT_BATCH_SIZE, compact_ids=False):
+        _require_pyarrow()
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.compact_ids = compact_ids
+        self._buffers, self._schemas, self._writers, self.row_counts = {}, {}, {}, {}
+        if not os.path.exists(output_dir): os.makedirs(output_dir)
+
+    def _open_writer(self, file_path, schema):
+        raise NotImplementedError
+
+    def write(self, table_name, row):
+        buffer = self._buffers.get(table_name)
+        if buffer is None:
+            buffer = self._buffers[table_name] = []
+            self._schemas[table_name] = table_schema(row.keys(), self.compact_ids)
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._flush(table_name)
+
+    def write_table(self, table_name, rows):
+        """CompactTables are converted column by column, without building row dicts."""
+        if not hasattr(rows, 'iter_tuples'):
+            return super().write_table(table_name, rows)
+        if not len(rows):
+            return
+        if table_name not in self._buffers:
+            self._buffers[table_name] = []
+            self._schemas[table_name] = table_schema(rows.columns, self.compact_ids)
+        self._flush(table_name)
+        for start in range(0, len(rows), self.batch_size):
+            stop = min(start + self.batch_size, len(rows))
+            batch = columns_to_batch(self._schemas[table_name], lambda name: rows.column(name, start, stop))
+            self._write_batch(table_name, batch)
+
+    def _writer(self, table_name):
+        writer = self._writers.get(table_name)
+        if writer is None:
+            file_path = os.path.join(self.output_dir, f"{table_name}.{self.extension}")
+            writer = self._writers[table_name] = self._open_writer(file_path, self._schemas[table_name])
+        return writer
+
+    def _write_batch(self, table_name, batch):
+        self._writer(table_name).write_batch(batch)
+        self.row_counts[table_name] = self.row_counts.get(table_name, 0) + batch.num_rows
+
+    def _flush(self, table_name):
+        buffer = self._buffers[table_name]
+        if not buffer:
+            return
+        self._write_batch(table_name, rows_to_batch(self._schemas[table_name], buffer))
+        self._buffers[table_name] = []
+
+    def close(self):
+        for table_name in list(self._buffers):
+            self._flush(table_name)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+
+class ParquetSink(ColumnarSink):
+    """One zstd-compressed Parquet file per table."""
+    extension = 'parquet'
+
+    def __init__(self, output_dir, batch_size=DEFAULT_BATCH_SIZE, compression='zstd', compact_ids=False):
+        super().__init__(output_dir, batch_size, compact_ids)
+        self.compression = compression
+
+    def _open_writer(self, file_path, schema):
+        return pq.ParquetWriter(file_path, schema, compression=self.compression)
+
+
+class ArrowIpcSink(ColumnarSink):
+    """
+    One Arrow IPC stream per table. The stream format is used (not the file
+    format) because every batch carries its own string dictionaries.
+    """
+    extension = 'arrows'
+
+    def _open_writer(self, file_path, schema):
+        return pa.ipc.new_stream(file_path, schema)
+
+
+# ==============================================================================
+#  3. EXPORT FRONT-ENDS
+# ==============================================================================
+def export_data_to_csv(data, output_dir, metrics=None):
+    """Writes every non-empty table of `data` to '<output_dir>/<table_name>.csv'."""
+    metrics = metrics or NULL_METRICS
+    print(f"\n🚀 Exporting data to CSV files in '{output_dir}/' directory...")
+    if not os.path.exists(output_dir): os.makedirs(output_dir)
+    for table_name, table_data in data.items():
+        if not table_data:
+            print(f"  -> Skipping '{table_name}.csv' (no data).")
+            continue
+        file_path = os.path.join(output_dir, f"{table_name}.csv")
+        try:
+            with metrics.timer(f"export.{table_name}"), open(file_path, 'w', newline='', encoding='utf-8') as f:
+                if hasattr(table_data, 'iter_tuples'):
+                    # CompactTable (see compact_store.py): write its columns as-is
+                    writer = csv.writer(f)
+                    writer.writerow(table_data.columns)
+                    writer.writerows(table_data.iter_tuples())
+                else:
+                    writer = csv.DictWriter(f, fieldnames=table_data[0].keys())
+                    writer.writeheader()
+                    writer.writerows(table_data)
+            metrics.incr(f"rows_written.{table_name}", len(table_data))
+            print(f"  -> Successfully wrote {len(table_data)} rows to '{file_path}'")
+        except IOError as e: print(f"  -> ERROR writing to '{file_path}': {e}")
+    metrics.event('export_complete', format='csv', output_dir=output_dir, metrics=metrics.snapshot())
+    print("\n✅ CSV export complete!")
+
+
+EXPORTERS = {'csv': CsvSink, 'parquet': ParquetSink, 'arrow': ArrowIpcSink}
+
+
+def export_data(data, output_dir, fmt='csv', metrics=None, **options):
+    """
+    Writes `parse_file` output with the chosen backend ('csv', 'parquet' or
+    'arrow'). `options` are passed to the sink, e.g. batch_size.
+    """
+    metrics = metrics or NULL_METRICS
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose from: {', '.join(EXPORTERS)}")
+    print(f"\n🚀 Exporting data as {fmt} to '{output_dir}/' directory...")
+    with metrics.timer(f"export.{fmt}"), EXPORTERS[fmt](output_dir, **options) as sink:
+        for table_name, table_data in data.items():
+            sink.write_table(table_name, table_data)
+    for table_name, count in sink.row_counts.items():
+        metrics.incr(f"rows_written.{table_name}", count)
+        print(f"  -> Wrote {count} rows to '{table_name}'")
+    metrics.event('export_complete', format=fmt, output_dir=output_dir, metrics=metrics.snapshot())
+    print(f"\n✅ {fmt} export complete!")
+    return sink.row_counts
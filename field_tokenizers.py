@@ -0,0 +1,101 @@
+import re
+
+# The patterns these tokenizers replace. They are only used as a fallback for
+# rare inputs (embedded newlines, malformed entries) where matching them
+# exactly by hand is not worth it, so the output is always what they give.
+WOS_ADDRESS_PATTERN = re.compile(r'\[(.*?)\]\s*(.*?)(?=\s*\[|$)')
+WOS_ID_SUFFIX_PATTERN = re.compile(r'/(.*)$')
+SCOPUS_AUTHOR_PATTERN = re.compile(r'([^,]+),\s(.*?)\s\((\d+)\)')
+
+# ==============================================================================
+#  1. WEB OF SCIENCE FIELDS
+# ==============================================================================
+def clean_affiliation(text):
+    """Affiliation text of an address block without surrounding blanks and trailing semicolons."""
+    return text.strip().rstrip(';').strip()
+
+
+def iter_address_blocks(addresses):
+    """
+    Yields (author_list, affiliation) for each '[Author; Author] Affiliation'
+    block of a WoS 'Addresses' value, in order, with the affiliation cleaned
+    by `clean_affiliation`. The author list is the text between the brackets.
+
+    It scans the string once with `find` and gives the same blocks as
+    WOS_ADDRESS_PATTERN.findall; values with a newline go through the pattern.
+    """
+    if '\n' in addresses:
+        for author_list, affiliation in WOS_ADDRESS_PATTERN.findall(addresses):
+            yield author_list, clean_affiliation(affiliation)
+        return
+    find = addresses.find
+    start = find('[')
+    while start != -1:
+        close = find(']', start + 1)
+        if close == -1:
+            return
+        # The affiliation runs up to the next '[' (the blanks around it are stripped)
+        end = find('[', close + 1)
+        yield addresses[start + 1:close], clean_affiliation(addresses[close + 1:end if end != -1 else None])
+        start = end
+
+
+def id_suffix(entry):
+    """
+    The ID of a 'Researcher Ids' / 'ORCIDs' entry ('Name, First/ID' -> 'ID'):
+    everything after the first '/', or None when there is none.
+    """
+    if '\n' in entry:
+        match = WOS_ID_SUFFIX_PATTERN.search(entry)
+        return match.group(1) if match else None
+    slash = entry.find('/')
+    return entry[slash + 1:] if slash != -1 else None
+
+
+# ==============================================================================
+#  2. SCOPUS FIELDS
+# ==============================================================================
+def parse_scopus_author(entry):
+    """
+    Splits an 'Author full names' entry, 'Last, First (123456)', into
+    (last_name, first_name, scopus_author_id), all stripped; None when it has
+    no numeric ID. Same result as SCOPUS_AUTHOR_PATTERN.search on the stripped
+    entry; entries where the first comma is not followed by a blank (or with
+    a newline) go through the pattern.
+    """
+    entry = entry.strip()
+    comma = entry.find(',')
+    if comma > 0 and comma + 1 < len(entry) and entry[comma + 1].isspace() and '\n' not in entry:
+        # The ID is the first '(digits)' preceded by a blank, after 'Last, '
+        paren = entry.find('(', comma + 3)
+        while paren != -1:
+            if entry[paren - 1].isspace():
+                close = entry.find(')', paren + 1)
+                if close != -1 and entry[paren + 1:close].isdecimal():
+                    return entry[:comma].strip(), entry[comma + 2:paren - 1].strip(), entry[paren + 1:close]
+            paren = entry.find('(', paren + 1)
+        return None
+    match = SCOPUS_AUTHOR_PATTERN.search(entry)
+    if match:
+        last_name, first_name, author_id = match.groups()
+        return last_name.strip(), first_name.strip(), author_id.strip()
+    return None
+
+
+def iter_scopus_affiliations(authors_with_affiliations):
+    """
+    Yields ('Last, First', affiliation) for each ';'-separated entry of a
+    Scopus 'Authors with affiliations' value that has at least three
+    comma-separated parts. Both equal re-joining the stripped parts with
+    ', ', but the entry is only split at its first two commas; the
+    affiliation is re-joined only when its own commas are irregularly spaced.
+    """
+    for entry in authors_with_affiliations.split(';'):
+        parts = entry.split(',', 2)
+        if len(parts) < 3:
+            continue
+        last_name, first_name, affiliation = parts
+        if ',' in affiliation and not (affiliation.isprintable() and ' ,' not in affiliation and ',  ' not in affiliation
+                                       and affiliation.count(',') == affiliation.count(', ')):
+            affiliation = ', '.join(part.strip() for part in affiliation.split(','))
+        yield f"{last_name.strip()}, {first_name.strip()}".strip(), affiliation.strip()
@@ -0,0 +1,253 @@
+import argparse
+import hmac
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pipeline import PipelineProgress, run_pipeline
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+OUTPUT_FORMATS = ('csv', 'parquet', 'arrow', 'sqlite')
+TOKEN_ENV_VAR = 'INGEST_SERVICE_TOKEN'
+# Finished (done / failed) jobs kept for GET /jobs; older ones are forgotten
+DEFAULT_MAX_FINISHED_JOBS = 100
+LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+WILDCARD_HOSTS = ('', '0.0.0.0', '::')
+
+# ==============================================================================
+#  1. JOB QUEUE
+# ==============================================================================
+def make_sink(fmt, output):
+    """Sink for one job: a directory of CSV / Parquet / Arrow files, or a SQLite database file."""
+    if fmt == 'csv':
+        from sinks import CsvSink
+        return CsvSink(output)
+    if fmt in ('parquet', 'arrow'):
+        from exporters import ArrowIpcSink, ParquetSink
+        return (ParquetSink if fmt == 'parquet' else ArrowIpcSink)(output)
+    if fmt == 'sqlite':
+        from db_sink import DatabaseSink
+        return DatabaseSink.open(output)
+    raise ValueError(f"Unknown output format '{fmt}'; expected one of {', '.join(OUTPUT_FORMATS)}")
+
+
+class IngestJob:
+    def __init__(self, job_id, files, output, fmt):
+        self.job_id, self.files, self.output, self.fmt = job_id, list(files), output, fmt
+        self.progress = PipelineProgress(files)
+        self.submitted = time.time()
+
+    def to_dict(self):
+        return {"job_id": self.job_id, "files": self.files, "output": self.output, "format": self.fmt,
+                "submitted": self.submitted, **self.progress.snapshot()}
+
+
+class IngestService:
+    """
+    Accepts batches of export files and ingests them one job at a time on a
+    worker thread, each through an IngestPipeline. Jobs run in submission
+    order; `job(job_id)` reports a job's live progress. Only the last
+    `max_finished_jobs` finished jobs are kept.
+    """
+    def __init__(self, max_finished_jobs=DEFAULT_MAX_FINISHED_JOBS):
+        self.jobs = {}
+        self.max_finished_jobs = max_finished_jobs
+        self._finished = deque()
+        # `jobs` is written by request threads and the worker
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._worker = threading.Thread(target=self._run_jobs, name='ingest-worker', daemon=True)
+        self._worker.start()
+
+    def submit(self, files, output, fmt='csv'):
+        if not isinstance(files, list) or not files or not all(isinstance(path, str) for path in files):
+            raise ValueError("'files' must be a non-empty list of paths")
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}'; expected one of {', '.join(OUTPUT_FORMATS)}")
+        if not output:
+            raise ValueError("'output' is required")
+        job = IngestJob(str(next(self._ids)), files, output, fmt)
+        with self._lock:
+            self.jobs[job.job_id] = job
+        self._queue.put(job)
+        return job
+
+    def job(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return list(self.jobs.values())
+
+    def _finish(self, job):
+        with self._lock:
+            self._finished.append(job.job_id)
+            while len(self._finished) > self.max_finished_jobs:
+                self.jobs.pop(self._finished.popleft(), None)
+
+    def _run_jobs(self):
+        while True:
+            job = self._queue.get()
+            try:
+                run_pipeline(job.files, make_sink(job.fmt, job.output), progress=job.progress)
+            except Exception as e:
+                # The pipeline records its own failures; this covers errors before it started
+                job.progress.state, job.progress.error = 'failed', f"{type(e).__name__}: {e}"
+            self._finish(job)
+
+
+# ==============================================================================
+#  2. HTTP FRONT-END
+# ==============================================================================
+class IngestRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs       {"files": [...], "output": "out_dir", "format": "csv"} -> 202 + job
+    GET  /jobs       every job with its progress
+    GET  /jobs/<id>  one job's progress
+
+    Jobs read and write local paths, so a POST must be sent as
+    application/json, which a cross-site form or text/plain request cannot
+    do without a CORS preflight this server never answers. The Host header
+    must name one of `allowed_hosts`, so a page on a domain rebound to this
+    address cannot reach it either. With `token` set, every request must
+    also carry 'Authorization: Bearer <token>'.
+    """
+    service = None
+    token = None
+    # Lower-cased host names (no port) accepted in the Host header; None accepts any
+    allowed_hosts = None
+
+    def _host_allowed(self):
+        if self.allowed_hosts is None:
+            return True
+        host = self.headers.get('Host', '').strip().lower()
+        if host.startswith('['):
+            host = host[1:host.find(']')]
+        elif host.count(':') == 1:
+            host = host.split(':', 1)[0]
+        return host in self.allowed_hosts
+
+    def _authorized(self):
+        if self.token is None:
+            return True
+        return hmac.compare_digest(self.headers.get('Authorization', ''), f"Bearer {self.token}")
+
+    def _check_request(self):
+        """Sends the error response and returns False for a request from a foreign host or without the token."""
+        if not self._host_allowed():
+            self._send_json(403, {"error": "unknown host"})
+            return False
+        if not self._authorized():
+            self._send_json(401, {"error": "unauthorized"})
+            return False
+        return True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if not self._check_request():
+            return
+        parts = [part for part in self.path.split('?', 1)[0].split('/') if part]
+        if parts == ['jobs']:
+            self._send_json(200, [job.to_dict() for job in self.service.list_jobs()])
+        elif len(parts) == 2 and parts[0] == 'jobs' and self.service.job(parts[1]):
+            self._send_json(200, self.service.job(parts[1]).to_dict())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._check_request():
+            return
+        if self.path.rstrip('/') != '/jobs':
+            self._send_json(404, {"error": "not found"})
+            return
+        if self.headers.get_content_type() != 'application/json':
+            self._send_json(415, {"error": "the request body must be sent as application/json"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError("the request body must be a JSON object")
+            job = self.service.submit(request.get("files"), request.get("output"), request.get("format", 'csv'))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(202, job.to_dict())
+
+    def log_message(self, format, *args):
+        pass
+
+
+def allowed_hosts_for(host, extra_hosts=()):
+    """
+    Host header names a server bound to `host` answers to: the address
+    itself and `extra_hosts`, plus 'localhost' and its addresses on loopback.
+    None (any) for a wildcard address, where a token has to protect it instead.
+    """
+    if host in WILDCARD_HOSTS:
+        return {name.lower() for name in extra_hosts} or None
+    hosts = {host.lower(), *(name.lower() for name in extra_hosts)}
+    if host.lower() in LOOPBACK_HOSTS:
+        hosts.update(LOOPBACK_HOSTS)
+    return hosts
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, service=None, token=None, allowed_hosts=()):
+    """
+    The service's HTTP server, not yet serving. Listening on every interface
+    requires a `token`, as the Host header cannot be pinned to one address there.
+    """
+    if host in WILDCARD_HOSTS and not token:
+        raise ValueError(f"A token is required when listening on all interfaces (--token or ${TOKEN_ENV_VAR})")
+    handler = type('BoundIngestRequestHandler', (IngestRequestHandler,), {
+        "service": service or IngestService(), "token": token, "allowed_hosts": allowed_hosts_for(host, allowed_hosts)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, service=None, token=None, allowed_hosts=()):
+    """
+    Runs the ingestion service until interrupted. It binds to localhost by
+    default and only answers requests addressed to it (see `allowed_hosts_for`);
+    pass `token` to require it as a bearer token on every request.
+    """
+    server = make_server(host, port, service, token, allowed_hosts)
+    print(f"🚀 Ingestion service listening on http://{host}:{server.server_port}/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return server
+
+
+# ==============================================================================
+#  3. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Local service that ingests batches of Scopus / WoS exports.")
+    arg_parser.add_argument('--host', default=DEFAULT_HOST)
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument('--token', default=os.environ.get(TOKEN_ENV_VAR),
+                            help=f"Shared secret clients send as a bearer token (default: ${TOKEN_ENV_VAR})")
+    arg_parser.add_argument('--allowed-host', action='append', default=[], dest='allowed_hosts',
+                            help="Extra name clients may use in the Host header (repeatable)")
+    args = arg_parser.parse_args()
+    try:
+        serve(args.host, args.port, token=args.token, allowed_hosts=args.allowed_hosts)
+    except ValueError as e:
+        arg_parser.error(str(e))
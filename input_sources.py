@@ -0,0 +1,168 @@
+import bz2
+import contextlib
+import errno
+import glob
+import gzip
+import io
+import lzma
+import mmap
+import os
+import sys
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+STDIN = '-'
+ENCODING = 'utf-8-sig'
+# Reads from disk are made in blocks of this size instead of io's 8 KiB default
+READ_BUFFER_SIZE = 1 << 20
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst', '.zstd')
+# Header bytes read from stdin by read_header_line, replayed by the next open
+_stdin_header = b''
+
+# ==============================================================================
+#  1. BINARY SOURCES
+# ==============================================================================
+class MmapRawReader(io.RawIOBase):
+    """
+    Read-only raw stream over a memory-mapped file. Each read copies straight
+    from the page cache into the caller's buffer: the file is never held in
+    memory twice and there is no read() syscall per buffer refill.
+    """
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._map, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        n = min(len(view), len(self._map) - self._pos)
+        with memoryview(self._map) as source:
+            view[:n] = source[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+        super().close()
+
+
+class _PrefixedRawReader(io.RawIOBase):
+    """Raw stream returning `prefix` before the rest of `source`; puts back bytes already read from stdin."""
+    def __init__(self, prefix, source):
+        self._prefix, self._source = prefix, source
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        if self._prefix:
+            n = min(len(view), len(self._prefix))
+            view[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._source.read1(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("Reading .zst exports needs zstandard: pip install zstandard")
+
+
+def open_binary(path):
+    """Buffered binary stream over `path`, decompressing by suffix; '-' is stdin."""
+    global _stdin_header
+    if path == STDIN:
+        if not _stdin_header:
+            return sys.stdin.buffer
+        prefix, _stdin_header = _stdin_header, b''
+        return io.BufferedReader(_PrefixedRawReader(prefix, sys.stdin.buffer))
+    path = os.fspath(path)
+    lower = path.lower()
+    if lower.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if lower.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if lower.endswith('.xz'):
+        return lzma.open(path, 'rb')
+    if lower.endswith(('.zst', '.zstd')):
+        _require_zstandard()
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')),
+                                 buffer_size=READ_BUFFER_SIZE)
+    if os.path.getsize(path) == 0:
+        # Empty files cannot be memory-mapped
+        return open(path, 'rb')
+    return io.BufferedReader(MmapRawReader(path), buffer_size=READ_BUFFER_SIZE)
+
+
+# ==============================================================================
+#  2. TEXT INPUTS
+# ==============================================================================
+@contextlib.contextmanager
+def open_input(path):
+    """
+    Opens an export for the csv module the way the parsers always have
+    (UTF-8 with optional BOM, universal newlines), but from a plain file,
+    a .gz/.bz2/.xz/.zst file or stdin ('-'). Stdin is not closed.
+    """
+    binary = open_binary(path)
+    text = io.TextIOWrapper(binary, encoding=ENCODING)
+    try:
+        yield text
+    finally:
+        if path == STDIN:
+            text.detach()
+        else:
+            text.close()
+
+
+def is_seekable_file(path):
+    """Whether `path` is a plain file whose byte offsets match the CSV text (needed for sharding)."""
+    return path != STDIN and not os.fspath(path).lower().endswith(COMPRESSED_SUFFIXES)
+
+
+def read_header_line(path):
+    """
+    First line of an export. For stdin the line is kept and replayed by the
+    next `open_input('-')`, so the parse still sees it.
+    """
+    global _stdin_header
+    if path == STDIN:
+        if not _stdin_header:
+            _stdin_header = sys.stdin.buffer.readline()
+        return _stdin_header.decode(ENCODING, errors='replace')
+    with open_input(path) as f:
+        return f.readline()
+
+
+def expand_inputs(patterns):
+    """
+    Expands shell-style globs ('exports/*.csv.gz', 'data/**/*.csv') in
+    order, each match list sorted. Plain paths (str or path-like) and '-'
+    pass through, so a missing file still fails with FileNotFoundError when
+    it is opened. An existing file whose name contains glob characters is
+    taken literally; a glob matching nothing raises FileNotFoundError.
+    """
+    paths = []
+    for pattern in patterns:
+        pattern = os.fspath(pattern)
+        if pattern != STDIN and any(c in pattern for c in '*?[') and not os.path.exists(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                raise FileNotFoundError(errno.ENOENT, "No export matches the pattern", pattern)
+            paths.extend(matches)
+        else:
+            paths.append(pattern)
+    return paths
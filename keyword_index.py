@@ -0,0 +1,347 @@
+import csv
+import gzip
+import heapq
+import json
+import os
+import re
+import sys
+import unicodedata
+from array import array
+
+from compact_store import IdInterner
+from sinks import TableSink
+
+INDEX_FILENAME = '.keyword_index.json.gz'
+# Common acronyms and spelling variants, mapped to one canonical keyword.
+# Both sides go through the same normalization, so plurals and hyphens need no entries.
+DEFAULT_SYNONYMS = {
+    'bim': 'building information modeling',
+    'building information modelling': 'building information modeling',
+    'lca': 'life cycle assessment',
+    'lcsa': 'life cycle sustainability assessment',
+    'iot': 'internet of things',
+    'ai': 'artificial intelligence',
+    'ml': 'machine learning',
+    'gis': 'geographic information system',
+    'ghg': 'greenhouse gas',
+    'ghg emission': 'greenhouse gas emission',
+}
+# Words of at most this length are never stemmed ('gas', 'has', 'its')
+MIN_STEM_LENGTH = 3
+# Words the suffix rules get wrong: ones that only look plural map to
+# themselves, irregular plurals to their singular
+STEM_EXCEPTIONS = {
+    'series': 'series', 'species': 'species', 'news': 'news', 'lens': 'lens', 'means': 'means',
+    'diabetes': 'diabetes', 'herpes': 'herpes', 'rabies': 'rabies', 'caries': 'caries', 'facies': 'facies',
+    'aids': 'aids', 'sars': 'sars', 'mers': 'mers', 'chaos': 'chaos', 'atlas': 'atlas', 'bias': 'bias',
+    'canvas': 'canvas', 'physics': 'physics', 'mathematics': 'mathematics', 'economics': 'economics',
+    'statistics': 'statistics', 'logistics': 'logistics', 'ethics': 'ethics', 'dynamics': 'dynamics',
+    'mechanics': 'mechanics', 'robotics': 'robotics', 'analytics': 'analytics', 'electronics': 'electronics',
+    'acoustics': 'acoustics', 'optics': 'optics', 'genetics': 'genetics', 'graphics': 'graphics',
+    'movies': 'movie', 'cookies': 'cookie', 'calories': 'calorie', 'zombies': 'zombie', 'selfies': 'selfie',
+    'pies': 'pie', 'ties': 'tie', 'lies': 'lie', 'dies': 'die',
+    'caches': 'cache', 'niches': 'niche', 'avalanches': 'avalanche', 'headaches': 'headache', 'psyches': 'psyche',
+}
+_SIBILANT_ENDINGS = ('sses', 'xes', 'zzes', 'tzes', 'ches', 'shes')
+_NON_PLURAL_ENDINGS = ('ss', 'us', 'is', 'ous')
+# A word, with a trailing run of '+' / '#' kept when it ends the word ('c++', 'c#', but 'bim+gis' is two words)
+_KEYWORD_WORD_PATTERN = re.compile(r'[a-z0-9]+(?:[+#]+(?![a-z0-9]))?')
+
+# ==============================================================================
+#  1. NORMALIZATION PIPELINE
+# ==============================================================================
+def stem_word(word):
+    """
+    Conservative plural stemmer: 'networks' -> 'network', 'cities' -> 'city',
+    'processes' -> 'process'. Words that only look plural ('analysis',
+    'campus', 'glass', 'continuous', 'series') are left alone; see
+    STEM_EXCEPTIONS for the ones no suffix rule covers.
+    """
+    if len(word) <= MIN_STEM_LENGTH or not word.endswith('s') or word.endswith(_NON_PLURAL_ENDINGS):
+        return word
+    if word in STEM_EXCEPTIONS:
+        return STEM_EXCEPTIONS[word]
+    if word.endswith('ies') and not word.endswith(('aies', 'eies')):
+        return word[:-3] + 'y'
+    if word.endswith(_SIBILANT_ENDINGS):
+        return word[:-2]
+    return word[:-1]
+
+
+def keyword_words(text):
+    """
+    Accent-folded, lowercased words of a keyword. Punctuation separates words
+    ('Life-cycle' -> ['life', 'cycle']) except a trailing '+' or '#', so
+    'C++' and 'C#' stay distinct from 'C'.
+    """
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _KEYWORD_WORD_PATTERN.findall(text.lower())
+
+
+def load_synonyms(path):
+    """Reads a 'variant,canonical' CSV (no header) into a synonym table."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return {row[0]: row[1] for row in csv.reader(f) if len(row) >= 2 and not row[0].startswith('#')}
+
+
+class KeywordNormalizer:
+    """
+    Maps raw keywords to canonical ones. The pipeline drops a trailing
+    parenthesized acronym, folds accents and case, turns hyphens and other
+    punctuation into spaces ('Life-cycle' -> 'life cycle'), stems plurals (if `stem`) and then applies the synonym /
+    acronym table. Symbol-bearing terms such as 'C++' and 'C#' keep their
+    symbols. `keywords_plus` makes the WoS parser also index the
+    'Keywords Plus' column.
+
+    Results are cached, since the same keywords recur across records.
+    Instances are plain data, so they can be handed to worker processes.
+    """
+    def __init__(self, synonyms=None, stem=True, keywords_plus=False):
+        self.stem = stem
+        self.keywords_plus = keywords_plus
+        self._cache = {}
+        self.synonyms = {}
+        for variant, canonical in (DEFAULT_SYNONYMS if synonyms is None else synonyms).items():
+            self.synonyms[self._base_form(variant)] = self._base_form(canonical)
+
+    def _base_form(self, text):
+        # 'Building Information Modeling (BIM)': the spelled-out form is kept
+        text = text.strip()
+        if text.endswith(')') and text.find('(') > 0:
+            text = text[:text.rfind('(')]
+        words = keyword_words(text)
+        if self.stem:
+            words = [stem_word(word) for word in words]
+        return ' '.join(words)
+
+    def normalize(self, text):
+        """Canonical form of one keyword; '' for blank input."""
+        result = self._cache.get(text)
+        if result is None:
+            base = self._base_form(text)
+            result = self._cache[text] = self.synonyms.get(base, base)
+        return result
+
+    __call__ = normalize
+
+
+# ==============================================================================
+#  2. CO-OCCURRENCE AND INVERTED INDEX
+# ==============================================================================
+def _year(record):
+    year = record.get('publication_year', record.get('year'))
+    if isinstance(year, int):
+        return year
+    return int(year) if year and str(year).strip().isdigit() else None
+
+
+class KeywordIndex(TableSink):
+    """
+    In-memory keyword analytics over the records, keywords and
+    record_keywords tables. It can be fed as a sink while parsing or from
+    parsed data / exported CSVs. It maintains:
+
+    - an inverted index: keyword -> records (array of record codes),
+    - a sparse co-occurrence matrix: keyword -> {keyword: records sharing both},
+    - per-keyword year counts.
+
+    All of them are updated link by link, so queries never re-scan the links.
+    `top_cooccurring`, `top_keywords` and `trend` only touch one keyword's
+    row or one number per keyword.
+    """
+    def __init__(self, normalizer=None):
+        self.normalizer = normalizer
+        self._keywords = IdInterner()
+        self._records = IdInterner()
+        self.texts = []
+        self.by_text = {}
+        self.years = array('i')
+        self.postings = []
+        self.cooccurrence = []
+        self.trends = []
+        self._record_keywords = []
+
+    # --- building ---
+    def _keyword_code(self, keyword_id):
+        code = self._keywords.intern(keyword_id)
+        if code == len(self.postings):
+            self.texts.append(None)
+            self.postings.append(array('i'))
+            self.cooccurrence.append({})
+            self.trends.append({})
+        return code
+
+    def _record_code(self, record_id):
+        code = self._records.intern(record_id)
+        if code == len(self.years):
+            self.years.append(0)
+            self._record_keywords.append([])
+        return code
+
+    def add_keyword(self, keyword_id, text):
+        code = self._keyword_code(keyword_id)
+        self.texts[code] = text
+        if text:
+            self.by_text.setdefault(text, code)
+
+    def add_record(self, record_id, year):
+        code = self._record_code(record_id)
+        if year and not self.years[code]:
+            self.years[code] = year
+            # Links seen before the record row count for its year now
+            for keyword in self._record_keywords[code]:
+                trend = self.trends[keyword]
+                trend[year] = trend.get(year, 0) + 1
+
+    def add_link(self, record_id, keyword_id):
+        record, keyword = self._record_code(record_id), self._keyword_code(keyword_id)
+        linked = self._record_keywords[record]
+        if keyword in linked:
+            return
+        row = self.cooccurrence[keyword]
+        for other in linked:
+            row[other] = row.get(other, 0) + 1
+            other_row = self.cooccurrence[other]
+            other_row[keyword] = other_row.get(keyword, 0) + 1
+        linked.append(keyword)
+        self.postings[keyword].append(record)
+        year = self.years[record]
+        if year:
+            trend = self.trends[keyword]
+            trend[year] = trend.get(year, 0) + 1
+
+    def write(self, table_name, row):
+        if table_name == "record_keywords":
+            self.add_link(row["record_id"], row["keyword_id"])
+        elif table_name == "records":
+            self.add_record(row["record_id"], _year(row))
+        elif table_name == "keywords":
+            self.add_keyword(row["keyword_id"], row["keyword"])
+
+    @classmethod
+    def from_data(cls, data, normalizer=None):
+        """Index over `parse_file`-style data (lists of dicts or CompactTables)."""
+        index = cls(normalizer)
+        for table_name in ("keywords", "records", "record_keywords"):
+            index.write_table(table_name, data.get(table_name, []))
+        return index
+
+    @classmethod
+    def from_output_dir(cls, output_dir, normalizer=None):
+        """Index over the CSV tables the exporters wrote to `output_dir`."""
+        index = cls(normalizer)
+        for table_name in ("keywords", "records", "record_keywords"):
+            file_path = os.path.join(output_dir, f"{table_name}.csv")
+            if os.path.exists(file_path):
+                with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                    index.write_table(table_name, csv.DictReader(f))
+        return index
+
+    # --- persistence ---
+    def save(self, path):
+        """
+        Stores the keywords, record years and links (gzipped JSON); the
+        matrix and trends are rebuilt from them on load, without any CSV parsing.
+        """
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({"keywords": [self._keywords.values, self.texts],
+                       "records": [self._records.values, list(self.years)],
+                       "links": self._record_keywords}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, normalizer=None):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls(normalizer)
+        keyword_ids, texts = data["keywords"]
+        for keyword_id, text in zip(keyword_ids, texts):
+            index.add_keyword(keyword_id, text)
+        record_ids, years = data["records"]
+        for record_id, year, keywords in zip(record_ids, years, data["links"]):
+            index.add_record(record_id, year)
+            for keyword in keywords:
+                index.add_link(record_id, keyword_ids[keyword])
+        return index
+
+    # --- queries ---
+    def code(self, keyword):
+        """Code of a keyword given as text (normalized like at ingest time); None if unknown."""
+        code = self.by_text.get(keyword)
+        if code is None and self.normalizer is not None:
+            code = self.by_text.get(self.normalizer(keyword))
+        if code is None:
+            code = self.by_text.get(keyword.strip().lower())
+        return code
+
+    def _ranked(self, counts, k):
+        # Ties are broken by first appearance, so results are deterministic
+        top = heapq.nlargest(k, counts, key=lambda item: (item[1], -item[0]))
+        return [(self.texts[code], count) for code, count in top]
+
+    def top_cooccurring(self, keyword, k=10):
+        """The `k` keywords sharing the most records with `keyword`, as (keyword, count)."""
+        code = self.code(keyword)
+        if code is None:
+            return []
+        return self._ranked(self.cooccurrence[code].items(), k)
+
+    def top_keywords(self, k=10, year=None):
+        """The `k` keywords on the most records overall, or in `year`."""
+        if year is None:
+            counts = ((code, len(records)) for code, records in enumerate(self.postings))
+        else:
+            counts = ((code, trend.get(year, 0)) for code, trend in enumerate(self.trends))
+        return [item for item in self._ranked(counts, k) if item[1]]
+
+    def trend(self, keyword):
+        """{year: number of records} for `keyword`, in year order."""
+        code = self.code(keyword)
+        return dict(sorted(self.trends[code].items())) if code is not None else {}
+
+    def records_with(self, *keywords):
+        """IDs of the records carrying every one of `keywords`."""
+        codes = [self.code(keyword) for keyword in keywords]
+        if not codes or None in codes:
+            return []
+        codes.sort(key=lambda code: len(self.postings[code]))
+        matches = set(self.postings[codes[0]])
+        for code in codes[1:]:
+            matches.intersection_update(self.postings[code])
+        return [self._records.lookup(record) for record in sorted(matches)]
+
+    def __len__(self):
+        return len(self.postings)
+
+
+def load_or_build(output_dir, normalizer=None):
+    """
+    Index over an export directory, cached next to its tables. The cache is
+    rebuilt when record_keywords.csv is newer than it.
+    """
+    index_path = os.path.join(output_dir, INDEX_FILENAME)
+    links_path = os.path.join(output_dir, "record_keywords.csv")
+    if os.path.exists(index_path) and (not os.path.exists(links_path)
+                                       or os.path.getmtime(index_path) >= os.path.getmtime(links_path)):
+        return KeywordIndex.load(index_path, normalizer)
+    index = KeywordIndex.from_output_dir(output_dir, normalizer)
+    index.save(index_path)
+    return index
+
+
+# ==============================================================================
+#  3. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python keyword_index.py OUTPUT_DIR KEYWORD [K]")
+        sys.exit(1)
+    keyword_index = load_or_build(sys.argv[1], KeywordNormalizer())
+    keyword, k = sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    print(f"🔎 Top {k} keywords co-occurring with '{keyword}':")
+    for text, count in keyword_index.top_cooccurring(keyword, k):
+        print(f"  -> {text:<40} {count:>6}")
+    print(f"📈 Records per year for '{keyword}':")
+    for year, count in keyword_index.trend(keyword).items():
+        print(f"  -> {year}: {count}")
@@ -0,0 +1,160 @@
+import json
+import os
+import time
+
+# ==============================================================================
+#  1. METRICS REGISTRY
+# ==============================================================================
+class _StageTimer:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics, self.stage = metrics, stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Accumulates per-stage timings, counters and gauges for a parse or export.
+
+    Stages are named with dots, e.g. 'parse.csv_decode', 'parse.transform',
+    'entity.affiliations' (time spent creating new affiliations, which is
+    where AffiliationParser runs) or 'export.write'. Each callback is called
+    as callback(event_name, fields) for the events emitted along the way
+    ('progress', 'parse_complete', 'export_complete').
+    """
+    enabled = True
+
+    def __init__(self, callbacks=None, progress_every=0):
+        self.callbacks = list(callbacks or [])
+        # Emit a 'progress' event every N input rows (0 disables it)
+        self.progress_every = progress_every
+        self.timers, self.counters, self.gauges = {}, {}, {}
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+        return callback
+
+    def timer(self, stage):
+        """Context manager that adds the time spent in its block to `stage`."""
+        return _StageTimer(self, stage)
+
+    def add_time(self, stage, seconds, calls=1):
+        timer = self.timers.get(stage)
+        if timer is None:
+            timer = self.timers[stage] = [0.0, 0]
+        timer[0] += seconds
+        timer[1] += calls
+
+    def incr(self, counter, n=1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def gauge(self, name, value):
+        self.gauges[name] = value
+
+    def event(self, name, **fields):
+        for callback in self.callbacks:
+            callback(name, fields)
+
+    def merge(self, other):
+        """Adds the timers and counters of `other` (e.g. a worker process's metrics) to these."""
+        for stage, (seconds, calls) in other.timers.items():
+            self.add_time(stage, seconds, calls)
+        for counter, n in other.counters.items():
+            self.incr(counter, n)
+
+    def snapshot(self):
+        """Everything recorded so far, as a JSON-serializable dict."""
+        return {
+            "timers": {stage: {"seconds": round(secs, 6), "calls": calls} for stage, (secs, calls) in self.timers.items()},
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def write_json(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        self.timers, self.counters, self.gauges = {}, {}, {}
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullMetrics(Metrics):
+    """
+    The default when no metrics are requested. Every call is a no-op, and
+    hot loops check `enabled` so they skip instrumentation entirely.
+    """
+    enabled = False
+    _TIMER = _NullTimer()
+
+    def __init__(self):
+        super().__init__()
+
+    def timer(self, stage):
+        return self._TIMER
+
+    def add_time(self, stage, seconds, calls=1):
+        pass
+
+    def incr(self, counter, n=1):
+        pass
+
+    def gauge(self, name, value):
+        pass
+
+    def event(self, name, **fields):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+# ==============================================================================
+#  2. READY-MADE CALLBACKS
+# ==============================================================================
+def hit_rate(hits, misses):
+    lookups = hits + misses
+    return hits / lookups if lookups else None
+
+
+class JsonLinesReporter:
+    """Callback that appends every event as one JSON object per line."""
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, event, fields):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"event": event, "time": time.time(), **fields}, default=str) + '\n')
+
+
+def print_summary(event, fields):
+    """Callback that prints a per-stage breakdown when a parse or export finishes."""
+    if event not in ('parse_complete', 'export_complete'):
+        return
+    snapshot = fields.get("metrics", {})
+    print(f"📊 {event.replace('_', ' ')}:")
+    for stage, timer in sorted(snapshot.get("timers", {}).items()):
+        print(f"  -> {stage:<28} {timer['seconds']:>10.3f}s  ({timer['calls']:,} calls)")
+    for counter, value in sorted(snapshot.get("counters", {}).items()):
+        print(f"  -> {counter:<28} {value:>10,}")
+    for name, value in sorted(snapshot.get("gauges", {}).items()):
+        print(f"  -> {name:<28} {value:>10.3f}" if isinstance(value, float) else f"  -> {name:<28} {value!s:>10}")
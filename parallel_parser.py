@@ -0,0 +1,213 @@
+import csv
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from input_sources import is_seekable_file
+from metrics import Metrics
+from parser_core import ENTITY_ID_FIELDS, REFERENCE_FIELDS, new_processed_data
+
+# ==============================================================================
+#  1. ROW-ALIGNED SHARDING
+# ==============================================================================
+# Size of the window used when counting quote characters between two offsets.
+COUNT_WINDOW = 16 * 1024 * 1024
+# Shards smaller than this are not worth a process round-trip.
+MIN_SHARD_BYTES = 1024 * 1024
+
+
+def _count_quotes(buf, start, end):
+    total = 0
+    for pos in range(start, end, COUNT_WINDOW):
+        total += buf[pos:min(pos + COUNT_WINDOW, end)].count(b'"')
+    return total
+
+
+def _next_record_start(buf, pos, in_quotes, quoted=True):
+    """
+    Returns the offset just past the first newline at or after `pos` that is not
+    inside a quoted field. `in_quotes` is the quoting state at `pos`; with
+    quoted=False (unquoted exports) every newline ends a record.
+    """
+    while True:
+        newline = buf.find(b'\n', pos)
+        if newline == -1:
+            return len(buf)
+        if not quoted:
+            return newline + 1
+        in_quotes = (in_quotes + _count_quotes(buf, pos, newline)) % 2
+        if not in_quotes:
+            return newline + 1
+        pos = newline + 1
+
+
+def find_shards(filepath, num_shards, min_shard_bytes=MIN_SHARD_BYTES, quoted=True):
+    """
+    Splits a CSV export into at most `num_shards` byte ranges that each start and
+    end on a record boundary. Quoted fields may contain newlines: a newline only
+    ends a record when an even number of quote characters precede it within that
+    record. Returns (header_line, [(start, end), ...]).
+    """
+    size = os.path.getsize(filepath)
+    if size == 0:
+        return '', []
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        header_start = 3 if buf[:3] == b'\xef\xbb\xbf' else 0
+        data_start = _next_record_start(buf, header_start, 0, quoted)
+        header_text = buf[header_start:data_start].decode('utf-8')
+
+        shard_size = max((size - data_start) // max(num_shards, 1), min_shard_bytes)
+        shards, start = [], data_start
+        while start < size:
+            target = start + shard_size
+            if target >= size:
+                end = size
+            else:
+                in_quotes = _count_quotes(buf, start, target) % 2 if quoted else 0
+                end = _next_record_start(buf, target, in_quotes, quoted)
+            shards.append((start, end))
+            start = end
+    return header_text, shards
+
+
+# ==============================================================================
+#  2. SHARD WORKER
+# ==============================================================================
+def _parse_shard(parser_cls, filepath, fieldnames, start, end, skip_long_text=False, keyword_normalizer=None,
+                 ingested_records=None, collect_metrics=False):
+    """
+    Parses one byte range with a fresh parser. Returns its rows, its entity
+    stores, the record keys it ingested (incremental mode only) and its
+    metrics (None unless `collect_metrics`).
+    """
+    metrics = Metrics() if collect_metrics else None
+    parser = parser_cls(skip_long_text=skip_long_text, keyword_normalizer=keyword_normalizer, metrics=metrics)
+    new_keys = None
+    if ingested_records is not None:
+        # Records of earlier runs are skipped here; keys this shard adds go back to the parent
+        parser._ingested_records = _RecordingSet(ingested_records)
+    rows = parse_range(parser, filepath, fieldnames, start, end)
+    if ingested_records is not None:
+        new_keys = parser._ingested_records.added
+    return rows, parser._entities, new_keys, metrics
+
+
+def parse_range(parser, filepath, fieldnames, start, end):
+    """Parses the byte range [start, end) with `parser`, returning its record/link rows."""
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    # newline=None mirrors the universal-newline handling of the serial reader
+    reader = parser.open_reader(io.StringIO(text, newline=None), fieldnames=fieldnames)
+    rows = {table_name: [] for table_name in REFERENCE_FIELDS}
+    for table_name, row in parser._iter_reader(reader):
+        if table_name in rows:
+            rows[table_name].append(row)
+    return rows
+
+
+class _RecordingSet(set):
+    """Set that also lists the items added to it, in order."""
+    def __init__(self, items):
+        super().__init__(items)
+        self.added = []
+
+    def add(self, item):
+        super().add(item)
+        self.added.append(item)
+
+
+# ==============================================================================
+#  3. DETERMINISTIC ENTITY MERGE
+# ==============================================================================
+def merge_shard_results(parser, shard_results, reparse_shard):
+    """
+    Folds per-shard results into `parser`'s entity stores in shard order. The
+    first shard to see a natural key wins, exactly as in a serial run. IDs are
+    derived from the natural key, so shards agree on them; only IDs known
+    from an older index (see entity_index.py) can differ and get rewritten.
+
+    In incremental mode the shards' record keys are added to the parser's
+    set. A shard that ingested a record an earlier shard already took cannot
+    just drop it, since entities only that record introduced would remain;
+    `reparse_shard(i)` parses shard i again with `parser` itself, against the
+    merged state, and its rows are used instead. Shard metrics are added to
+    the parser's. Returns the concatenated record/link rows.
+    """
+    merged_rows = {table_name: [] for table_name in REFERENCE_FIELDS}
+    ingested = parser._ingested_records
+    for i, (rows, entities, new_keys, shard_metrics) in enumerate(shard_results):
+        if new_keys and any(key in ingested for key in new_keys):
+            for table_name, table_rows in reparse_shard(i).items():
+                merged_rows[table_name].extend(table_rows)
+            continue
+        if shard_metrics is not None:
+            parser.metrics.merge(shard_metrics)
+        if new_keys:
+            ingested.update(new_keys)
+        remap = {}
+        for table_name, shard_store in entities.items():
+            global_store = parser._entities[table_name]
+            known_ids = parser._known_ids[table_name] if parser._known_ids is not None else {}
+            id_field = ENTITY_ID_FIELDS[table_name]
+            for key, entity in shard_store.items():
+                existing = global_store.get(key)
+                if existing is None and key in known_ids:
+                    # Written by an earlier run: reuse its ID, do not emit it again
+                    if known_ids[key] != entity[id_field]:
+                        remap[entity[id_field]] = known_ids[key]
+                elif existing is None:
+                    global_store[key] = entity
+                elif existing[id_field] != entity[id_field]:
+                    remap[entity[id_field]] = existing[id_field]
+        for table_name, table_rows in rows.items():
+            id_fields = REFERENCE_FIELDS[table_name]
+            for row in table_rows:
+                if remap:
+                    for id_field in id_fields:
+                        if row.get(id_field) in remap:
+                            row[id_field] = remap[row[id_field]]
+                merged_rows[table_name].append(row)
+    return merged_rows
+
+
+def parse_file_parallel(parser, filepath, workers=None, shards_per_worker=4, min_shard_bytes=MIN_SHARD_BYTES):
+    """
+    Parallel counterpart of `parser.parse_file(filepath)`. The file is split into
+    row-aligned shards that are parsed in a process pool, then merged back into
+    `parser`'s stores so the result matches a serial run row for row. The
+    parser's incremental-mode record set (see entity_index.py) and its
+    metrics are honoured as in a serial run; 'progress' events are not emitted.
+    Compressed files and stdin cannot be split by byte offset and are parsed
+    serially.
+    """
+    if not is_seekable_file(filepath):
+        print(f"  -> '{filepath}' is not a plain file; parsing it serially.")
+        return parser.parse_file(filepath)
+    workers = workers or os.cpu_count() or 1
+    print(f"🚀 Starting parallel parsing for: {filepath} ({workers} workers)")
+    quoted = parser.CSV_OPTIONS.get('quoting') != csv.QUOTE_NONE
+    header_line, shards = find_shards(filepath, workers * shards_per_worker, min_shard_bytes, quoted)
+    fieldnames = parser.open_reader(io.StringIO(header_line, newline=None)).fieldnames or []
+    parser._validate_columns(fieldnames)
+
+    parser_cls = type(parser)
+    n = len(shards)
+    ingested = frozenset(parser._ingested_records) if parser._ingested_records is not None else None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        shard_results = pool.map(_parse_shard, [parser_cls] * n, [filepath] * n, [fieldnames] * n,
+                                 [start for start, _ in shards], [end for _, end in shards], [parser.skip_long_text] * n,
+                                 [parser.keyword_normalizer] * n, [ingested] * n, [parser.metrics.enabled] * n)
+        # Only used in incremental mode, for a shard that repeats a record of an earlier one
+        reparse_shard = lambda i: parse_range(parser, filepath, fieldnames, *shards[i])
+        merged_rows = merge_shard_results(parser, shard_results, reparse_shard)
+    if parser.metrics.enabled:
+        parser._report_parse(filepath)
+
+    processed_data = new_processed_data()
+    processed_data.update(merged_rows)
+    for table_name in ENTITY_ID_FIELDS:
+        processed_data[table_name] = list(parser._entities[table_name].values())
+    print(f"✅ Parallel parsing complete! ({n} shards)")
+    return processed_data
@@ -0,0 +1,493 @@
+import csv
+import io
+import operator
+import os
+import sys
+import time
+import uuid
+
+from affiliation_parser import get_affiliation_parser
+from input_sources import expand_inputs, open_input, read_header_line
+from metrics import NULL_METRICS, Metrics, hit_rate, print_summary
+
+# ==============================================================================
+#  1. SHARED TABLE LAYOUT
+# ==============================================================================
+TABLE_NAMES = ["records", "authors", "venues", "keywords", "affiliations", "record_authors", "record_keywords"]
+ENTITY_ID_FIELDS = {"venues": "venue_id", "authors": "author_id", "keywords": "keyword_id", "affiliations": "affiliation_id"}
+# Which ID columns of the streamed tables point at which entity table
+REFERENCE_FIELDS = {
+    "records": {"venue_id": "venues"},
+    "record_authors": {"author_id": "authors", "affiliation_id": "affiliations"},
+    "record_keywords": {"keyword_id": "keywords"},
+}
+# Column layout used when several sources are written to the same tables
+UNIFIED_COLUMNS = {
+    "records": ["record_id", "title", "abstract", "document_type", "publication_year", "doi", "eid", "wos_ut", "venue_id"],
+    "authors": ["author_id", "first_name", "last_name", "scopus_author_id", "wos_researcher_id", "orcid"],
+    "venues": ["venue_id", "venue_name", "venue_type", "issn"],
+    "keywords": ["keyword_id", "keyword"],
+    "affiliations": ["affiliation_id", "institution_name", "city", "country"],
+    "record_authors": ["record_id", "author_id", "affiliation_id"],
+    "record_keywords": ["record_id", "keyword_id"],
+}
+
+
+# Namespace of the UUIDv5 entity IDs; changing it changes every ID
+ID_NAMESPACE = uuid.UUID('3b4f1f0e-8c5a-5d2b-9e61-7a0c2f9d4e18')
+
+
+def stable_id(table_name, key):
+    """
+    Content-addressed ID of the entity with natural key `key`: the same key
+    gets the same ID in every run, shard and worker.
+    """
+    return str(uuid.uuid5(ID_NAMESPACE, f"{table_name}:{key}"))
+
+
+def compact_id(entity_id):
+    """Signed 64-bit integer form of an entity ID (its first 8 bytes), for integer join keys."""
+    return int.from_bytes(uuid.UUID(entity_id).bytes[:8], 'big', signed=True)
+
+
+def new_processed_data():
+    return {table_name: [] for table_name in TABLE_NAMES}
+
+
+def to_unified_row(table_name, row):
+    """Maps a source-specific row onto UNIFIED_COLUMNS (WoS 'year' becomes an int publication_year)."""
+    if table_name == "records" and "year" in row:
+        year = row["year"]
+        row = dict(row, publication_year=int(year) if year and str(year).isdigit() else None)
+    return {column: row.get(column) for column in UNIFIED_COLUMNS[table_name]}
+
+
+# ==============================================================================
+#  2. PROJECTED CSV READER
+# ==============================================================================
+class ProjectedReader:
+    """
+    Drop-in for csv.DictReader that builds each row dict from only the
+    `columns` a parser reads. Their positions are resolved once from the
+    header (through `column_map`, so the keys are the parser's column names);
+    every other field is split by csv.reader but never copied into a dict.
+    Columns absent from the header are left out of the rows, like missing
+    keys, so `row.get(column, default)` behaves as before.
+    """
+    def __init__(self, csvfile, columns, fieldnames=None, column_map=None, **csv_options):
+        self.reader = csv.reader(csvfile, **csv_options)
+        self._fieldnames = fieldnames
+        self.columns = list(columns)
+        self.column_map = column_map or {}
+        self._names, self._indexes, self._getter, self._min_length = None, None, None, 0
+
+    @property
+    def fieldnames(self):
+        if self._fieldnames is None:
+            self._fieldnames = next(self.reader, None)
+        return self._fieldnames
+
+    def _resolve(self):
+        # Duplicate header names resolve to the last one, as in DictReader
+        positions = {self.column_map.get(name, name): i for i, name in enumerate(self.fieldnames or [])}
+        self._names = [column for column in self.columns if column in positions]
+        self._indexes = [positions[column] for column in self._names]
+        self._min_length = max(self._indexes, default=-1) + 1
+        if len(self._indexes) == 1:
+            index = self._indexes[0]
+            self._getter = lambda row: (row[index],)
+        else:
+            # itemgetter() with no index is invalid, and with one returns a bare value
+            self._getter = operator.itemgetter(*self._indexes) if self._indexes else (lambda row: ())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._names is None:
+            self._resolve()
+        row = next(self.reader)
+        # csv.DictReader skips blank lines
+        while row == []:
+            row = next(self.reader)
+        if len(row) >= self._min_length:
+            return dict(zip(self._names, self._getter(row)))
+        # Short row: fields past its end are None, as DictReader's restval
+        return {name: row[i] if i < len(row) else None for name, i in zip(self._names, self._indexes)}
+
+
+# ==============================================================================
+#  3. CORE PARSER ENGINE
+# ==============================================================================
+class BaseParser:
+    """
+    Engine shared by every source adapter: column validation, dedup stores,
+    incremental skipping and the streaming / collecting front-ends. Adapters
+    declare their header and implement `_parse_row`.
+    """
+    FORMAT_NAME = None
+    REQUIRED_COLUMNS = []
+    # Other columns `_parse_row` reads when present; anything else is never decoded
+    OPTIONAL_COLUMNS = []
+    # Free-text columns that `skip_long_text=True` leaves out
+    LONG_TEXT_COLUMNS = []
+    RECORD_KEY_COLUMN = None
+    DEFAULT_OUTPUT_DIR = 'output_csvs'
+    ENTITY_TABLES = list(ENTITY_ID_FIELDS)
+    # csv.reader options for the export, e.g. a tab delimiter
+    CSV_OPTIONS = {}
+    # Source header -> column name used by `_parse_row`
+    COLUMN_MAP = {}
+    # Whether an empty natural key still gets its own entity
+    CREATE_EMPTY_KEYS = False
+
+    def __init__(self, affiliation_parser=None, entities=None, metrics=None, skip_long_text=False, keyword_normalizer=None):
+        self.affiliation_parser = affiliation_parser or get_affiliation_parser()
+        self.skip_long_text = skip_long_text
+        # Callable mapping a raw keyword to its key (see keyword_index.KeywordNormalizer);
+        # by default keywords are only stripped and lower-cased
+        self.keyword_normalizer = keyword_normalizer
+        # Timers and counters (see metrics.py); the default records nothing
+        self.metrics = metrics or NULL_METRICS
+        # Passing `entities` lets several adapters share one set of dedup stores
+        self._entities = entities if entities is not None else {table_name: {} for table_name in ENTITY_ID_FIELDS}
+        self._venues, self._authors = self._entities["venues"], self._entities["authors"]
+        self._keywords, self._affiliations = self._entities["keywords"], self._entities["affiliations"]
+        # Entities created while parsing the current row, not yet emitted
+        self._new_entities = []
+        # Record keys already ingested, in incremental mode (see entity_index.py) or
+        # earlier in a MultiSourceParser batch; None parses every row
+        self._ingested_records = None
+        # {table_name: {natural key: ID}} of entities written by earlier runs; also incremental mode only.
+        # They are reused but never emitted, so they stay out of the dedup stores.
+        self._known_ids = None
+
+    def used_columns(self):
+        """The columns read from each row, in a fixed order."""
+        skipped = set(self.LONG_TEXT_COLUMNS) if self.skip_long_text else set()
+        return [column for column in dict.fromkeys(self.REQUIRED_COLUMNS + self.OPTIONAL_COLUMNS) if column not in skipped]
+
+    @classmethod
+    def canonical_fieldnames(cls, fieldnames):
+        return [cls.COLUMN_MAP.get(name, name) for name in fieldnames or []]
+
+    @classmethod
+    def matches_header(cls, fieldnames):
+        """Number of required columns present, or 0 if any is missing."""
+        present = set(cls.canonical_fieldnames(fieldnames))
+        return len(cls.REQUIRED_COLUMNS) if all(col in present for col in cls.REQUIRED_COLUMNS) else 0
+
+    def _validate_columns(self, fieldnames):
+        """Checks if all required columns are present in the CSV header."""
+        fieldnames = self.canonical_fieldnames(fieldnames)
+        missing_cols = [col for col in self.REQUIRED_COLUMNS if col not in fieldnames]
+        if missing_cols:
+            raise ValueError(f"CSV file is missing required columns: {', '.join(missing_cols)}")
+        print("✅ Column validation passed.")
+
+    def _get_or_create_entity(self, table_name, key, factory):
+        """Finds or creates the entity for `key` and queues new ones for emission."""
+        store = self._entities[table_name]
+        entity = store.get(key)
+        if entity is None:
+            if not key and not self.CREATE_EMPTY_KEYS:
+                return None
+            known_id = self._known_ids[table_name].get(key) if self._known_ids is not None else None
+            if known_id is not None:
+                if self.metrics.enabled:
+                    self.metrics.incr(f"entity_hits.{table_name}")
+                return {ENTITY_ID_FIELDS[table_name]: known_id}
+            if self.metrics.enabled:
+                with self.metrics.timer(f"entity.{table_name}"):
+                    entity = store[key] = factory()
+                self.metrics.incr(f"entities_created.{table_name}")
+            else:
+                entity = store[key] = factory()
+            self._new_entities.append((table_name, entity))
+        elif self.metrics.enabled:
+            self.metrics.incr(f"entity_hits.{table_name}")
+        return entity
+
+    def _keyword_links(self, record_id, keywords_str):
+        """
+        record_keywords rows for a ';'-separated keyword list, creating new
+        keywords. With a normalizer, variants that map to the same keyword
+        are linked to the record once.
+        """
+        links, seen = [], set()
+        normalize = self.keyword_normalizer
+        for kw_text in keywords_str.split(';'):
+            normalized_kw = normalize(kw_text) if normalize else kw_text.strip().lower()
+            if not normalized_kw or (normalize and normalized_kw in seen):
+                continue
+            seen.add(normalized_kw)
+            keyword = self._get_or_create_entity("keywords", normalized_kw, lambda: {
+                "keyword_id": stable_id("keywords", normalized_kw), "keyword": normalized_kw
+            })
+            links.append(("record_keywords", {"record_id": record_id, "keyword_id": keyword["keyword_id"]}))
+        return links
+
+    def _record_id(self, row):
+        """
+        ID of the record in `row`, derived from its EID / UT. Rows without one
+        are keyed on their full content, so an identical row gets the same ID.
+        """
+        record_key = row.get(self.RECORD_KEY_COLUMN)
+        if not record_key:
+            record_key = '\x1f'.join(row.get(column) or '' for column in self.used_columns())
+        return stable_id("records", record_key)
+
+    def _is_already_ingested(self, row):
+        """In incremental mode, reports (and remembers) records seen in earlier runs."""
+        if self._ingested_records is None:
+            return False
+        record_key = row.get(self.RECORD_KEY_COLUMN)
+        if not record_key:
+            return False
+        if record_key in self._ingested_records:
+            return True
+        self._ingested_records.add(record_key)
+        return False
+
+    def _parse_row(self, row):
+        """Transforms one CSV row into a list of (table_name, row) pairs."""
+        raise NotImplementedError
+
+    def open_reader(self, csvfile, fieldnames=None):
+        """A ProjectedReader over the columns this parser reads; rows carry canonical column names."""
+        return ProjectedReader(csvfile, self.used_columns(), fieldnames, self.COLUMN_MAP, **self.CSV_OPTIONS)
+
+    def iter_parse(self, filepath):
+        """
+        Streams the file as (table_name, row) pairs. Each entity is emitted once,
+        when first seen, ahead of the record and link rows that use it.
+        `filepath` may be gzip/bz2/xz/zstd-compressed, '-' for stdin, or a glob
+        whose matches are parsed in sorted order (see input_sources.py).
+        """
+        for path in expand_inputs([filepath]):
+            with open_input(path) as csvfile:
+                reader = self.open_reader(csvfile)
+                self._validate_columns(reader.fieldnames)
+                yield from self._iter_reader(reader)
+            if self.metrics.enabled:
+                self._report_parse(path)
+
+    def _iter_reader(self, reader):
+        """Parses every row of an already-validated reader."""
+        if self.metrics.enabled:
+            yield from self._iter_reader_instrumented(reader)
+            return
+        for row in reader:
+            parsed_rows = self._parse_row(row)
+            if self._new_entities:
+                yield from self._new_entities
+                self._new_entities = []
+            yield from parsed_rows
+
+    def _iter_reader_instrumented(self, reader):
+        """
+        `_iter_reader` with per-stage timing: 'parse.csv_decode' is the time
+        csv.reader takes to produce a row, 'parse.transform' the time in
+        `_parse_row` (which includes the nested 'entity.*' stages). Time the
+        consumer spends on the yielded rows is not counted.
+        """
+        metrics, clock = self.metrics, time.perf_counter
+        progress_every = metrics.progress_every
+        rows_in = 0
+        reader = iter(reader)
+        while True:
+            start = clock()
+            row = next(reader, None)
+            decoded = clock()
+            metrics.add_time('parse.csv_decode', decoded - start)
+            if row is None:
+                break
+            parsed_rows = self._parse_row(row)
+            metrics.add_time('parse.transform', clock() - decoded)
+            rows_in += 1
+            metrics.incr('rows.input')
+            if progress_every and rows_in % progress_every == 0:
+                metrics.event('progress', format=self.FORMAT_NAME, rows=rows_in)
+            if self._new_entities:
+                yield from self._new_entities
+                self._new_entities = []
+            for table_name, _ in parsed_rows:
+                metrics.incr(f"rows.{table_name}")
+            yield from parsed_rows
+
+    def _report_parse(self, filepath):
+        metrics = self.metrics
+        for table_name, store in self._entities.items():
+            metrics.gauge(f"entities.{table_name}", len(store))
+        for table_name in self._entities:
+            rate = hit_rate(metrics.counters.get(f"entity_hits.{table_name}", 0),
+                            metrics.counters.get(f"entities_created.{table_name}", 0))
+            if rate is not None:
+                metrics.gauge(f"entity_hit_rate.{table_name}", round(rate, 4))
+        cache = self.affiliation_parser.cache_info()
+        rate = hit_rate(cache["hits"], cache["misses"])
+        if rate is not None:
+            metrics.gauge("affiliation_cache_hit_rate", round(rate, 4))
+        metrics.event('parse_complete', format=self.FORMAT_NAME, filepath=filepath, metrics=metrics.snapshot())
+
+    def parse_file(self, filepath):
+        """Parses the whole file and returns every table as a list of dicts."""
+        print(f"🚀 Starting parsing for: {filepath}")
+        processed_data = new_processed_data()
+
+        for table_name, row in self.iter_parse(filepath):
+            if table_name not in self.ENTITY_TABLES:
+                processed_data[table_name].append(row)
+
+        # Finalize the data by converting helper dicts to lists
+        for table_name in self.ENTITY_TABLES:
+            processed_data[table_name] = list(self._entities[table_name].values())
+        print("✅ Parsing complete!")
+        return processed_data
+
+    def stream_file(self, filepath, sink):
+        """
+        Constant-memory alternative to `parse_file`. Rows are handed to `sink`
+        (see sinks.py) as they are produced; only the dedup stores stay resident.
+        The sink is not closed, so several files can share it.
+        """
+        print(f"🚀 Streaming parse for: {filepath}")
+        if self.metrics.enabled:
+            write, clock = self.metrics.add_time, time.perf_counter
+            for table_name, row in self.iter_parse(filepath):
+                start = clock()
+                sink.write(table_name, row)
+                write('export.write', clock() - start)
+        else:
+            for table_name, row in self.iter_parse(filepath):
+                sink.write(table_name, row)
+        print("✅ Streaming parse complete!")
+
+
+# ==============================================================================
+#  4. FORMAT REGISTRY AND AUTO-DETECTION
+# ==============================================================================
+FORMATS = {}
+
+
+def register_format(parser_cls):
+    """Class decorator that makes an adapter available to `detect_format`."""
+    FORMATS[parser_cls.FORMAT_NAME] = parser_cls
+    return parser_cls
+
+
+def available_formats():
+    # The built-in adapters register themselves on import
+    import scopus_csv_parser  # noqa: F401
+    import web_of_sci_csv_parser  # noqa: F401
+    return dict(FORMATS)
+
+
+def detect_format(header_line):
+    """
+    Returns the adapter class whose required columns all appear in the header,
+    preferring the one that requires the most. Each adapter reads the header
+    with its own delimiter, so CSV and tab-delimited exports are told apart.
+    """
+    best_cls, best_score = None, 0
+    for parser_cls in available_formats().values():
+        fieldnames = next(csv.reader(io.StringIO(header_line), **parser_cls.CSV_OPTIONS), [])
+        score = parser_cls.matches_header([name.strip() for name in fieldnames])
+        if score > best_score:
+            best_cls, best_score = parser_cls, score
+    return best_cls
+
+
+def detect_file_format(filepath):
+    parser_cls = detect_format(read_header_line(filepath))
+    if parser_cls is None:
+        raise ValueError(f"Could not detect the export format of '{filepath}'")
+    return parser_cls
+
+
+# ==============================================================================
+#  5. MIXED-SOURCE BATCHES
+# ==============================================================================
+class MultiSourceParser:
+    """
+    Parses a batch of exports in any registered format in one process. All
+    adapters share one affiliation cache and one set of dedup stores, so a
+    keyword, affiliation or ISSN seen in a Scopus file and a WoS file gets a
+    single ID. Rows are emitted in the UNIFIED_COLUMNS layout.
+
+    The adapters also share the set of record keys (EID / UT) parsed so far,
+    so a record exported in several files of the batch is emitted once, with
+    its links, from the first file that has it.
+    """
+    def __init__(self, affiliation_parser=None, metrics=None, keyword_normalizer=None):
+        self.affiliation_parser = affiliation_parser or get_affiliation_parser()
+        self.metrics = metrics
+        self.keyword_normalizer = keyword_normalizer
+        self._entities = {table_name: {} for table_name in ENTITY_ID_FIELDS}
+        self._ingested_records = set()
+        self._parsers = {}
+
+    def parser_for(self, filepath):
+        parser_cls = detect_file_format(filepath)
+        parser = self._parsers.get(parser_cls.FORMAT_NAME)
+        if parser is None:
+            parser = self._parsers[parser_cls.FORMAT_NAME] = parser_cls(self.affiliation_parser, entities=self._entities, metrics=self.metrics,
+                                                                   keyword_normalizer=self.keyword_normalizer)
+            parser._ingested_records = self._ingested_records
+            print(f"✅ Detected '{parser_cls.FORMAT_NAME}' export: {filepath}")
+        return parser
+
+    def iter_parse(self, filepaths):
+        """`filepaths` may contain globs, compressed exports and '-' for stdin (see input_sources.py)."""
+        for filepath in expand_inputs(filepaths):
+            for table_name, row in self.parser_for(filepath).iter_parse(filepath):
+                yield table_name, to_unified_row(table_name, row)
+
+    def stream_files(self, filepaths, sink):
+        for table_name, row in self.iter_parse(filepaths):
+            sink.write(table_name, row)
+
+    def parse_files(self, filepaths):
+        processed_data = new_processed_data()
+        for table_name, row in self.iter_parse(filepaths):
+            if table_name not in ENTITY_ID_FIELDS:
+                processed_data[table_name].append(row)
+        for table_name, store in self._entities.items():
+            processed_data[table_name] = [to_unified_row(table_name, entity) for entity in store.values()]
+        print("✅ Parsing complete!")
+        return processed_data
+
+
+# ==============================================================================
+#  6. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    from exporters import export_data_to_csv
+    # The adapters register with the importable module, not with __main__
+    from parser_core import MultiSourceParser
+
+    args = sys.argv[1:]
+    metrics, affiliation_cache = None, None
+    while args[:1] == ['--metrics'] or (args[:1] == ['--affiliation-cache'] and len(args) > 1):
+        if args[0] == '--metrics':
+            # Per-stage timings are printed and saved as JSON next to the tables
+            metrics = Metrics(callbacks=[print_summary])
+            args = args[1:]
+        else:
+            # Parsed affiliations are loaded from and saved back to this file, so later runs start warm
+            affiliation_cache, args = args[1], args[2:]
+    if len(args) < 2:
+        print("Usage: python parser_core.py [--metrics] [--affiliation-cache FILE] OUTPUT_DIR EXPORT [EXPORT ...]")
+        sys.exit(1)
+    try:
+        affiliation_parser = get_affiliation_parser(affiliation_cache)
+        data = MultiSourceParser(affiliation_parser, metrics=metrics).parse_files(args[1:])
+        if affiliation_cache:
+            affiliation_parser.save_cache()
+        export_data_to_csv(data, args[0], metrics=metrics)
+        if metrics:
+            metrics.write_json(os.path.join(args[0], 'metrics.json'))
+    except FileNotFoundError as e:
+        print(f"ERROR: The file was not found: {e.filename}")
+    except ValueError as e:
+        print(f"ERROR: A validation error occurred: {e}")
@@ -0,0 +1,264 @@
+import queue
+import sys
+import threading
+import time
+
+from input_sources import expand_inputs, open_input
+from parser_core import ENTITY_ID_FIELDS, MultiSourceParser, to_unified_row
+
+# Rows per queue item; batching keeps the per-row queue overhead negligible
+DEFAULT_BATCH_ROWS = 500
+# Batches each queue holds before its producer blocks (backpressure)
+DEFAULT_QUEUE_SIZE = 16
+# How often a blocked stage checks whether the pipeline was cancelled
+_POLL_SECONDS = 0.1
+_FILE_START, _FILE_END, _DONE = 'file_start', 'file_end', 'done'
+
+# ==============================================================================
+#  1. PROGRESS
+# ==============================================================================
+class PipelineProgress:
+    """
+    Live counters of one pipeline run. Each counter is written by a single
+    stage thread, so reading a snapshot from another thread needs no lock.
+    `busy` is the time a stage spent working and `blocked` the time it
+    waited on a full output queue (downstream is the bottleneck) or an empty
+    input queue (upstream is).
+    """
+    STAGES = ('decode', 'parse', 'write')
+
+    def __init__(self, filepaths=()):
+        self.files = list(filepaths)
+        self.files_done = 0
+        self.current_file = None
+        self.rows_decoded = self.rows_parsed = self.rows_written = 0
+        self.busy = dict.fromkeys(self.STAGES, 0.0)
+        self.blocked = dict.fromkeys(self.STAGES, 0.0)
+        self.state = 'pending'
+        self.error = None
+        self.started = self.finished = None
+
+    def snapshot(self):
+        elapsed = ((self.finished or time.time()) - self.started) if self.started else 0.0
+        return {
+            "state": self.state, "error": self.error,
+            "files_total": len(self.files), "files_done": self.files_done, "current_file": self.current_file,
+            "rows_decoded": self.rows_decoded, "rows_parsed": self.rows_parsed, "rows_written": self.rows_written,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_sec": round(self.rows_decoded / elapsed, 1) if elapsed else None,
+            "busy_seconds": {stage: round(secs, 3) for stage, secs in self.busy.items()},
+            "blocked_seconds": {stage: round(secs, 3) for stage, secs in self.blocked.items()},
+        }
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+def _group_by_table(batch):
+    """
+    Splits a batch of (table_name, row) pairs into per-table runs for
+    `write_table`. Entity tables come first, so rows never precede the
+    entities they reference; each table keeps its row order.
+    """
+    tables = {table_name: [] for table_name in ENTITY_ID_FIELDS}
+    for table_name, row in batch:
+        rows = tables.get(table_name)
+        if rows is None:
+            rows = tables[table_name] = []
+        rows.append(row)
+    return [(table_name, rows) for table_name, rows in tables.items() if rows]
+
+
+# ==============================================================================
+#  2. PIPELINED INGESTION
+# ==============================================================================
+class IngestPipeline:
+    """
+    Runs decode, parse and write as three stages joined by bounded queues;
+    decode and parse get their own threads, writing happens on the caller's:
+
+      decode: opens each export (decompressing it) and turns CSV text into row dicts,
+      parse:  runs the format's adapter over the rows, emitting unified table rows,
+      write:  hands those rows to `sink` (CSV, Parquet, database, ...).
+
+    Each queue holds at most `queue_size` batches of `batch_rows` rows, so a
+    fast stage blocks instead of buffering the whole file (backpressure) and
+    memory stays bounded. Each table receives the same rows, in the same
+    order, as with MultiSourceParser.stream_files; the sink gets them one
+    table at a time per batch, through `write_table`.
+
+    The stages overlap wherever one of them releases the GIL: reading and
+    decompressing input, writing files, database round trips and Arrow
+    conversion. The Python-level parse itself still runs on one core; use
+    parallel_parser for multi-core parsing of large plain files.
+    """
+    def __init__(self, sink, parser=None, batch_rows=DEFAULT_BATCH_ROWS, queue_size=DEFAULT_QUEUE_SIZE, progress=None):
+        self.sink = sink
+        self.parser = parser or MultiSourceParser()
+        self.batch_rows = batch_rows
+        self.queue_size = queue_size
+        self.progress = progress or PipelineProgress()
+        self._cancel = threading.Event()
+        self._errors = []
+
+    def cancel(self):
+        self._cancel.set()
+
+    # --- queue helpers that give up once the pipeline is cancelled ---
+    def _put(self, q, item, stage):
+        start = time.perf_counter()
+        while True:
+            if self._cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        self.progress.blocked[stage] += time.perf_counter() - start
+
+    def _get(self, q, stage):
+        start = time.perf_counter()
+        while True:
+            if self._cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                item = q.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                continue
+        self.progress.blocked[stage] += time.perf_counter() - start
+        return item
+
+    def _stage(self, target, *args):
+        """A thread running `target`; its error cancels the pipeline and is re-raised by `run`."""
+        def run():
+            try:
+                target(*args)
+            except PipelineCancelled:
+                pass
+            except BaseException as e:
+                self._errors.append(e)
+                self._cancel.set()
+        return threading.Thread(target=run, name=f"ingest-{target.__name__.strip('_')}", daemon=True)
+
+    # --- stages ---
+    def _decode(self, filepaths, out):
+        progress, batch_rows, clock = self.progress, self.batch_rows, time.perf_counter
+        for filepath in filepaths:
+            start = clock()
+            parser = self.parser.parser_for(filepath)
+            with open_input(filepath) as csvfile:
+                reader = parser.open_reader(csvfile)
+                parser._validate_columns(reader.fieldnames)
+                progress.busy['decode'] += clock() - start
+                self._put(out, (_FILE_START, filepath, parser), 'decode')
+                rows = iter(reader)
+                while True:
+                    start = clock()
+                    batch = [row for _, row in zip(range(batch_rows), rows)]
+                    progress.busy['decode'] += clock() - start
+                    if not batch:
+                        break
+                    progress.rows_decoded += len(batch)
+                    self._put(out, batch, 'decode')
+            self._put(out, (_FILE_END, filepath, parser), 'decode')
+        self._put(out, _DONE, 'decode')
+
+    def _parse(self, source, out):
+        progress, clock = self.progress, time.perf_counter
+        parser = None
+        while True:
+            item = self._get(source, 'parse')
+            if item is _DONE:
+                self._put(out, _DONE, 'parse')
+                return
+            if isinstance(item, tuple):
+                marker, filepath, parser = item
+                if marker == _FILE_START:
+                    progress.current_file = filepath
+                else:
+                    if parser.metrics.enabled:
+                        parser._report_parse(filepath)
+                    self._put(out, item, 'parse')
+                continue
+            start = clock()
+            parsed = [(table_name, to_unified_row(table_name, row)) for table_name, row in parser._iter_reader(item)]
+            progress.busy['parse'] += clock() - start
+            progress.rows_parsed += len(item)
+            self._put(out, parsed, 'parse')
+
+    def _write(self, source):
+        progress, clock, write_table = self.progress, time.perf_counter, self.sink.write_table
+        while True:
+            item = self._get(source, 'write')
+            if item is _DONE:
+                return
+            if isinstance(item, tuple):
+                progress.files_done += 1
+                continue
+            start = clock()
+            for table_name, rows in _group_by_table(item):
+                write_table(table_name, rows)
+            progress.busy['write'] += clock() - start
+            progress.rows_written += len(item)
+
+    def run(self, filepaths):
+        """
+        Ingests `filepaths` (globs, compressed files and '-' allowed) into the
+        sink, which is left open. Re-raises the first error of any stage.
+        """
+        filepaths = expand_inputs(filepaths)
+        progress = self.progress
+        progress.files, progress.state, progress.started = list(filepaths), 'running', time.time()
+        decoded, parsed = queue.Queue(self.queue_size), queue.Queue(self.queue_size)
+        threads = [self._stage(self._decode, filepaths, decoded), self._stage(self._parse, decoded, parsed)]
+        for thread in threads:
+            thread.start()
+        try:
+            # Writing stays on the calling thread, which owns the sink (sqlite3 connections are thread-bound)
+            self._stage(self._write, parsed).run()
+        except KeyboardInterrupt:
+            self.cancel()
+            raise
+        finally:
+            if self._errors:
+                self.cancel()
+            for thread in threads:
+                thread.join()
+            progress.finished = time.time()
+        if self._errors:
+            progress.state, progress.error = 'failed', f"{type(self._errors[0]).__name__}: {self._errors[0]}"
+            raise self._errors[0]
+        progress.state = 'cancelled' if self._cancel.is_set() else 'done'
+        return progress
+
+
+def run_pipeline(filepaths, sink, **options):
+    """Ingests `filepaths` into `sink` through an IngestPipeline and closes the sink."""
+    with sink:
+        return IngestPipeline(sink, **options).run(filepaths)
+
+
+# ==============================================================================
+#  3. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    from sinks import CsvSink
+
+    if len(sys.argv) < 3:
+        print("Usage: python pipeline.py OUTPUT_DIR EXPORT [EXPORT ...]")
+        sys.exit(1)
+    try:
+        result = run_pipeline(sys.argv[2:], CsvSink(sys.argv[1])).snapshot()
+    except FileNotFoundError as e:
+        print(f"ERROR: The file was not found: {e.filename}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"ERROR: A validation error occurred: {e}")
+        sys.exit(1)
+    print(f"✅ Ingested {result['files_done']} files, {result['rows_decoded']:,} input rows "
+          f"({result['rows_written']:,} table rows) in {result['elapsed_seconds']:.2f}s.")
+    for stage in PipelineProgress.STAGES:
+        print(f"  -> {stage:<7} busy {result['busy_seconds'][stage]:>8.2f}s   blocked {result['blocked_seconds'][stage]:>8.2f}s")
@@ -0,0 +1,324 @@
+import re
+import sys
+import unicodedata
+import zlib
+
+from parser_core import to_unified_row
+
+DOI_PREFIX_PATTERN = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]+')
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+# LSH buckets with more records than this (very common titles such as
+# 'Editorial') are split by first author; groups still larger are skipped
+MAX_BUCKET_SIZE = 100
+# Title words whose hash columns are kept; titles draw on a Zipf-like vocabulary
+TOKEN_CACHE_SIZE = 50000
+# Mersenne prime used by the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+
+# ==============================================================================
+#  1. MATCH KEYS
+# ==============================================================================
+def normalize_doi(doi):
+    """Lowercases a DOI and strips URL / 'doi:' prefixes; None if empty."""
+    if not doi:
+        return None
+    doi = DOI_PREFIX_PATTERN.sub('', doi.strip()).strip().lower()
+    return doi or None
+
+
+def normalize_text(text):
+    """Accent-folded, lowercased text with every run of punctuation collapsed to one space."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return NON_ALNUM_PATTERN.sub(' ', text.lower()).strip()
+
+
+def shingles(title):
+    """
+    Distinct words of the normalized title. Word shingles keep the sets small
+    (a title has ~10 of them), which keeps signing affordable in pure Python.
+    """
+    return set(normalize_text(title).split())
+
+
+# ==============================================================================
+#  2. MINHASH / LSH
+# ==============================================================================
+class MinHasher:
+    """
+    MinHash signatures over title shingles, bucketed with LSH banding. Two
+    titles share a bucket with high probability once their Jaccard similarity
+    passes roughly (1 / bands) ** (1 / rows), so only those pairs are compared.
+    """
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS, seed=1, cache_size=TOKEN_CACHE_SIZE):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm, self.bands, self.rows = num_perm, bands, num_perm // bands
+        # Deterministic permutation coefficients, so signatures are stable across runs
+        state = seed
+        self._coefficients = []
+        for _ in range(num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = state % (_PRIME - 1) + 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            self._coefficients.append((a, state % _PRIME))
+        # Shingle -> its value under every permutation; common words are hashed once
+        self._columns = {}
+        self.cache_size = cache_size
+
+    def _column(self, shingle):
+        column = self._columns.get(shingle)
+        if column is None:
+            if len(self._columns) >= self.cache_size:
+                self._columns.clear()
+            h = zlib.crc32(shingle.encode())
+            column = self._columns[shingle] = tuple([(a * h + b) % _PRIME for a, b in self._coefficients])
+        return column
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return None
+        return tuple(map(min, zip(*[self._column(shingle) for shingle in shingle_set])))
+
+    def band_keys(self, signature):
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent
+        root = item
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while item != root:
+            parent[item], item = root, parent.get(item, item)
+        return root
+
+    def union(self, a, b):
+        """Joins the two sets and returns the root that was kept."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # The earlier record stays the root, so it becomes the canonical one
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+        return root_a
+
+
+class _ClusterSummary:
+    """
+    Years, DOIs and first authors of the records in one cluster, so a fuzzy
+    merge can be checked against every member at once instead of only the
+    pair that matched (which would let clusters chain across years or DOIs).
+    """
+    __slots__ = ('min_year', 'max_year', 'dois', 'authors')
+
+    def __init__(self):
+        self.min_year = self.max_year = None
+        self.dois, self.authors = set(), set()
+
+    def add(self, year, doi, author):
+        if year is not None:
+            self.min_year = year if self.min_year is None else min(self.min_year, year)
+            self.max_year = year if self.max_year is None else max(self.max_year, year)
+        if doi:
+            self.dois.add(doi)
+        if author:
+            self.authors.add(author)
+
+    def compatible(self, other, year_tolerance):
+        """Whether every record of both clusters agrees on DOI, first author and year (within the tolerance)."""
+        if len(self.dois | other.dois) > 1 or len(self.authors | other.authors) > 1:
+            return False
+        years = [year for year in (self.min_year, self.max_year, other.min_year, other.max_year) if year is not None]
+        return not years or max(years) - min(years) <= year_tolerance
+
+    def update(self, other):
+        for year in (other.min_year, other.max_year):
+            self.add(year, None, None)
+        self.dois |= other.dois
+        self.authors |= other.authors
+
+
+# ==============================================================================
+#  3. CROSS-SOURCE DEDUPLICATION
+# ==============================================================================
+def first_authors(data):
+    """record_id -> normalized last name of the record's first listed author."""
+    last_names = {author['author_id']: normalize_text(author.get('last_name')) for author in data.get('authors', [])}
+    result = {}
+    for link in data.get('record_authors', []):
+        if link['record_id'] not in result:
+            result[link['record_id']] = last_names.get(link['author_id'], '')
+    return result
+
+
+def _publication_year(record):
+    year = record.get('publication_year', record.get('year'))
+    if isinstance(year, int):
+        return year
+    return int(year) if year and str(year).strip().isdigit() else None
+
+
+def _comparison_groups(members, records, authors, max_bucket_size):
+    """The groups of one LSH bucket whose members are compared pairwise."""
+    if len(members) <= max_bucket_size:
+        return [members]
+    by_author = {}
+    for i in members:
+        by_author.setdefault(authors.get(records[i]['record_id']) or '', []).append(i)
+    return [group for group in by_author.values() if 1 < len(group) <= max_bucket_size]
+
+
+def find_duplicates(data, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS, year_tolerance=1,
+                    max_bucket_size=MAX_BUCKET_SIZE):
+    """
+    Clusters the records of `data` that describe the same paper and returns
+    {record_id: canonical_record_id} for every record that is merged away.
+
+    Records are linked on normalized DOI first. Records left without a DOI
+    match fall back to MinHash/LSH on the title: a candidate pair is merged
+    when the estimated title similarity reaches `threshold`, the years are at
+    most `year_tolerance` apart and the first authors' last names agree, and
+    the same holds between every record of the two clusters being joined.
+    LSH buckets larger than `max_bucket_size` are only compared within
+    first-author groups of at most that size, so work stays linear in the
+    number of records even for titles shared by thousands of them.
+    """
+    records = data.get('records', [])
+    clusters = _UnionFind()
+
+    by_doi = {}
+    for i, record in enumerate(records):
+        doi = normalize_doi(record.get('doi'))
+        if doi is None:
+            continue
+        if doi in by_doi:
+            clusters.union(by_doi[doi], i)
+        else:
+            by_doi[doi] = i
+
+    hasher = MinHasher(num_perm, bands)
+    authors = first_authors(data)
+    signatures, buckets = {}, {}
+    for i, record in enumerate(records):
+        signature = hasher.signature(shingles(record.get('title')))
+        if signature is None:
+            continue
+        signatures[i] = signature
+        for band_key in hasher.band_keys(signature):
+            buckets.setdefault(band_key, []).append(i)
+
+    summaries = {}
+    for i, record in enumerate(records):
+        summary = summaries.get(clusters.find(i))
+        if summary is None:
+            summary = summaries[clusters.find(i)] = _ClusterSummary()
+        summary.add(_publication_year(record), normalize_doi(record.get('doi')), authors.get(record['record_id']))
+
+    compared = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for group in _comparison_groups(members, records, authors, max_bucket_size):
+            for n, i in enumerate(group):
+                for j in group[n + 1:]:
+                    root_i, root_j = clusters.find(i), clusters.find(j)
+                    if (i, j) in compared or root_i == root_j:
+                        continue
+                    compared.add((i, j))
+                    if (_is_fuzzy_match(records[i], records[j], signatures[i], signatures[j], authors, threshold, year_tolerance)
+                            and summaries[root_i].compatible(summaries[root_j], year_tolerance)):
+                        root = clusters.union(i, j)
+                        summaries[root].update(summaries.pop(root_j if root == root_i else root_i))
+
+    return {records[i]['record_id']: records[clusters.find(i)]['record_id']
+            for i in range(len(records)) if clusters.find(i) != i}
+
+
+def _is_fuzzy_match(record_a, record_b, sig_a, sig_b, authors, threshold, year_tolerance):
+    doi_a, doi_b = normalize_doi(record_a.get('doi')), normalize_doi(record_b.get('doi'))
+    if doi_a and doi_b and doi_a != doi_b:
+        return False
+    year_a, year_b = _publication_year(record_a), _publication_year(record_b)
+    if year_a is not None and year_b is not None and abs(year_a - year_b) > year_tolerance:
+        return False
+    author_a, author_b = authors.get(record_a['record_id']), authors.get(record_b['record_id'])
+    if author_a and author_b and author_a != author_b:
+        return False
+    return MinHasher.similarity(sig_a, sig_b) >= threshold
+
+
+def merge_records(data, duplicates):
+    """
+    Collapses each duplicate cluster into its canonical record (the first one
+    parsed). Empty fields of the canonical record are filled from the merged
+    ones, so it carries both the EID and the WoS UT. Link rows are re-pointed
+    and de-duplicated. Returns a new data dict in the unified column layout.
+    """
+    merged = {}
+    for record in data.get('records', []):
+        record = to_unified_row('records', record)
+        canonical_id = duplicates.get(record['record_id'], record['record_id'])
+        canonical = merged.get(canonical_id)
+        if canonical is None:
+            merged[canonical_id] = record
+            continue
+        for column, value in record.items():
+            if canonical.get(column) in (None, '') and value not in (None, ''):
+                canonical[column] = value
+
+    result = {table_name: [to_unified_row(table_name, row) for row in rows] for table_name, rows in data.items()
+              if table_name not in ('records', 'record_authors', 'record_keywords')}
+    result['records'] = list(merged.values())
+    for table_name in ('record_authors', 'record_keywords'):
+        seen, links = set(), []
+        for link in data.get(table_name, []):
+            link = to_unified_row(table_name, link)
+            link['record_id'] = duplicates.get(link['record_id'], link['record_id'])
+            key = tuple(link.values())
+            if key not in seen:
+                seen.add(key)
+                links.append(link)
+        result[table_name] = links
+    return result
+
+
+def deduplicate(data, **options):
+    """Finds and merges cross-source duplicates; `options` go to `find_duplicates`."""
+    duplicates = find_duplicates(data, **options)
+    print(f"✅ Deduplication merged {len(duplicates)} of {len(data.get('records', []))} records.")
+    return merge_records(data, duplicates)
+
+
+# ==============================================================================
+#  4. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    from exporters import export_data_to_csv
+    from parser_core import MultiSourceParser
+
+    if len(sys.argv) < 3:
+        print("Usage: python record_dedup.py OUTPUT_DIR EXPORT [EXPORT ...]")
+        sys.exit(1)
+    try:
+        export_data_to_csv(deduplicate(MultiSourceParser().parse_files(sys.argv[2:])), sys.argv[1])
+    except FileNotFoundError as e:
+        print(f"ERROR: The file was not found: {e.filename}")
+    except ValueError as e:
+        print(f"ERROR: A validation error occurred: {e}")
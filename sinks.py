@@ -0,0 +1,104 @@
+import csv
+import os
+
+# ==============================================================================
+#  1. STREAMING TABLE SINKS
+# ==============================================================================
+class TableSink:
+    """
+    Receives parsed rows one at a time as (table_name, row) pairs.
+    Subclasses decide where the rows go; nothing is buffered here.
+    """
+    def write(self, table_name, row):
+        raise NotImplementedError
+
+    def write_table(self, table_name, rows):
+        """Writes a whole table (a list of dicts or a compact_store.CompactTable)."""
+        for row in rows:
+            self.write(table_name, row)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MemorySink(TableSink):
+    """Collects rows into the same dict-of-lists layout `parse_file` returns."""
+    def __init__(self):
+        self.data = {}
+
+    def write(self, table_name, row):
+        self.data.setdefault(table_name, []).append(row)
+
+
+class CallbackSink(TableSink):
+    """Forwards every row to a user-provided callable(table_name, row)."""
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, table_name, row):
+        self.callback(table_name, row)
+
+
+class CsvSink(TableSink):
+    """
+    Writes each table to '<output_dir>/<table_name>.csv' as rows arrive.
+    Files are opened lazily, so tables that never receive a row are not created.
+    With append=True, rows are added to existing files under their current header.
+    """
+    def __init__(self, output_dir, append=False):
+        self.output_dir = output_dir
+        self.append = append
+        self._files, self._writers, self.row_counts = {}, {}, {}
+        if not os.path.exists(output_dir): os.makedirs(output_dir)
+
+    def _existing_header(self, file_path):
+        if not self.append or not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            return None
+        with open(file_path, 'r', newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), None)
+
+    def _open_writer(self, table_name, row):
+        file_path = os.path.join(self.output_dir, f"{table_name}.csv")
+        header = self._existing_header(file_path)
+        if header:
+            f = open(file_path, 'a', newline='', encoding='utf-8')
+            writer = csv.DictWriter(f, fieldnames=header)
+        else:
+            f = open(file_path, 'w', newline='', encoding='utf-8')
+            writer = csv.DictWriter(f, fieldnames=row.keys())
+            writer.writeheader()
+        self._files[table_name] = f
+        return writer
+
+    def write(self, table_name, row):
+        writer = self._writers.get(table_name)
+        if writer is None:
+            writer = self._writers[table_name] = self._open_writer(table_name, row)
+        writer.writerow(row)
+        self.row_counts[table_name] = self.row_counts.get(table_name, 0) + 1
+
+    def write_table(self, table_name, rows):
+        rows = iter(rows)
+        writer = self._writers.get(table_name)
+        if writer is None:
+            first = next(rows, None)
+            if first is None:
+                return
+            self.write(table_name, first)
+            writer = self._writers[table_name]
+        count = self.row_counts.get(table_name, 0)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        self.row_counts[table_name] = count
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files, self._writers = {}, {}
@@ -0,0 +1,231 @@
+import csv
+import math
+import os
+import random
+import re
+import sys
+
+# ==============================================================================
+#  1. DISTRIBUTIONS OF THE BUNDLED EXPORTS
+# ==============================================================================
+# The bundled exports sit next to this module, wherever it is run from
+BUNDLED_DIR = os.path.dirname(os.path.abspath(__file__))
+SCOPUS_AUTHOR_PATTERN = re.compile(r'([^,]+),\s(.*?)\s\((\d+)\)')
+WOS_ADDRESS_PATTERN = re.compile(r'\[(.*?)\]\s*(.*?)(?=\s*\[|$)')
+WOS_ID_PATTERN = re.compile(r'^(.*)/(.*)$')
+
+
+def _split(value, sep=';'):
+    return [part.strip() for part in (value or '').split(sep) if part.strip()]
+
+
+def _tag(k):
+    """0 -> '', 1 -> 'b', 26 -> 'ba', ...: a short suffix that makes a clone distinct."""
+    letters = ''
+    while k:
+        k, r = divmod(k, 26)
+        letters = chr(ord('a') + r) + letters
+    return letters
+
+
+class Pool:
+    """
+    Values observed in the bundled file, resampled with clones so the number
+    of distinct entities grows with the corpus. Clone indexes are drawn
+    log-uniformly, which gives the Zipf-like skew of real bibliographies
+    (a few prolific authors and common keywords, a long tail of rare ones).
+    """
+    def __init__(self, values, clones=1):
+        self.values = values
+        self.clones = max(1, clones)
+
+    def sample(self, rng):
+        value = rng.choice(self.values)
+        k = int(self.clones ** rng.random()) - 1 if self.clones > 1 else 0
+        return value, k
+
+
+def _clone_count(observed_rows, target_rows):
+    """How many clones per observed value keep the entity/record ratio of the sample."""
+    return math.ceil(target_rows / observed_rows)
+
+
+class CorpusModel:
+    """Column values and per-record count distributions learned from one export."""
+    def __init__(self, path):
+        with open(path, mode='r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            self.fieldnames = reader.fieldnames
+            self.rows = list(reader)
+        if not self.rows:
+            raise ValueError(f"'{path}' has no rows to learn from")
+        self.author_counts, self.keyword_counts, self.keywords = [], [], []
+        for row in self.rows:
+            keywords = _split(row.get('Author Keywords'))
+            self.keyword_counts.append(len(keywords))
+            self.keywords.extend(keywords)
+        self.keywords = self.keywords or ['keyword']
+
+
+# ==============================================================================
+#  2. ROW GENERATORS
+# ==============================================================================
+class ScopusCorpus(CorpusModel):
+    FORMAT_NAME = 'scopus'
+
+    def __init__(self, path=os.path.join(BUNDLED_DIR, 'scopus.csv')):
+        super().__init__(path)
+        self.authors, self.affiliations = [], []
+        for row in self.rows:
+            affiliations = {}
+            for entry in _split(row.get('Authors with affiliations')):
+                parts = [p.strip() for p in entry.split(',')]
+                if len(parts) >= 3:
+                    affiliations[f"{parts[0]}, {parts[1]}"] = ', '.join(parts[2:])
+            names = [m.groups() for m in map(SCOPUS_AUTHOR_PATTERN.search, _split(row.get('Author full names'))) if m]
+            self.author_counts.append(len(names))
+            for last, first, author_id in names:
+                self.authors.append((last.strip(), first.strip(), author_id, f"{last.strip()}, {first.strip()}" in affiliations))
+            self.affiliations.extend(affiliations.values())
+        self.affiliations = self.affiliations or ['Unknown']
+
+    def generate(self, num_rows, rng):
+        authors = Pool(self.authors, _clone_count(len(self.rows), num_rows))
+        affiliations = Pool(self.affiliations, _clone_count(len(self.rows), num_rows))
+        keywords = Pool(self.keywords, _clone_count(len(self.rows), num_rows))
+        venues = Pool(self.rows, _clone_count(len(self.rows), num_rows) // 10)
+        for i in range(num_rows):
+            row = dict(rng.choice(self.rows))
+            venue, v = venues.sample(rng)
+            row['Source title'] = f"{venue['Source title']} {_tag(v)}".strip()
+            row['ISSN'] = f"{venue['ISSN']}{_tag(v)}" if venue.get('ISSN') else ''
+            row['EID'] = f"2-s2.0-SYN{i:012d}"
+            row['DOI'] = f"10.99999/syn.{i}"
+
+            full_names, with_affiliations, seen = [], [], set()
+            for _ in range(max(1, rng.choice(self.author_counts))):
+                (last, first, author_id, has_affiliation), k = authors.sample(rng)
+                if k:
+                    last, author_id = f"{last}-{_tag(k)}", f"{k}{author_id.zfill(12)}"
+                if author_id in seen:
+                    continue
+                seen.add(author_id)
+                full_names.append(f"{last}, {first} ({author_id})")
+                if has_affiliation:
+                    affiliation, a = affiliations.sample(rng)
+                    affiliation = f"{_tag(a).upper()} {affiliation}" if a else affiliation
+                    with_affiliations.append(f"{last}, {first}, {affiliation}")
+            row['Author full names'] = '; '.join(full_names)
+            row['Authors with affiliations'] = '; '.join(with_affiliations)
+            row['Affiliations'] = '; '.join(dict.fromkeys(a.split(', ', 2)[-1] for a in with_affiliations))
+            row['Author Keywords'] = _sample_keywords(keywords, self.keyword_counts, rng)
+            yield row
+
+
+class WebOfScienceCorpus(CorpusModel):
+    FORMAT_NAME = 'wos'
+
+    def __init__(self, path=os.path.join(BUNDLED_DIR, 'wos.csv')):
+        super().__init__(path)
+        self.authors, self.affiliations, self.affiliation_counts = [], [], []
+        for row in self.rows:
+            researcher_ids = dict(m.groups() for m in map(WOS_ID_PATTERN.match, _split(row.get('Researcher Ids'))) if m)
+            orcids = dict(m.groups() for m in map(WOS_ID_PATTERN.match, _split(row.get('ORCIDs'))) if m)
+            names = _split(row.get('Author Full Names'))
+            self.author_counts.append(len(names))
+            self.authors.extend((name, researcher_ids.get(name), orcids.get(name)) for name in names)
+            addresses = WOS_ADDRESS_PATTERN.findall(row.get('Addresses', ''))
+            self.affiliation_counts.append(len(addresses))
+            self.affiliations.extend(text.strip().rstrip(';').strip() for _, text in addresses)
+        self.affiliations = self.affiliations or ['Unknown']
+
+    def generate(self, num_rows, rng):
+        authors = Pool(self.authors, _clone_count(len(self.rows), num_rows))
+        affiliations = Pool(self.affiliations, _clone_count(len(self.rows), num_rows))
+        keywords = Pool(self.keywords, _clone_count(len(self.rows), num_rows))
+        venues = Pool(self.rows, _clone_count(len(self.rows), num_rows) // 10)
+        for i in range(num_rows):
+            row = dict(rng.choice(self.rows))
+            venue, v = venues.sample(rng)
+            row['Source Title'] = f"{venue['Source Title']} {_tag(v)}".strip()
+            row['ISSN'] = f"{venue['ISSN']}{_tag(v)}" if venue.get('ISSN') else ''
+            row['UT (Unique WOS ID)'] = f"WOS:SYN{i:012d}"
+            row['DOI'] = f"10.99999/syn.{i}"
+
+            names, researcher_ids, orcids = [], [], []
+            for _ in range(max(1, rng.choice(self.author_counts))):
+                (name, researcher_id, orcid), k = authors.sample(rng)
+                if k:
+                    last, _, first = name.partition(',')
+                    name = f"{last}-{_tag(k)},{first}"
+                    researcher_id = f"{researcher_id}{_tag(k)}" if researcher_id else None
+                    orcid = f"{orcid}{_tag(k)}" if orcid else None
+                if name in names:
+                    continue
+                names.append(name)
+                if researcher_id:
+                    researcher_ids.append(f"{name}/{researcher_id}")
+                if orcid:
+                    orcids.append(f"{name}/{orcid}")
+
+            groups = {}
+            for name in names:
+                text, k = affiliations.sample(rng)
+                if k:
+                    text = f"{_tag(k).upper()} {text}"
+                groups.setdefault(text, []).append(name)
+                if len(groups) >= max(1, rng.choice(self.affiliation_counts)):
+                    break
+            for name in names[sum(len(g) for g in groups.values()):]:
+                groups[next(iter(groups))].append(name)
+            row['Author Full Names'] = '; '.join(names)
+            row['Researcher Ids'] = '; '.join(researcher_ids)
+            row['ORCIDs'] = '; '.join(orcids)
+            row['Addresses'] = '; '.join(f"[{'; '.join(group)}] {text}" for text, group in groups.items())
+            row['Affiliations'] = '; '.join(text.split(', ', 1)[0] for text in groups)
+            row['Author Keywords'] = _sample_keywords(keywords, self.keyword_counts, rng)
+            yield row
+
+
+def _sample_keywords(pool, counts, rng):
+    keywords = []
+    for _ in range(rng.choice(counts)):
+        keyword, k = pool.sample(rng)
+        keyword = f"{keyword} {_tag(k)}" if k else keyword
+        if keyword not in keywords:
+            keywords.append(keyword)
+    return '; '.join(keywords)
+
+
+CORPORA = {'scopus': ScopusCorpus, 'wos': WebOfScienceCorpus}
+
+
+# ==============================================================================
+#  3. CORPUS WRITER
+# ==============================================================================
+def write_corpus(fmt, num_rows, output_path, seed=0, source_path=None):
+    """
+    Writes a synthetic `fmt` export of `num_rows` rows to `output_path`,
+    resampled from the bundled file (or `source_path`). The same seed always
+    produces the same file.
+    """
+    corpus = CORPORA[fmt](source_path) if source_path else CORPORA[fmt]()
+    rng = random.Random(seed)
+    with open(output_path, mode='w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=corpus.fieldnames, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        for row in corpus.generate(num_rows, rng):
+            writer.writerow(row)
+    return output_path
+
+
+# ==============================================================================
+#  4. MAIN EXECUTION BLOCK
+# ==============================================================================
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] not in CORPORA:
+        print(f"Usage: python synthetic_corpus.py {{{'|'.join(CORPORA)}}} NUM_ROWS OUTPUT_CSV [SEED]")
+        sys.exit(1)
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    write_corpus(sys.argv[1], int(sys.argv[2]), sys.argv[3], seed)
+    print(f"✅ Wrote {int(sys.argv[2]):,} synthetic {sys.argv[1]} rows to '{sys.argv[3]}'.")
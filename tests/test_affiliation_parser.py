@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import affiliation_parser
+from affiliation_parser import CACHE_VERSION, AffiliationParser
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return AffiliationParser()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('Xian Jiaotong Liverpool Univ, Dept Civil Engn, Suzhou 215123, Peoples R China',
+     ('Xian Jiaotong Liverpool Univ, Dept Civil Engn', 'Suzhou 215123', 'Peoples R China')),
+    ('Georgia Inst Technol, Atlanta, GA 30332 USA', ('Georgia Inst Technol, Atlanta', 'GA', 'United States')),
+    ('Georgia Inst Technol, GA 30332', ('Georgia Inst Technol', 'GA', 'United States')),
+    ('Acme Materials, Ltd', ('Acme Materials, Ltd', 'Unknown', 'Unknown')),
+    ('  Univ X  ', ('Univ X', 'Unknown', 'Unknown')),
+    ('', ('Unknown', 'Unknown', 'Unknown')),
+])
+def test_parse(parser, text, expected):
+    result = parser.parse(text)
+    assert (result["institution_name"], result["city"], result["country"]) == expected
+
+
+def test_cache_hits_return_copies():
+    parser = AffiliationParser(cache_size=2)
+    first = parser.parse('Univ X, Paris, France')
+    first["city"] = 'changed'
+    assert parser.parse(' Univ X, Paris, France ')["city"] == 'Paris'
+    parser.parse('Univ Y, Lyon, France')
+    parser.parse('Univ Z, Nice, France')
+    assert parser.cache_info() == {"hits": 1, "misses": 3, "size": 2, "max_size": 2}
+
+
+def test_saved_cache_is_reloaded(tmp_path):
+    cache_path = str(tmp_path / 'affiliations.json')
+    parser = AffiliationParser(cache_path=cache_path)
+    expected = [parser.parse(text) for text in ('Univ X, Paris, France', 'Univ Y, Lyon, France', 'Univ Z, Nice, France')]
+    parser.save_cache()
+
+    warm = AffiliationParser(cache_path=cache_path)
+    assert [warm.parse(text) for text in ('Univ X, Paris, France', 'Univ Y, Lyon, France', 'Univ Z, Nice, France')] == expected
+    assert warm.cache_info()["hits"] == 3
+    # Only the most recently used entries fit a smaller cache
+    small = AffiliationParser(cache_size=1)
+    assert small.load_cache(cache_path) == 1
+    assert small.parse('Univ Z, Nice, France') == expected[2] and small.cache_info()["hits"] == 1
+
+
+def test_disabled_cache_loads_nothing(tmp_path):
+    cache_path = str(tmp_path / 'affiliations.json')
+    parser = AffiliationParser()
+    parser.parse('Univ X, Paris, France')
+    parser.save_cache(cache_path)
+    assert AffiliationParser(cache_size=0).load_cache(cache_path) == 0
+
+
+@pytest.mark.parametrize("contents", [
+    [["Univ X, Paris, France", ["stale", "stale", "stale"]]],
+    {"version": CACHE_VERSION + 1, "entries": [["Univ X, Paris, France", ["stale", "stale", "stale"]]]},
+])
+def test_stale_cache_files_are_ignored(tmp_path, parser, contents):
+    cache_path = tmp_path / 'affiliations.json'
+    if isinstance(contents, dict):
+        contents["config"] = parser.cache_config
+    cache_path.write_text(json.dumps(contents), encoding='utf-8')
+    loaded = AffiliationParser(cache_path=str(cache_path))
+    assert loaded.cache_info()["size"] == 0
+    assert loaded.parse('Univ X, Paris, France')["city"] == 'Paris'
+
+
+def test_cache_of_another_configuration_is_ignored(tmp_path, parser):
+    class PatchedParser(AffiliationParser):
+        pass
+
+    cache_path = str(tmp_path / 'affiliations.json')
+    parser.parse('Univ X, Paris, France')
+    parser.save_cache(cache_path)
+    assert PatchedParser().load_cache(cache_path) == 0
+    assert AffiliationParser().load_cache(cache_path) > 0
+
+
+def test_shared_parser_takes_a_cache_path(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / 'affiliations.json')
+    AffiliationParser().save_cache(cache_path)
+    monkeypatch.setattr(affiliation_parser, '_shared_parser', None)
+    shared = affiliation_parser.get_affiliation_parser(cache_path)
+    assert shared.cache_path == cache_path and affiliation_parser.get_affiliation_parser() is shared
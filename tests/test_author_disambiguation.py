@@ -0,0 +1,80 @@
+import pytest
+
+from author_disambiguation import AuthorDisambiguator, block_key, names_compatible
+
+
+def _data(mentions, authors):
+    """Parsed tables from (record_id, venue_id, [(author_id, affiliation_id), ...]) tuples."""
+    return {
+        "records": [{"record_id": record_id, "title": record_id, "venue_id": venue_id}
+                    for record_id, venue_id, _ in mentions],
+        "authors": [{"author_id": author_id, "first_name": first_name, "last_name": last_name, **ids}
+                    for author_id, (first_name, last_name, ids) in authors.items()],
+        "record_authors": [{"record_id": record_id, "author_id": author_id, "affiliation_id": affiliation_id}
+                           for record_id, _, linked in mentions for author_id, affiliation_id in linked],
+    }
+
+
+def _author_of(result, record_id, last_name):
+    names = {author["author_id"]: author["last_name"] for author in result["authors"]}
+    return next(link["author_id"] for link in result["record_authors"]
+                if link["record_id"] == record_id and names[link["author_id"]] == last_name)
+
+
+AUTHORS = {
+    "chen-wei": ("Wei", "Chen", {}), "chen-w": ("W.", "Chen", {}),
+    "li-na": ("Na", "Li", {}), "wang-fang": ("Fang", "Wang", {}),
+}
+
+
+def test_same_name_in_same_venue_without_shared_evidence_is_split():
+    data = _data([("r1", "venue", [("chen-wei", "univ-a"), ("li-na", "univ-a")]),
+                  ("r2", "venue", [("chen-wei", "univ-b"), ("wang-fang", "univ-b")])], AUTHORS)
+    result = AuthorDisambiguator().disambiguate(data)
+    assert _author_of(result, "r1", "Chen") != _author_of(result, "r2", "Chen")
+
+
+def test_spellings_sharing_an_affiliation_are_merged():
+    data = _data([("r1", "venue-1", [("chen-wei", "univ-a")]),
+                  ("r2", "venue-2", [("chen-w", "univ-a")])], AUTHORS)
+    result = AuthorDisambiguator().disambiguate(data)
+    assert _author_of(result, "r1", "Chen") == _author_of(result, "r2", "Chen")
+    assert [(author["first_name"], author["last_name"]) for author in result["authors"]] == [("Wei", "Chen")]
+
+
+def test_spellings_sharing_a_coauthor_are_merged():
+    data = _data([("r1", None, [("chen-wei", None), ("li-na", None)]),
+                  ("r2", None, [("chen-w", None), ("li-na", None)])], AUTHORS)
+    result = AuthorDisambiguator().disambiguate(data)
+    assert _author_of(result, "r1", "Chen") == _author_of(result, "r2", "Chen")
+
+
+def test_similar_names_on_one_record_stay_apart():
+    data = _data([("r1", "venue", [("chen-wei", "univ-a"), ("chen-w", "univ-a")])], AUTHORS)
+    result = AuthorDisambiguator().disambiguate(data)
+    assert len({link["author_id"] for link in result["record_authors"]}) == 2
+
+
+def test_identified_author_keeps_its_id_and_clusters_persist(tmp_path):
+    state_path = str(tmp_path / 'clusters.json.gz')
+    authors = dict(AUTHORS, orcid=("Wei", "Chen", {"orcid": "0000-0002-1825-0097"}))
+    first = AuthorDisambiguator(state_path)
+    result = first.disambiguate(_data([("r1", "venue", [("orcid", "univ-a")])], authors))
+    assert _author_of(result, "r1", "Chen") == "orcid"
+    first.save()
+
+    result = AuthorDisambiguator(state_path).disambiguate(_data([("r2", "venue", [("chen-w", "univ-a")])], authors))
+    assert _author_of(result, "r2", "Chen") == "orcid"
+
+
+@pytest.mark.parametrize("given_a, given_b, compatible", [
+    (["john"], ["j"], True), (["john", "a"], ["john"], True), (["zhi", "hong"], ["zhihong"], True),
+    (["john"], ["james"], False), (["j", "a"], ["j", "b"], False), ([], ["john"], True),
+])
+def test_names_compatible(given_a, given_b, compatible):
+    assert names_compatible(given_a, given_b) is compatible
+
+
+def test_block_key():
+    assert block_key('Zhi-Hong', 'Chen') == 'chen z'
+    assert block_key('', 'Chen') == 'chen'
@@ -0,0 +1,53 @@
+import csv
+import os
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from batch_engine import parse_file_batched
+from scopus_csv_parser import ScopusParser
+from web_of_sci_csv_parser import WebOfScienceParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _with_edge_rows(tmp_path, filename, key_column, edge_rows):
+    """Copy of a bundled export with extra rows: the first row with `edge_rows` values patched in."""
+    with open(os.path.join(ROOT, filename), mode='r', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        fieldnames, rows = reader.fieldnames, list(reader)
+    for i, overrides in enumerate(edge_rows):
+        rows.append({**rows[0], key_column: f"EDGE-{i}", **overrides})
+    path = tmp_path / filename
+    with open(path, mode='w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+SCOPUS_EDGE_ROWS = [
+    {'Author full names': 'Doe,  (123); Roe, Rick (456)',
+     'Authors with affiliations': 'Doe, , Univ X, Paris, France; Roe, Rick, Univ Y, Lyon, France'},
+    {'Author full names': 'Doe, John (ABC); Doe, John (Jack) (789)', 'Authors with affiliations': ''},
+    {'Author full names': '', 'Authors with affiliations': 'Doe, J.', 'ISSN': '', 'Source title': ''},
+]
+
+WOS_EDGE_ROWS = [
+    {'Author Full Names': 'Doe, J.', 'Addresses': '[Doe, J.] ', 'Researcher Ids': '', 'ORCIDs': ''},
+    {'Author Full Names': 'Doe, J.', 'Addresses': '[] ; [Doe, J.]', 'Researcher Ids': 'Doe, J./X-1', 'ORCIDs': ''},
+    {'Author Full Names': 'Doe, J.; Roe, R.', 'Addresses': '[Doe, J.; Roe, R.] Univ X;  [Roe, R.]Univ Y [unclosed',
+     'Researcher Ids': '', 'ORCIDs': 'Roe, R./0000-0002-1825-0097'},
+    {'Author Full Names': '', 'Addresses': ''},
+]
+
+
+@pytest.mark.parametrize("parser_class, filename, key_column, edge_rows", [
+    (ScopusParser, 'scopus.csv', 'EID', SCOPUS_EDGE_ROWS),
+    (WebOfScienceParser, 'wos.csv', 'UT (Unique WOS ID)', WOS_EDGE_ROWS),
+])
+@pytest.mark.parametrize("chunksize", [3, 1000])
+def test_batch_matches_row_parser(tmp_path, parser_class, filename, key_column, edge_rows, chunksize):
+    path = _with_edge_rows(tmp_path, filename, key_column, edge_rows)
+    assert parse_file_batched(parser_class(), path, chunksize) == parser_class().parse_file(path)
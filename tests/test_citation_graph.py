@@ -0,0 +1,84 @@
+import csv
+
+import pytest
+
+from citation_graph import (CITATION_COLUMNS, CITATION_TABLE, CitationIndex, iter_citations, iter_citations_parallel,
+                            parse_reference)
+from parser_core import stable_id
+
+
+def _write_export(path, rows):
+    with open(path, mode='w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, CITATION_COLUMNS, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def _edges(rows):
+    return [(table_name, row["record_id"], row["cited_record_id"], row["reference_key"]) for table_name, row in rows]
+
+
+@pytest.fixture
+def export(tmp_path):
+    """A cites B (by bibliographic data) and C (by DOI), both later in the file; B cites A back."""
+    return _write_export(tmp_path / 'citations.csv', [
+        {"UT (Unique WOS ID)": 'WOS:A', "DOI": '10.1/a',
+         "Cited References": 'Bauthor X, 2020, J SOURCE, V5, P10; Cee Y, 2019, OTHER J, V1, P1, DOI 10.1/C; '
+                             'Unknown Z, 2001, NOWHERE, V1, P1'},
+        {"UT (Unique WOS ID)": 'WOS:B', "Authors": 'Bauthor, X; Other, Y', "Publication Year": '2020',
+         "Journal Abbreviation": 'J SOURCE', "Volume": '5', "Start Page": '10', "Cited References": 'DOI 10.1/A'},
+        {"UT (Unique WOS ID)": 'WOS:C', "DOI": 'https://doi.org/10.1/c'},
+    ])
+
+
+def test_references_resolve_in_both_directions(export):
+    a, b, c = (stable_id("records", ut) for ut in ('WOS:A', 'WOS:B', 'WOS:C'))
+    assert _edges(iter_citations([export])) == [
+        (CITATION_TABLE, a, b, 'ref:bauthor x|2020|j source|5|10'),
+        (CITATION_TABLE, a, c, 'doi:10.1/c'),
+        (CITATION_TABLE, a, None, 'ref:unknown z|2001|nowhere|1|1'),
+        (CITATION_TABLE, b, a, 'doi:10.1/a'),
+    ]
+    assert [row["cited_record_id"] for _, row in iter_citations([export], resolved_only=True)] == [b, c, a]
+
+
+def test_references_resolve_across_files(tmp_path, export):
+    later = _write_export(tmp_path / 'later.csv', [
+        {"UT (Unique WOS ID)": 'WOS:D', "Cited References": 'Unknown Z, 2001, NOWHERE, V1, P1; DOI 10.1/x'},
+        {"UT (Unique WOS ID)": 'WOS:E', "Authors": 'Unknown, Z', "Publication Year": '2001',
+         "Journal Abbreviation": 'NOWHERE', "Volume": '1', "Start Page": '1'},
+    ])
+    index = CitationIndex()
+    # Records of other sources are matched by DOI
+    index.add_records([{"record_id": 'scopus-x', "doi": '10.1/X'}])
+    rows = [row for _, row in iter_citations([export, later], index)]
+    assert rows[2]["cited_record_id"] == stable_id("records", 'WOS:E')
+    assert [row["cited_record_id"] for row in rows[4:]] == [stable_id("records", 'WOS:E'), 'scopus-x']
+
+
+def test_parallel_matches_serial(tmp_path):
+    rows = []
+    for i in range(300):
+        # Every record cites the next one by bibliographic data, the previous one by DOI and an outside work
+        rows.append({"UT (Unique WOS ID)": f"WOS:{i}", "DOI": f"10.1/{i}", "Authors": f"Author{i}, X; Other, Y",
+                     "Publication Year": '2020', "Journal Abbreviation": 'J TEST', "Volume": str(i), "Start Page": '1',
+                     "Cited References": f"Author{i + 1} X, 2020, J TEST, V{i + 1}, P1; DOI 10.1/{i - 1}; "
+                                         f"Outside O, 1999, BOOK,\nSECOND LINE"})
+    path = _write_export(tmp_path / 'citations.csv', rows)
+    expected = list(iter_citations([path]))
+    assert len(expected) == 900 and sum(row["cited_record_id"] is not None for _, row in expected) == 598
+    assert list(iter_citations_parallel(path, workers=2, min_shard_bytes=2000)) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('Abanda FH, 2015, AUTOMAT CONSTR, V57, P156, DOI 10.1016/j.autcon.2015.06.003',
+     ('Abanda FH', '2015', 'AUTOMAT CONSTR', '57', '156', '10.1016/j.autcon.2015.06.003')),
+    ('Smith J, 2019, J CLEAN PROD, V2, ARTN 118, DOI [10.1/A, 10.1/b]',
+     ('Smith J', '2019', 'J CLEAN PROD', '2', '118', '10.1/a')),
+    ('2018, WORLD REP', (None, '2018', 'WORLD REP', None, None, None)),
+    ('Lee K, VOLUME TITLE, P5', ('Lee K', None, 'VOLUME TITLE', None, '5', None)),
+])
+def test_parse_reference(text, expected):
+    ref = parse_reference(text)
+    assert (ref["author"], ref["year"], ref["source"], ref["volume"], ref["page"], ref["doi"]) == expected
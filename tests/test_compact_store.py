@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from compact_store import CompactSink, CompactStore, IdInterner, StringPool, parse_file_compact
+from exporters import export_data, export_data_to_csv
+from scopus_csv_parser import ScopusParser
+from web_of_sci_csv_parser import WebOfScienceParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _files(directory):
+    contents = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            contents[name] = f.read()
+    return contents
+
+
+@pytest.mark.parametrize("parser_class, filename", [(ScopusParser, 'scopus.csv'), (WebOfScienceParser, 'wos.csv')])
+def test_compact_tables_equal_parse_file(parser_class, filename):
+    expected = parser_class().parse_file(os.path.join(ROOT, filename))
+    compact = parse_file_compact(parser_class(), os.path.join(ROOT, filename))
+    assert list(compact) == list(expected)
+    assert {table_name: list(table) for table_name, table in compact.items()} == expected
+
+
+@pytest.mark.parametrize("parser_class, filename", [(ScopusParser, 'scopus.csv'), (WebOfScienceParser, 'wos.csv')])
+def test_compact_csv_export_equals_list_export(tmp_path, parser_class, filename):
+    export_data_to_csv(parser_class().parse_file(os.path.join(ROOT, filename)), str(tmp_path / 'lists'))
+    export_data_to_csv(parse_file_compact(parser_class(), os.path.join(ROOT, filename)), str(tmp_path / 'compact'))
+    assert _files(str(tmp_path / 'compact')) == _files(str(tmp_path / 'lists'))
+
+
+def test_compact_csv_sink_export_equals_list_export(tmp_path):
+    data = WebOfScienceParser().parse_file(os.path.join(ROOT, 'wos.csv'))
+    export_data(data, str(tmp_path / 'lists'))
+    export_data(parse_file_compact(WebOfScienceParser(), os.path.join(ROOT, 'wos.csv')), str(tmp_path / 'compact'))
+    assert _files(str(tmp_path / 'compact')) == _files(str(tmp_path / 'lists'))
+
+
+def test_table_behaves_like_a_list():
+    sink = CompactSink()
+    rows = [{"record_id": "r1", "author_id": "a1", "affiliation_id": None},
+            {"record_id": "r2", "author_id": "a1", "affiliation_id": "f1"}]
+    for row in rows:
+        sink.write("record_authors", row)
+    table = sink.data["record_authors"]
+    assert len(table) == 2 and bool(table)
+    assert list(table) == rows
+    assert table[0] == rows[0] and table[-1] == rows[1]
+    with pytest.raises(IndexError):
+        table[2]
+    assert list(table.iter_tuples()) == [("r1", "a1", None), ("r2", "a1", "f1")]
+    assert table.column("author_id") == ["a1", "a1"]
+    assert list(table.codes("affiliation_id")) == [-1, 0]
+    assert not CompactStore().table("records")
+
+
+def test_ids_are_interned_across_tables():
+    store = CompactStore()
+    store.table("authors").append({"author_id": "a1", "first_name": "Wei"})
+    store.table("record_authors").append({"record_id": "r1", "author_id": "a1", "affiliation_id": None})
+    assert len(store.interners["author_id"]) == 1
+    assert store.table("authors").codes("author_id")[0] == store.table("record_authors").codes("author_id")[0]
+
+
+def test_interner_and_string_pool():
+    interner = IdInterner()
+    assert [interner.intern(value) for value in ("b", "a", "b", None)] == [0, 1, 0, -1]
+    assert interner.lookup(1) == "a" and interner.lookup(-1) is None
+    pool = StringPool()
+    short, long = ''.join(['Ch', 'ina']), 'x' * 100
+    assert pool.intern(short) is pool.intern('China')
+    assert pool.intern(long) is long and pool.intern(5) == 5
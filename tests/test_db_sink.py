@@ -0,0 +1,80 @@
+import os
+import sqlite3
+
+import pytest
+
+from db_sink import DatabaseSink, LOAD_ORDER, load_data, to_integer
+from web_of_sci_csv_parser import WebOfScienceParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _dump(conn):
+    return {table_name: sorted(conn.execute(f"SELECT * FROM {table_name}").fetchall(), key=repr)
+            for table_name in LOAD_ORDER}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    yield conn
+    conn.close()
+
+
+def test_reingest_is_idempotent(conn):
+    data = WebOfScienceParser().parse_file(os.path.join(ROOT, 'wos.csv'))
+    load_data(data, conn)
+    first = _dump(conn)
+    load_data(WebOfScienceParser().parse_file(os.path.join(ROOT, 'wos.csv')), conn)
+    assert _dump(conn) == first
+    assert len(first["records"]) == len(data["records"])
+    assert len(first["record_authors"]) == len(data["record_authors"])
+
+
+def test_wos_years_are_stored_as_integers(conn):
+    load_data(WebOfScienceParser().parse_file(os.path.join(ROOT, 'wos.csv')), conn)
+    assert {row[0] for row in conn.execute("SELECT typeof(publication_year) FROM records")} <= {'integer', 'null'}
+
+
+@pytest.mark.parametrize("value, expected", [
+    (2021, 2021), ('2021', 2021), (' 2021 ', 2021), ('', None), (None, None), ('2021a', None), ('n.d.', None),
+])
+def test_to_integer(value, expected):
+    assert to_integer(value) == expected
+
+
+def test_mixed_source_upsert_keeps_stored_values(conn):
+    with DatabaseSink(conn) as sink:
+        sink.write("records", {"record_id": "scopus-1", "title": "T", "abstract": "Scopus abstract",
+                               "publication_year": "2020", "doi": "10.1/x", "eid": "2-s2.0-1"})
+        sink.write("authors", {"author_id": "author-1", "first_name": "J.", "last_name": "Doe",
+                               "scopus_author_id": "111"})
+    with DatabaseSink(conn) as sink:
+        # The same record from WoS after merging: new ID, the EID plus a UT, no abstract, year as text
+        sink.write("records", {"record_id": "merged-1", "title": "T", "abstract": "", "year": "2020",
+                               "doi": None, "eid": "2-s2.0-1", "wos_ut": "WOS:1"})
+        sink.write("authors", {"author_id": "author-2", "first_name": "", "last_name": "Doe",
+                               "scopus_author_id": "111", "orcid": "0000-0002-1825-0097"})
+        sink.write("record_authors", {"record_id": "merged-1", "author_id": "author-2", "affiliation_id": None})
+    assert conn.execute("SELECT * FROM records").fetchall() == [
+        ("scopus-1", "T", "Scopus abstract", None, 2020, "10.1/x", "2-s2.0-1", "WOS:1", None)]
+    assert conn.execute("SELECT * FROM authors").fetchall() == [
+        ("author-1", "J.", "Doe", "111", None, "0000-0002-1825-0097")]
+    assert conn.execute("SELECT * FROM record_authors").fetchall() == [("scopus-1", "author-1", None)]
+
+
+def test_failed_flush_is_rolled_back_and_kept_buffered(conn):
+    conn.execute("PRAGMA foreign_keys=ON")
+    sink = DatabaseSink(conn)
+    sink.write("records", {"record_id": "r1", "title": "T", "eid": "2-s2.0-1"})
+    sink.write("record_authors", {"record_id": "r1", "author_id": "a1", "affiliation_id": None})
+    with pytest.raises(sqlite3.IntegrityError):
+        sink.flush()
+    assert _dump(conn)["records"] == []
+    assert sink.row_counts == {}
+
+    sink.write("authors", {"author_id": "a1", "last_name": "Doe", "scopus_author_id": "111"})
+    sink.close()
+    assert conn.execute("SELECT record_id, title FROM records").fetchall() == [("r1", "T")]
+    assert conn.execute("SELECT * FROM record_authors").fetchall() == [("r1", "a1", None)]
+    assert sink.row_counts == {"authors": 1, "records": 1, "record_authors": 1}
@@ -0,0 +1,66 @@
+import csv
+import os
+
+from entity_index import INDEX_FILENAME, EntityIndex, ingest_incremental
+from parallel_parser import parse_file_parallel
+from web_of_sci_csv_parser import WebOfScienceParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WOS_PATH = os.path.join(ROOT, 'wos.csv')
+
+
+def _sizes(output_dir):
+    return {name: os.path.getsize(os.path.join(output_dir, name)) for name in sorted(os.listdir(output_dir))
+            if name.endswith('.csv')}
+
+
+def test_second_ingest_appends_nothing(tmp_path):
+    output_dir = str(tmp_path / 'out')
+    first = ingest_incremental(WebOfScienceParser(), WOS_PATH, output_dir)
+    sizes = _sizes(output_dir)
+    assert first["records"] > 0
+
+    assert ingest_incremental(WebOfScienceParser(), WOS_PATH, output_dir) == {}
+    assert _sizes(output_dir) == sizes
+
+
+def test_rows_of_an_interrupted_ingest_are_dropped(tmp_path):
+    output_dir = str(tmp_path / 'out')
+    ingest_incremental(WebOfScienceParser(), WOS_PATH, output_dir)
+    sizes = _sizes(output_dir)
+    # A run that appended rows but died before saving the index
+    for name in ('records.csv', 'record_authors.csv'):
+        with open(os.path.join(output_dir, name), 'a', encoding='utf-8') as f:
+            f.write('half-written,row\n')
+
+    assert ingest_incremental(WebOfScienceParser(), WOS_PATH, output_dir) == {}
+    assert _sizes(output_dir) == sizes
+
+
+def test_index_keeps_table_sizes(tmp_path):
+    output_dir = str(tmp_path / 'out')
+    ingest_incremental(WebOfScienceParser(), WOS_PATH, output_dir)
+    index = EntityIndex(os.path.join(output_dir, INDEX_FILENAME))
+    assert {f"{name}.csv": size for name, size in index.table_sizes.items() if size} == _sizes(output_dir)
+
+
+def test_parallel_incremental_matches_serial_with_repeated_records(tmp_path):
+    # The export twice over: with small shards, later shards repeat records of earlier ones.
+    # The repeats carry a keyword of their own, which a serial run never sees.
+    with open(WOS_PATH, mode='r', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        header, rows = reader.fieldnames, list(reader)
+    repeats = [dict(row, **{'Author Keywords': f"{row['Author Keywords']}; repeated record {i}"})
+               for i, row in enumerate(rows)]
+    path = str(tmp_path / 'wos_twice.csv')
+    with open(path, mode='w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows + repeats)
+
+    serial, parallel = WebOfScienceParser(), WebOfScienceParser()
+    EntityIndex(str(tmp_path / 'serial.json.gz')).attach(serial)
+    EntityIndex(str(tmp_path / 'parallel.json.gz')).attach(parallel)
+    expected = serial.parse_file(path)
+    assert parse_file_parallel(parallel, path, workers=2, min_shard_bytes=2000) == expected
+    assert len(expected["records"]) == len(rows)
@@ -0,0 +1,77 @@
+import os
+import uuid
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from compact_store import parse_file_compact
+from exporters import INT_COLUMNS, UUID_COLUMNS, ArrowIpcSink, ParquetSink, export_data, table_schema
+from parser_core import compact_id
+from scopus_csv_parser import ScopusParser
+from web_of_sci_csv_parser import WebOfScienceParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _read(output_dir, table_name, fmt):
+    if fmt == 'parquet':
+        return pq.read_table(os.path.join(output_dir, f"{table_name}.parquet"))
+    with pa.ipc.open_stream(os.path.join(output_dir, f"{table_name}.arrows")) as reader:
+        return reader.read_all()
+
+
+def _expected_value(column, value):
+    """What a row value reads back as: IDs as 16 UUID bytes, years as ints, '' only in text columns."""
+    if column in UUID_COLUMNS:
+        return uuid.UUID(value).bytes if value else None
+    if column in INT_COLUMNS:
+        return int(value) if value else None
+    return value
+
+
+def test_table_schema():
+    schema = table_schema(["record_id", "title", "publication_year", "document_type", "year"])
+    assert schema.types == [pa.binary(16), pa.string(), pa.int32(), pa.dictionary(pa.int32(), pa.string()), pa.int32()]
+    assert table_schema(["author_id", "scopus_author_id"], compact_ids=True).types == [pa.int64(), pa.string()]
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'arrow'])
+@pytest.mark.parametrize("parser_class, filename", [(ScopusParser, 'scopus.csv'), (WebOfScienceParser, 'wos.csv')])
+def test_columnar_export_round_trip(tmp_path, fmt, parser_class, filename):
+    data = parser_class().parse_file(os.path.join(ROOT, filename))
+    row_counts = export_data(data, str(tmp_path), fmt, batch_size=7)
+    assert row_counts == {table_name: len(rows) for table_name, rows in data.items() if rows}
+    for table_name, rows in data.items():
+        if not rows:
+            continue
+        table = _read(str(tmp_path), table_name, fmt)
+        assert table.schema.equals(table_schema(rows[0].keys()))
+        assert table.to_pylist() == [{column: _expected_value(column, value) for column, value in row.items()}
+                                     for row in rows]
+
+
+@pytest.mark.parametrize("sink_class, fmt", [(ParquetSink, 'parquet'), (ArrowIpcSink, 'arrow')])
+def test_compact_ids(tmp_path, sink_class, fmt):
+    data = WebOfScienceParser().parse_file(os.path.join(ROOT, 'wos.csv'))
+    with sink_class(str(tmp_path), compact_ids=True) as sink:
+        for row in data["record_authors"]:
+            sink.write("record_authors", row)
+    table = _read(str(tmp_path), "record_authors", fmt)
+    assert table.schema.types == [pa.int64()] * 3
+    assert table.column("author_id").to_pylist() == [compact_id(row["author_id"]) for row in data["record_authors"]]
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'arrow'])
+def test_compact_tables_export_like_row_lists(tmp_path, fmt):
+    path = os.path.join(ROOT, 'scopus.csv')
+    export_data(ScopusParser().parse_file(path), str(tmp_path / 'lists'), fmt, batch_size=10)
+    export_data(parse_file_compact(ScopusParser(), path), str(tmp_path / 'compact'), fmt, batch_size=10)
+    for table_name in ('records', 'authors', 'record_authors', 'affiliations'):
+        assert _read(str(tmp_path / 'compact'), table_name, fmt).equals(_read(str(tmp_path / 'lists'), table_name, fmt))
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_data({}, str(tmp_path), 'xlsx')
@@ -0,0 +1,151 @@
+import csv
+import os
+import re
+
+import pytest
+
+from field_tokenizers import id_suffix, iter_address_blocks, iter_scopus_affiliations, parse_scopus_author
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rows(filename):
+    with open(os.path.join(ROOT, filename), mode='r', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+# --- pinned outputs on the bundled exports ---
+def test_wos_addresses_golden():
+    rows = _rows('wos.csv')
+    assert list(iter_address_blocks(rows[0]['Addresses'])) == [
+        ('Chen, Zhonghao; Zhou, Xingyang; Yap, Pow-Seng',
+         'Xian Jiaotong Liverpool Univ, Dept Civil Engn, Suzhou 215123, Peoples R China'),
+        ('Chen, Zhonghao; Zhou, Xingyang', 'Univ Liverpool, Dept Civil Engn & Ind Design, Liverpool L69 3BX, England'),
+        ('Chen, Lin; Huang, Lepeng', 'Chongqing Univ, Sch Civil Engn, Chongqing 400045, Peoples R China'),
+        ('Chen, Lin; Huang, Lepeng',
+         'Chongqing Univ, Minist Educ, Key Lab New Technol Construct Cities Mt Area, Chongqing 400045, Peoples R China'),
+        ('Sandanayake, Malindu', 'Victoria Univ, Coll Sport Hlth & Engn, Melbourne, Vic 3011, Australia'),
+        ('Chen, Lin', 'Chongqing Univ, Corresponding Inst 1, Sch Civil Engn, Chongqing, Peoples R China'),
+    ]
+    assert sum(len(list(iter_address_blocks(row['Addresses']))) for row in rows) == 39
+
+
+def test_wos_ids_golden():
+    row = _rows('wos.csv')[0]
+    assert [id_suffix(entry.strip()) for entry in row['Researcher Ids'].split(';')] == [
+        'S-6115-2017', 'AEL-1865-2022', 'GZL-6070-2022', 'ABA-8842-2020']
+    assert [id_suffix(entry.strip()) for entry in row['ORCIDs'].split(';')] == [
+        '0000-0002-7056-9222', '0000-0003-2070-3013', '0000-0003-4303-7279', None]
+
+
+def test_scopus_golden():
+    rows = _rows('scopus.csv')
+    assert [parse_scopus_author(entry) for entry in rows[0]['Author full names'].split(';')] == [
+        ('Henao Rios', 'Laura M.', '57984835200'), ('Orobio', 'Armando', '57216295935'),
+        ('Campaña-Diaz', 'Wilmer', '55913723100')]
+    affiliation = 'School of Civil Engineering and Geomatics, Universidad del Valle, Cali, Cali, Colombia'
+    assert list(iter_scopus_affiliations(rows[0]['Authors with affiliations'])) == [
+        ('Henao Rios, Laura M.', affiliation), ('Orobio, Armando', affiliation), ('Campaña-Diaz, Wilmer', affiliation)]
+    assert sum(1 for row in rows for entry in row['Author full names'].split(';') if parse_scopus_author(entry)) == 49
+    assert sum(len(list(iter_scopus_affiliations(row['Authors with affiliations']))) for row in rows) == 50
+
+
+# --- agreement with the regex / split code the tokenizers replaced ---
+def _legacy_address_blocks(addresses):
+    return [(author_list, affil_text.strip().rstrip(';').strip())
+            for author_list, affil_text in re.findall(r'\[(.*?)\]\s*(.*?)(?=\s*\[|$)', addresses)]
+
+
+def _legacy_id_suffix(entry):
+    match = re.search(r'/(.*)$', entry)
+    return match.group(1) if match else None
+
+
+def _legacy_scopus_author(entry):
+    match = re.search(r'([^,]+),\s(.*?)\s\((\d+)\)', entry.strip())
+    return tuple(group.strip() for group in match.groups()) if match else None
+
+
+def _legacy_scopus_affiliations(value):
+    pairs = []
+    for entry in value.split(';'):
+        parts = [p.strip() for p in entry.strip().split(',')]
+        if len(parts) >= 3:
+            pairs.append((f"{parts[0]}, {parts[1]}".strip(), ', '.join(parts[2:]).strip()))
+    return pairs
+
+
+def test_addresses_match_legacy_regex():
+    values = [row['Addresses'] for row in _rows('wos.csv')]
+    assert [list(iter_address_blocks(v)) for v in values] == [_legacy_address_blocks(v) for v in values]
+
+
+def test_ids_match_legacy_regex():
+    values = [entry.strip() for row in _rows('wos.csv') for column in ('Researcher Ids', 'ORCIDs')
+              for entry in row[column].split(';')]
+    assert [id_suffix(v) for v in values] == [_legacy_id_suffix(v) for v in values]
+
+
+def test_scopus_authors_match_legacy_regex():
+    values = [entry for row in _rows('scopus.csv') for entry in row['Author full names'].split(';')]
+    assert [parse_scopus_author(v) for v in values] == [_legacy_scopus_author(v) for v in values]
+
+
+def test_scopus_affiliations_match_legacy_split():
+    values = [row['Authors with affiliations'] for row in _rows('scopus.csv')]
+    assert [list(iter_scopus_affiliations(v)) for v in values] == [_legacy_scopus_affiliations(v) for v in values]
+
+
+# --- pinned edge cases ---
+@pytest.mark.parametrize("addresses, blocks", [
+    ('', []),
+    ('Univ X, Paris, France', []),
+    ('[Doe, J.] ', [('Doe, J.', '')]),
+    ('[Doe, J.; Roe, R.] Univ X;  [Roe, R.]Univ Y, Lyon, France; ',
+     [('Doe, J.; Roe, R.', 'Univ X'), ('Roe, R.', 'Univ Y, Lyon, France')]),
+    ('[Doe, J.] Univ [X] Lab, Rome, Italy', [('Doe, J.', 'Univ'), ('X', 'Lab, Rome, Italy')]),
+    ('[Doe, J. [Roe, R.] Univ X', [('Doe, J. [Roe, R.', 'Univ X')]),
+    ('[Doe, J.] Univ X [unclosed', [('Doe, J.', 'Univ X')]),
+    ('[Doe, J.] Univ X [Roe, R.] Univ Y;;', [('Doe, J.', 'Univ X'), ('Roe, R.', 'Univ Y')]),
+    ('[Doe, J.] Univ X\n[Roe, R.] Univ Y\n', [('Doe, J.', 'Univ X'), ('Roe, R.', 'Univ Y')]),
+    ('[] ; [Doe, J.]', [('', ''), ('Doe, J.', '')]),
+])
+def test_address_blocks(addresses, blocks):
+    assert list(iter_address_blocks(addresses)) == blocks
+
+
+@pytest.mark.parametrize("entry, expected", [
+    ('', None), ('Doe, J.', None), ('Doe, J./', ''), ('Doe, J./A-1234-2010/x', 'A-1234-2010/x'),
+    ('/0000-0002-1825-0097', '0000-0002-1825-0097'), ('Doe,\nJ./A-1', 'A-1'),
+])
+def test_id_suffix(entry, expected):
+    assert id_suffix(entry) == expected
+
+
+@pytest.mark.parametrize("entry, expected", [
+    ('', None), ('Doe, John', None), ('Doe, John (ABC)', None), ('Doe,John (123)', None),
+    (',Doe, John (123)', ('Doe', 'John', '123')), ('Doe, (123)', None), ('Doe,  (123)', ('Doe', '', '123')),
+    ('Doe, John (Jack) (123)', ('Doe', 'John (Jack)', '123')), ('Doe, John(123) (456)', ('Doe', 'John(123)', '456')),
+    ('Doe, John (12a) x (34)', ('Doe', 'John (12a) x', '34')), ('Doe, J. Jr., III (99)', ('Doe', 'J. Jr., III', '99')),
+    ('Doe,\tJohn\t(7)', ('Doe', 'John', '7')), ('Doe, John\n(123)', ('Doe', 'John', '123')),
+    ('Doe, Jo\nhn (123)', None), ('Doe, John (123', None),
+])
+def test_scopus_author(entry, expected):
+    assert parse_scopus_author(entry) == expected
+
+
+@pytest.mark.parametrize("value, pairs", [
+    ('', []), ('Doe, J.', []), ('Doe, J., Univ X', [('Doe, J.', 'Univ X')]),
+    ('Doe, J., Univ X,Paris, France', [('Doe, J.', 'Univ X, Paris, France')]),
+    ('Doe, J., Univ X , Paris', [('Doe, J.', 'Univ X, Paris')]),
+    ('Doe, J., Univ X,  Paris', [('Doe, J.', 'Univ X, Paris')]),
+    ('Doe, J., Univ X, , Paris', [('Doe, J.', 'Univ X, , Paris')]),
+    ('Doe, J., Univ X,\tParis', [('Doe, J.', 'Univ X, Paris')]),
+    ('Doe, J., Univ X, ', [('Doe, J.', 'Univ X,')]),
+    ('Doe, J., , Paris', [('Doe, J.', ', Paris')]),
+    (' Doe , J. ,Univ X; Roe, R., Univ Y, Lyon;Doe, J., Univ Z',
+     [('Doe, J.', 'Univ X'), ('Roe, R.', 'Univ Y, Lyon'), ('Doe, J.', 'Univ Z')]),
+    ('Doe, J.,  Univ X', [('Doe, J.', 'Univ X')]),
+])
+def test_scopus_affiliations(value, pairs):
+    assert list(iter_scopus_affiliations(value)) == pairs
@@ -0,0 +1,140 @@
+import http.client
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from ingest_service import IngestService, allowed_hosts_for, make_server
+from parser_core import MultiSourceParser
+from pipeline import IngestPipeline, run_pipeline
+from sinks import CsvSink
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPORTS = [os.path.join(ROOT, 'scopus.csv'), os.path.join(ROOT, 'wos.csv')]
+
+
+def _files(directory):
+    contents = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            contents[name] = f.read()
+    return contents
+
+
+def _wait_for(service, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = service.job(job_id)
+        if job is None or job.progress.state in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+# --- pipeline ---
+@pytest.mark.parametrize("batch_rows, queue_size", [(500, 16), (3, 1)])
+def test_pipeline_output_equals_stream_files(tmp_path, batch_rows, queue_size):
+    with CsvSink(str(tmp_path / 'streamed')) as sink:
+        MultiSourceParser().stream_files(EXPORTS, sink)
+    progress = run_pipeline(EXPORTS, CsvSink(str(tmp_path / 'pipelined')), batch_rows=batch_rows, queue_size=queue_size)
+    assert _files(str(tmp_path / 'pipelined')) == _files(str(tmp_path / 'streamed'))
+    snapshot = progress.snapshot()
+    assert (snapshot["state"], snapshot["files_done"], snapshot["files_total"]) == ('done', 2, 2)
+    assert snapshot["rows_decoded"] == snapshot["rows_parsed"] > 0
+
+
+def test_pipeline_reraises_stage_errors(tmp_path):
+    unknown = tmp_path / 'unknown.csv'
+    unknown.write_text('Some,Other,Header\n1,2,3\n', encoding='utf-8')
+    pipeline = IngestPipeline(CsvSink(str(tmp_path / 'out')))
+    with pytest.raises(ValueError):
+        pipeline.run([os.path.join(ROOT, 'scopus.csv'), str(unknown)])
+    assert pipeline.progress.state == 'failed'
+
+
+# --- service ---
+@pytest.fixture
+def server():
+    server = make_server('127.0.0.1', 0, IngestService(max_finished_jobs=2))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=30)
+    headers = dict(headers or {})
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf-8')
+        headers.setdefault('Content-Type', 'application/json')
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    payload = json.loads(response.read() or b'null')
+    connection.close()
+    return response.status, payload
+
+
+def test_jobs_are_ingested(server, tmp_path):
+    output = str(tmp_path / 'out')
+    status, job = _request(server, 'POST', '/jobs', {"files": EXPORTS, "output": output})
+    assert status == 202 and job["state"] in ('pending', 'running', 'done')
+    _wait_for(server.RequestHandlerClass.service, job["job_id"])
+    status, job = _request(server, 'GET', f"/jobs/{job['job_id']}")
+    assert status == 200 and (job["state"], job["files_done"]) == ('done', 2)
+    assert 'records.csv' in os.listdir(output)
+    status, jobs = _request(server, 'GET', '/jobs')
+    assert status == 200 and [j["job_id"] for j in jobs] == [job["job_id"]]
+
+
+@pytest.mark.parametrize("body, content_type, status", [
+    ({"files": EXPORTS, "output": "out"}, 'text/plain', 415),
+    ({"files": EXPORTS}, 'application/json', 400),
+    ({"files": "scopus.csv", "output": "out"}, 'application/json', 400),
+    ({"files": EXPORTS, "output": "out", "format": "xml"}, 'application/json', 400),
+    (["scopus.csv"], 'application/json', 400),
+])
+def test_invalid_jobs_are_rejected(server, body, content_type, status):
+    assert _request(server, 'POST', '/jobs', body, {'Content-Type': content_type})[0] == status
+    assert _request(server, 'GET', '/jobs')[1] == []
+
+
+@pytest.mark.parametrize("host, status", [
+    ('127.0.0.1:{port}', 200), ('localhost:{port}', 200), ('LOCALHOST', 200), ('[::1]:{port}', 200),
+    ('attacker.example:{port}', 403), ('attacker.example', 403), ('127.0.0.1.attacker.example', 403),
+])
+def test_host_header_is_checked(server, host, status):
+    assert _request(server, 'GET', '/jobs', headers={'Host': host.format(port=server.server_port)})[0] == status
+
+
+def test_token_is_required_when_set(tmp_path):
+    server = make_server('127.0.0.1', 0, IngestService(), token='secret')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert _request(server, 'GET', '/jobs')[0] == 401
+        assert _request(server, 'GET', '/jobs', headers={'Authorization': 'Bearer wrong'})[0] == 401
+        assert _request(server, 'GET', '/jobs', headers={'Authorization': 'Bearer secret'})[0] == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_all_interfaces_require_a_token():
+    with pytest.raises(ValueError):
+        make_server('0.0.0.0', 0)
+    assert allowed_hosts_for('0.0.0.0') is None
+    assert allowed_hosts_for('0.0.0.0', ['ingest.lan']) == {'ingest.lan'}
+    assert allowed_hosts_for('10.0.0.5') == {'10.0.0.5'}
+
+
+def test_finished_jobs_are_evicted(tmp_path):
+    service = IngestService(max_finished_jobs=2)
+    jobs = [service.submit([os.path.join(ROOT, 'missing.csv')], str(tmp_path / f"out{i}")) for i in range(4)]
+    for job in jobs:
+        _wait_for(service, job.job_id)
+    assert [job.job_id for job in service.list_jobs()] == [job.job_id for job in jobs[2:]]
+    assert all(job.progress.state == 'failed' for job in jobs)
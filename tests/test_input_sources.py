@@ -0,0 +1,99 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import sys
+
+import pytest
+
+import input_sources
+from input_sources import expand_inputs, is_seekable_file, open_input, read_header_line
+from parser_core import MultiSourceParser
+from scopus_csv_parser import ScopusParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCOPUS = os.path.join(ROOT, 'scopus.csv')
+WOS = os.path.join(ROOT, 'wos.csv')
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _compress(path, suffix):
+    if suffix == '.zst':
+        zstandard = pytest.importorskip("zstandard")
+        return zstandard.ZstdCompressor().compress(_read_bytes(path))
+    return {'.gz': gzip, '.bz2': bz2, '.xz': lzma}[suffix].compress(_read_bytes(path))
+
+
+@pytest.fixture
+def stdin(monkeypatch):
+    """Replaces stdin with a binary stream; call it with the bytes to read."""
+    monkeypatch.setattr(input_sources, '_stdin_header', b'')
+
+    def feed(data):
+        monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BufferedReader(io.BytesIO(data))))
+    return feed
+
+
+@pytest.mark.parametrize("suffix", ['.gz', '.bz2', '.xz', '.zst'])
+def test_compressed_exports_parse_like_plain_files(tmp_path, suffix):
+    path = tmp_path / f"scopus.csv{suffix.upper() if suffix == '.gz' else suffix}"
+    path.write_bytes(_compress(SCOPUS, suffix))
+    assert not is_seekable_file(str(path))
+    assert read_header_line(str(path)) == read_header_line(SCOPUS)
+    assert ScopusParser().parse_file(str(path)) == ScopusParser().parse_file(SCOPUS)
+
+
+def test_open_input_matches_builtin_open(tmp_path):
+    empty = tmp_path / 'empty.csv'
+    empty.write_bytes(b'')
+    with open_input(SCOPUS) as f, open(SCOPUS, mode='r', encoding='utf-8-sig') as expected:
+        assert f.read() == expected.read()
+    with open_input(str(empty)) as f:
+        assert f.read() == ''
+    assert is_seekable_file(SCOPUS) and not is_seekable_file('-')
+
+
+def test_globs_expand_in_sorted_order(tmp_path):
+    for name in ('b.csv', 'a.csv', 'notes.txt'):
+        (tmp_path / name).write_bytes(_read_bytes(SCOPUS))
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'c.csv.gz').write_bytes(_compress(WOS, '.gz'))
+    pattern = str(tmp_path / '*.csv')
+    assert expand_inputs([pattern, '-', WOS]) == [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv'), '-', WOS]
+    assert expand_inputs([str(tmp_path / '**' / '*.csv*')]) == [
+        str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv'), str(tmp_path / 'sub' / 'c.csv.gz')]
+    assert MultiSourceParser().parse_files([pattern]) == MultiSourceParser().parse_files(
+        [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')])
+
+
+def test_unmatched_globs_and_literal_names(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(tmp_path / '*.csv')])
+    literal = tmp_path / 'export[1].csv'
+    literal.write_bytes(_read_bytes(SCOPUS))
+    assert expand_inputs([str(literal)]) == [str(literal)]
+    # A missing plain path fails only when it is opened
+    missing = str(tmp_path / 'missing.csv')
+    assert expand_inputs([missing]) == [missing]
+    with pytest.raises(FileNotFoundError):
+        ScopusParser().parse_file(missing)
+
+
+def test_stdin_parses_like_the_file(stdin):
+    stdin(_read_bytes(SCOPUS))
+    assert MultiSourceParser().parse_files(['-']) == MultiSourceParser().parse_files([SCOPUS])
+
+
+def test_stdin_header_is_replayed(stdin):
+    stdin(_read_bytes(SCOPUS))
+    header = read_header_line('-')
+    assert header == read_header_line('-') == read_header_line(SCOPUS)
+    with open_input('-') as f:
+        assert f.readline() == header
+    # stdin stays open for the caller
+    assert not sys.stdin.closed
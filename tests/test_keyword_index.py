@@ -0,0 +1,31 @@
+import pytest
+
+from keyword_index import KeywordNormalizer, stem_word
+
+
+@pytest.mark.parametrize("word, stem", [
+    ('networks', 'network'), ('cities', 'city'), ('processes', 'process'), ('boxes', 'box'), ('sizes', 'size'),
+    ('buzzes', 'buzz'), ('approaches', 'approach'), ('analysis', 'analysis'), ('campus', 'campus'),
+    ('glass', 'glass'), ('continuous', 'continuous'), ('gas', 'gas'),
+    ('series', 'series'), ('species', 'species'), ('news', 'news'), ('lens', 'lens'), ('diabetes', 'diabetes'),
+    ('statistics', 'statistics'), ('movies', 'movie'), ('caches', 'cache'),
+])
+def test_stem_word(word, stem):
+    assert stem_word(word) == stem
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ('Building Information Modelling (BIM)', 'building information modeling'),
+    ('BIM', 'building information modeling'),
+    ('Life-cycle assessments', 'life cycle assessment'),
+    ('Time series', 'time series'),
+    ('Optical lens', 'optical lens'),
+    ('C++', 'c++'), ('C#', 'c#'), ('C', 'c'), ('BIM+GIS', 'bim gis'),
+])
+def test_normalize(keyword, expected):
+    assert KeywordNormalizer()(keyword) == expected
+
+
+def test_symbol_terms_stay_distinct():
+    normalizer = KeywordNormalizer()
+    assert len({normalizer('C++'), normalizer('C#'), normalizer('C')}) == 3
@@ -0,0 +1,105 @@
+import csv
+import io
+import os
+
+import pytest
+
+from entity_index import EntityIndex
+from parallel_parser import find_shards, parse_file_parallel
+from scopus_csv_parser import ScopusParser
+from web_of_sci_csv_parser import WebOfScienceParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIN_SHARD_BYTES = 2000
+
+
+def _multiline_copy(tmp_path, filename, text_column, lineterminator='\n', repeat=3):
+    """
+    The bundled export `repeat` times over, with new record keys, quotes and
+    embedded newlines in `text_column` of every other row, and a BOM.
+    """
+    with open(os.path.join(ROOT, filename), mode='r', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header, rows = next(reader), list(reader)
+    text = header.index(text_column)
+    out = []
+    for i in range(repeat):
+        for j, row in enumerate(rows):
+            row = [f"{value}-{i}" if name in ('EID', 'UT (Unique WOS ID)') else value for name, value in zip(header, row)]
+            if j % 2 == 0:
+                row[text] = f'{row[text]}\n"quoted" line\r\nand, a comma'
+            out.append(row)
+    path = tmp_path / f"multiline_{filename}"
+    with open(path, mode='w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, lineterminator=lineterminator)
+        writer.writerow(header)
+        writer.writerows(out)
+    return str(path)
+
+
+@pytest.mark.parametrize("parser_class, filename, text_column", [
+    (ScopusParser, 'scopus.csv', 'Abstract'),
+    (WebOfScienceParser, 'wos.csv', 'Article Title'),
+])
+@pytest.mark.parametrize("lineterminator", ['\n', '\r\n'])
+def test_parallel_matches_serial(tmp_path, parser_class, filename, text_column, lineterminator):
+    path = _multiline_copy(tmp_path, filename, text_column, lineterminator)
+    assert len(find_shards(path, 8, MIN_SHARD_BYTES)[1]) > 2
+    expected = parser_class().parse_file(path)
+    assert parse_file_parallel(parser_class(), path, workers=2, min_shard_bytes=MIN_SHARD_BYTES) == expected
+
+
+def test_parallel_matches_serial_in_incremental_mode(tmp_path):
+    path = _multiline_copy(tmp_path, 'wos.csv', 'Article Title')
+    with open(path, mode='r', encoding='utf-8-sig') as f:
+        keys = [row['UT (Unique WOS ID)'] for row in csv.DictReader(f)]
+    parsers = []
+    for name in ('serial', 'parallel'):
+        index = EntityIndex(str(tmp_path / f"{name}.json.gz"))
+        # Every third record was ingested by an earlier run
+        index.records.update(keys[::3])
+        parser = WebOfScienceParser()
+        index.attach(parser)
+        parsers.append(parser)
+    serial, parallel = parsers
+    expected = serial.parse_file(path)
+    assert parse_file_parallel(parallel, path, workers=2, min_shard_bytes=MIN_SHARD_BYTES) == expected
+    assert len(expected["records"]) == len(keys) - len(keys[::3])
+    assert parallel._ingested_records == serial._ingested_records == set(keys)
+
+
+@pytest.mark.parametrize("lineterminator", ['\n', '\r\n'])
+@pytest.mark.parametrize("num_shards", [1, 3, 50])
+def test_shards_end_on_record_boundaries(tmp_path, lineterminator, num_shards):
+    path = _multiline_copy(tmp_path, 'scopus.csv', 'Abstract', lineterminator)
+    header_line, shards = find_shards(path, num_shards, min_shard_bytes=1)
+    with open(path, mode='r', encoding='utf-8-sig', newline='') as f:
+        expected = list(csv.reader(f))
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    assert next(csv.reader(io.StringIO(header_line))) == expected[0]
+    assert shards[0][0] == len(b'\xef\xbb\xbf' + header_line.encode('utf-8'))
+    assert shards[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(shards, shards[1:]))
+    # Each shard holds whole records: parsed alone, the shards give every record once
+    records = [record for start, end in shards
+               for record in csv.reader(io.StringIO(data[start:end].decode('utf-8'), newline=''))]
+    assert records == expected[1:]
+    assert len(shards) <= num_shards and (num_shards == 1 or len(shards) > 1)
+
+
+def test_unquoted_shards_split_on_every_newline(tmp_path):
+    path = tmp_path / 'unquoted.tsv'
+    path.write_bytes(b'A\tB\n' + b''.join(b'a"%d\tb\n' % i for i in range(100)))
+    header_line, shards = find_shards(str(path), 4, min_shard_bytes=1, quoted=False)
+    assert header_line == 'A\tB\n'
+    data = path.read_bytes()
+    assert b''.join(data[start:end] for start, end in shards) == data[len(header_line):]
+    assert all(data[end - 1:end] == b'\n' for _, end in shards)
+
+
+def test_empty_file_has_no_shards(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_bytes(b'')
+    assert find_shards(str(path), 4) == ('', [])
@@ -0,0 +1,63 @@
+import csv
+import gzip
+import os
+
+from parser_core import MultiSourceParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCOPUS = os.path.join(ROOT, 'scopus.csv')
+WOS = os.path.join(ROOT, 'wos.csv')
+
+
+def _rekeyed_copy(tmp_path, filename, key_column, rekeyed_rows):
+    """The bundled export with new record keys in its first `rekeyed_rows` rows."""
+    with open(os.path.join(ROOT, filename), mode='r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames, rows = reader.fieldnames, list(reader)
+    for row in rows[:rekeyed_rows]:
+        row[key_column] += '-copy'
+    path = tmp_path / f"copy_{filename}"
+    with open(path, mode='w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path), len(rows)
+
+
+class _ListSink:
+    def __init__(self):
+        self.rows = {}
+
+    def write(self, table_name, row):
+        self.rows.setdefault(table_name, []).append(row)
+
+
+def _record_keys(data):
+    return [record.get("eid") or record.get("wos_ut") for record in data["records"]]
+
+
+def test_records_in_several_files_are_emitted_once(tmp_path):
+    wos_gz = tmp_path / 'wos.csv.gz'
+    with open(WOS, 'rb') as f:
+        wos_gz.write_bytes(gzip.compress(f.read()))
+    expected = MultiSourceParser().parse_files([SCOPUS, WOS])
+    assert MultiSourceParser().parse_files([SCOPUS, WOS, SCOPUS, str(wos_gz)]) == expected
+    sink, single = _ListSink(), MultiSourceParser().parse_files([SCOPUS])
+    MultiSourceParser().stream_files([SCOPUS, SCOPUS], sink)
+    for table_name in ("records", "record_authors", "record_keywords"):
+        assert sink.rows[table_name] == single[table_name]
+
+
+def test_overlapping_exports_add_only_new_records(tmp_path):
+    copy, num_rows = _rekeyed_copy(tmp_path, 'scopus.csv', 'EID', 3)
+    single = MultiSourceParser().parse_files([SCOPUS])
+    data = MultiSourceParser().parse_files([SCOPUS, copy])
+    keys = _record_keys(data)
+    assert len(keys) == len(set(keys)) == num_rows + 3
+    assert keys[:num_rows] == _record_keys(single)
+    assert data["records"][:num_rows] == single["records"]
+    # The new records bring their own links; the repeated ones none
+    new_ids = {record["record_id"] for record in data["records"][num_rows:]}
+    for table_name in ("record_authors", "record_keywords"):
+        assert data[table_name][:len(single[table_name])] == single[table_name]
+        assert all(link["record_id"] in new_ids for link in data[table_name][len(single[table_name]):])
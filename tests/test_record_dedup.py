@@ -0,0 +1,86 @@
+import pytest
+
+from record_dedup import MinHasher, deduplicate, find_duplicates, merge_records, normalize_doi, shingles
+
+
+def _data(records):
+    """Parsed tables from (record fields, first author last name) pairs; record IDs are r0, r1, ..."""
+    data = {"records": [], "authors": [], "record_authors": [], "record_keywords": []}
+    for i, (fields, last_name) in enumerate(records):
+        data["records"].append({"record_id": f"r{i}", "title": '', **fields})
+        if last_name:
+            data["authors"].append({"author_id": f"a{i}", "first_name": 'J.', "last_name": last_name})
+            data["record_authors"].append({"record_id": f"r{i}", "author_id": f"a{i}", "affiliation_id": None})
+    return data
+
+
+TITLE = "Recycled concrete aggregates: a review of mechanical properties and durability"
+
+
+@pytest.mark.parametrize("doi, expected", [
+    ('10.1016/J.X.2020', '10.1016/j.x.2020'), ('https://doi.org/10.1/ABC', '10.1/abc'),
+    ('http://dx.doi.org/10.1/abc ', '10.1/abc'), ('doi: 10.1/abc', '10.1/abc'), ('', None), (None, None), ('doi:', None),
+])
+def test_normalize_doi(doi, expected):
+    assert normalize_doi(doi) == expected
+
+
+def test_doi_match_merges_and_fills_fields():
+    data = _data([({"title": "Scopus title", "doi": "10.1/ABC", "eid": "2-s2.0-1", "abstract": "A"}, 'Doe'),
+                  ({"title": "WoS title", "doi": "https://doi.org/10.1/abc", "wos_ut": "WOS:1", "year": "2020"}, 'Roe')])
+    assert find_duplicates(data) == {"r1": "r0"}
+    merged = merge_records(data, {"r1": "r0"})
+    assert [(r["record_id"], r["title"], r["eid"], r["wos_ut"], r["publication_year"], r["abstract"])
+            for r in merged["records"]] == [("r0", "Scopus title", "2-s2.0-1", "WOS:1", 2020, "A")]
+    assert [link["record_id"] for link in merged["record_authors"]] == ["r0", "r0"]
+
+
+def test_similar_titles_merge():
+    data = _data([({"title": TITLE, "publication_year": 2020}, 'Doe'),
+                  ({"title": TITLE.upper().replace(':', ' -'), "year": "2021"}, 'Doe'),
+                  ({"title": "An unrelated paper on soil mechanics", "publication_year": 2020}, 'Doe')])
+    assert find_duplicates(data) == {"r1": "r0"}
+
+
+@pytest.mark.parametrize("second, last_name", [
+    ({"title": TITLE, "publication_year": 2023}, 'Doe'),
+    ({"title": TITLE, "publication_year": 2020}, 'Roe'),
+    ({"title": TITLE, "publication_year": 2020, "doi": "10.1/other"}, 'Doe'),
+    ({"title": "Recycled glass aggregates: a study of thermal conductivity", "publication_year": 2020}, 'Doe'),
+])
+def test_conflicting_evidence_keeps_records_apart(second, last_name):
+    data = _data([({"title": TITLE, "publication_year": 2020, "doi": "10.1/abc"}, 'Doe'), (second, last_name)])
+    assert find_duplicates(data) == {}
+
+
+def test_clusters_do_not_chain_across_years():
+    data = _data([({"title": TITLE, "publication_year": year}, 'Doe') for year in (2000, 2001, 2002)])
+    assert find_duplicates(data) == {"r1": "r0"}
+
+
+def test_oversized_buckets_compare_within_first_author_groups():
+    records = [({"title": "Editorial", "publication_year": 2020}, f"author{i}") for i in range(150)]
+    records.append(({"title": "Editorial", "publication_year": 2020}, 'author7'))
+    assert find_duplicates(_data(records), max_bucket_size=100) == {"r150": "r7"}
+    # Groups that stay larger than the limit are skipped
+    same_author = [({"title": "Editorial", "publication_year": 2020}, 'Doe')] * 3
+    assert find_duplicates(_data(same_author), max_bucket_size=2) == {}
+
+
+def test_deduplicate_returns_unified_rows():
+    data = _data([({"title": TITLE, "doi": "10.1/abc"}, 'Doe'), ({"title": TITLE, "doi": "10.1/ABC"}, 'Doe')])
+    data["record_keywords"] = [{"record_id": "r0", "keyword_id": "k"}, {"record_id": "r1", "keyword_id": "k"}]
+    result = deduplicate(data)
+    assert [record["record_id"] for record in result["records"]] == ["r0"]
+    assert result["record_keywords"] == [{"record_id": "r0", "keyword_id": "k"}]
+
+
+def test_minhash_signatures():
+    hasher = MinHasher(num_perm=32, bands=8)
+    signature = hasher.signature(shingles(TITLE))
+    assert signature == MinHasher(num_perm=32, bands=8).signature(shingles(TITLE.lower()))
+    assert len(signature) == 32 and len(hasher.band_keys(signature)) == 8
+    assert MinHasher.similarity(signature, signature) == 1.0
+    assert hasher.signature(shingles('')) is None
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=30, bands=8)
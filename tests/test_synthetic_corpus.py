@@ -0,0 +1,16 @@
+import pytest
+
+from scopus_csv_parser import ScopusParser
+from synthetic_corpus import write_corpus
+from web_of_sci_csv_parser import WebOfScienceParser
+
+
+@pytest.mark.parametrize("fmt, parser_class", [('scopus', ScopusParser), ('wos', WebOfScienceParser)])
+def test_corpus_is_written_from_any_directory(tmp_path, monkeypatch, fmt, parser_class):
+    # The bundled exports are found next to the module, not in the working directory
+    monkeypatch.chdir(tmp_path)
+    first = write_corpus(fmt, 50, str(tmp_path / 'first.csv'), seed=3)
+    second = write_corpus(fmt, 50, str(tmp_path / 'second.csv'), seed=3)
+    with open(first, 'rb') as f, open(second, 'rb') as g:
+        assert f.read() == g.read()
+    assert len(parser_class().parse_file(first)["records"]) == 50
@@ -1,123 +1,33 @@
 import csv
-import uuid
-import re
-import os
 from pprint import pprint
+import exporters
+from field_tokenizers import id_suffix, iter_address_blocks
+from parser_core import BaseParser, register_format, stable_id
 
 # ==============================================================================
-#  1. INTEGRATED USER-PROVIDED AFFILIATION PARSER
+#  1. WEB OF SCIENCE DATA PARSER
 # ==============================================================================
-class AffiliationParser:
-    """
-    This class is a direct implementation of the user's affiliation parsing logic.
-    """
-    def __init__(self):
-        self.countries = self._get_comprehensive_country_list()
-        self.business_suffixes = {'ltd', 'inc', 'co', 'llc', 'corp', 'gmbh', 'ag', 'bv', 'srl', 'spa', 'pty'}
-        country_pattern_string = r',\s*(' + '|'.join(re.escape(c) for c in self.countries) + r')\b *$'
-        self.country_regex = re.compile(country_pattern_string, re.IGNORECASE)
-        print("✅ AffiliationParser initialized with user-provided logic.")
-
-    def _get_comprehensive_country_list(self):
-        countries = [
-            'Afghanistan', 'Albania', 'Algeria', 'Andorra', 'Angola', 'Antigua and Barbuda', 'Argentina', 'Armenia',
-            'Australia', 'Austria', 'Azerbaijan', 'Bahamas', 'Bahrain', 'Bangladesh', 'Barbados', 'Belarus', 'Belgium',
-            'Belize', 'Benin', 'Bermuda', 'Bhutan', 'Bolivia', 'Bosnia and Herzegovina', 'Botswana', 'Brazil', 'Brunei', 'Brunei Darussalam',
-            'Bulgaria', 'Burkina Faso', 'Burundi', 'Cabo Verde', 'Cambodia', 'Cameroon', 'Canada', 'Central African Republic',
-            'Chad', 'Chile', 'China', 'Colombia', 'Comoros', 'Congo, Democratic Republic of the',
-            'Congo, Republic of the', 'Costa Rica', 'Cote d\'Ivoire', 'Croatia', 'Cuba', 'Cyprus', 'Czech Republic', 'Czechia',
-            'Denmark', 'Djibouti', 'Dominica', 'Dominican Republic', 'Ecuador', 'Egypt', 'El Salvador',
-            'Equatorial Guinea', 'Eritrea', 'Estonia', 'Eswatini', 'Ethiopia', 'Fiji', 'Finland', 'France', 'French Guiana', 'Gabon',
-            'Gambia', 'Georgia', 'Germany', 'Ghana', 'Greece', 'Grenada', 'Guam', 'Guatemala', 'Guinea', 'Guinea-Bissau',
-            'Guyana', 'Haiti', 'Honduras', 'Hong Kong', 'Hungary', 'Iceland', 'India', 'Indonesia', 'Iran', 'Iraq', 'Ireland',
-            'Israel', 'Italy', 'Jamaica', 'Japan', 'Jordan', 'Kazakhstan', 'Kenya', 'Kiribati', 'Kosovo', 'Kuwait',
-            'Kyrgyzstan', 'Laos', 'Latvia', 'Lebanon', 'Lesotho', 'Liberia', 'Libya', 'Liechtenstein', 'Lithuania',
-            'Luxembourg', 'Macao', 'Madagascar', 'Malawi', 'Malaysia', 'Maldives', 'Mali', 'Malta', 'Marshall Islands',
-            'Mauritania', 'Mauritius', 'Mexico', 'Micronesia', 'Moldova', 'Monaco', 'Mongolia', 'Montenegro',
-            'Morocco', 'Mozambique', 'Myanmar', 'Burma', 'Namibia', 'Nauru', 'Nepal', 'Netherlands', 'New Zealand',
-            'Nicaragua', 'Niger', 'Nigeria', 'North Korea', 'North Macedonia', 'Norway', 'Oman', 'Pakistan', 'Palau',
-            'Palestine', 'State of Palestine', 'Panama', 'Papua New Guinea', 'Paraguay', 'Peru', 'Philippines', 'Poland', 'Portugal',
-            'Puerto Rico', 'Qatar', 'Romania', 'Russia', 'Russian Federation', 'Rwanda', 'Saint Kitts and Nevis', 'Saint Lucia',
-            'Saint Vincent and the Grenadines', 'Samoa', 'San Marino', 'Sao Tome and Principe', 'Saudi Arabia',
-            'Senegal', 'Serbia', 'Seychelles', 'Sierra Leone', 'Singapore', 'Slovakia', 'Slovenia', 'Solomon Islands',
-            'Somalia', 'South Africa', 'South Korea', 'South Sudan', 'Spain', 'Sri Lanka', 'Sudan', 'Suriname',
-            'Sweden', 'Switzerland', 'Syria', 'Syrian Arab Republic', 'Taiwan', 'Tajikistan', 'Tanzania', 'Thailand', 'Timor-Leste',
-            'Togo', 'Tonga', 'Trinidad and Tobago', 'Tunisia', 'Turkey', 'Turkiye', 'Turkmenistan', 'Tuvalu', 'Uganda',
-            'Ukraine', 'United Arab Emirates', 'U Arab Emirates', 'UAE', 'United Kingdom', 'UK', 'United States of America', 'United States', 'USA',
-            'Uruguay', 'Uzbekistan', 'Vanuatu', 'Vatican City', 'Venezuela', 'Viet Nam', 'Vietnam', 'Yemen', 'Zambia', 'Zimbabwe',
-            'Peoples R China', 'England', 'Scotland', 'Wales', 'Northern Ireland', 'North Ireland'
-        ]
-        countries.sort(key=len, reverse=True)
-        return countries
-
-    def parse(self, affiliation_text):
-        country, city, institution = '', '', ''
-        work_string = affiliation_text.strip()
-        
-        # First, check for country at the end
-        country_match = self.country_regex.search(work_string)
-        if country_match:
-            country = country_match.group(1).strip()
-            # Normalize country names
-            if country.lower() == 'turkiye':
-                country = 'Turkey'
-            elif country.lower() == 'north ireland':
-                country = 'Northern Ireland'
-            elif country.lower() in ['u arab emirates', 'uae']:
-                country = 'United Arab Emirates'
-            work_string = work_string[:country_match.start()].strip()
-        
-        parts = [part.strip() for part in work_string.split(',') if part.strip()]
-        
-        # Handle US state code with zip (e.g., "GA 30332", "TX 78712")
-        if len(parts) > 0:
-            last_part = parts[-1]
-            # Check if last part matches pattern: STATE_CODE ZIP (e.g., "GA 30332", "TX USA")
-            us_pattern = re.match(r'^([A-Z]{2})\s+(?:\d{5})?.*$', last_part)
-            if us_pattern and not country:
-                # This is a US state code, extract it as city and set country to USA
-                city = us_pattern.group(1)  # Use state code as city identifier
-                country = 'United States'
-                parts.pop(-1)
-                institution = ', '.join(parts) if parts else 'Unknown'
-            else:
-                # Normal processing
-                if len(parts) > 1:
-                    potential_city = parts[-1]
-                    cleaned_suffix_check = re.sub(r'[^a-zA-Z]', '', potential_city).lower()
-                    if cleaned_suffix_check in self.business_suffixes:
-                        institution = ', '.join(parts)
-                        city = ''
-                    else:
-                        city = parts.pop(-1)
-                        institution = ', '.join(parts)
-                elif len(parts) == 1:
-                    institution = parts[0]
-                else:
-                    institution = work_string
-        
-        return {"institution_name": institution or "Unknown", "city": city or "Unknown", "country": country or "Unknown"}
-
-
-# ==============================================================================
-#  2. WEB OF SCIENCE DATA PARSER
-# ==============================================================================
-class WebOfScienceParser:
+@register_format
+class WebOfScienceParser(BaseParser):
     """
     Reads a Web of Science CSV, validates its columns, and transforms the data
     into a clean, structured format ready for ingestion.
     """
+    FORMAT_NAME = 'wos'
     REQUIRED_COLUMNS = [
         'Article Title', 'Author Full Names', 'Addresses', 'Author Keywords',
         'Source Title', 'Publication Year', 'UT (Unique WOS ID)'
     ]
+    OPTIONAL_COLUMNS = ['Researcher Ids', 'ORCIDs', 'ISSN', 'Publication Type', 'DOI']
+    RECORD_KEY_COLUMN = 'UT (Unique WOS ID)'
+    DEFAULT_OUTPUT_DIR = 'output_csvs_wos'
+    CREATE_EMPTY_KEYS = True
+    # Indexed along with 'Author Keywords' when the keyword normalizer asks for it
+    KEYWORDS_PLUS_COLUMN = 'Keywords Plus'
     
-    def __init__(self):
-        self.affiliation_parser = AffiliationParser()
-        self._venues = {}
-        self._authors = {}
-        self._keywords = {}
-        self._affiliations = {}
+    def __init__(self, affiliation_parser=None, entities=None, metrics=None, skip_long_text=False, keyword_normalizer=None):
+        super().__init__(affiliation_parser, entities, metrics, skip_long_text, keyword_normalizer)
+        self.keywords_plus = bool(getattr(keyword_normalizer, 'keywords_plus', False))
         # Document type mapping
         self.document_type_mapping = {
             'J': 'Journal',
@@ -127,161 +37,137 @@ class WebOfScienceParser:
             'C': 'Conference'
         }
 
-    def _validate_columns(self, fieldnames):
-        """Checks if all required columns are present in the CSV header."""
-        missing_cols = [col for col in self.REQUIRED_COLUMNS if col not in fieldnames]
-        if missing_cols:
-            raise ValueError(f"CSV file is missing required columns: {', '.join(missing_cols)}")
-        print("✅ Column validation passed.")
-
-    def _get_or_create_entity(self, store, key, factory):
-        """Generic helper to find or create an entity."""
-        if key not in store:
-            store[key] = factory()
-        return store[key]
-
-    def parse_file(self, filepath):
-        """Main method to parse the Web of Science CSV file."""
-        print(f"🚀 Starting parsing for: {filepath}")
+    def used_columns(self):
+        columns = super().used_columns()
+        if self.keywords_plus:
+            columns.append(self.KEYWORDS_PLUS_COLUMN)
+        return columns
+
+    def _parse_row(self, row):
+        """Transforms one CSV row into a list of (table_name, row) pairs."""
+        parsed_rows = []
+        if self._is_already_ingested(row):
+            return parsed_rows
+
+        # --- Create Author ID Mapping for the current row ---
+        # WoS provides author names and IDs in the same order in separate columns.
+        author_names = [name.strip() for name in row.get('Author Full Names', '').split(';')]
+        researcher_ids = [rid.strip() for rid in row.get('Researcher Ids', '').split(';')]
+        orcids = [oid.strip() for oid in row.get('ORCIDs', '').split(';')]
         
-        processed_data = {
-            "records": [], "authors": [], "venues": [], "keywords": [],
-            "affiliations": [], "record_authors": [], "record_keywords": []
-        }
-
-        with open(filepath, mode='r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            self._validate_columns(reader.fieldnames)
-            
-            for row in reader:
-                # --- Create Author ID Mapping for the current row ---
-                # WoS provides author names and IDs in the same order in separate columns.
-                author_names = [name.strip() for name in row.get('Author Full Names', '').split(';')]
-                researcher_ids = [rid.strip() for rid in row.get('Researcher Ids', '').split(';')]
-                orcids = [oid.strip() for oid in row.get('ORCIDs', '').split(';')]
-                
-                author_details_map = {}
-                for i, name in enumerate(author_names):
-                    # Extract the ID part from "Name, First/ID" format for both Researcher ID and ORCID
-                    rid_match = re.search(r'/(.*)$', researcher_ids[i]) if i < len(researcher_ids) else None
-                    orcid_match = re.search(r'/(.*)$', orcids[i]) if i < len(orcids) and orcids[i] else None
-                    author_details_map[name] = {
-                        "researcher_id": rid_match.group(1) if rid_match else None,
-                        "orcid": orcid_match.group(1) if orcid_match else None
-                    }
-
-                # --- Process Venue ---
-                issn = row.get('ISSN', '').strip()
-                venue_key = issn if issn else row.get('Source Title', 'Unknown').strip().lower()
-                venue = self._get_or_create_entity(self._venues, venue_key, lambda: {
-                    "venue_id": str(uuid.uuid4()),
-                    "venue_name": row.get('Source Title', '').strip(), "issn": issn
-                })
-
-                # --- Process Record ---
-                record_id = str(uuid.uuid4())
-                
-                # Map publication type code to full name
-                pub_type_code = row.get('Publication Type', '').strip()
-                document_type = self.document_type_mapping.get(pub_type_code, pub_type_code)
-                
-                processed_data["records"].append({
-                    "record_id": record_id, 
-                    "title": row.get('Article Title', '').strip(),
-                    "document_type": document_type,
-                    "year": row.get('Publication Year'), 
-                    "doi": row.get('DOI'),
-                    "wos_ut": row.get('UT (Unique WOS ID)'), 
-                    "venue_id": venue["venue_id"]
+        author_details_map = {}
+        for i, name in enumerate(author_names):
+            # Extract the ID part from "Name, First/ID" format for both Researcher ID and ORCID
+            author_details_map[name] = {
+                "researcher_id": id_suffix(researcher_ids[i]) if i < len(researcher_ids) else None,
+                "orcid": id_suffix(orcids[i]) if i < len(orcids) else None
+            }
+
+        # --- Process Venue ---
+        issn = row.get('ISSN', '').strip()
+        venue_key = issn if issn else row.get('Source Title', 'Unknown').strip().lower()
+        venue = self._get_or_create_entity("venues", venue_key, lambda: {
+            "venue_id": stable_id("venues", venue_key),
+            "venue_name": row.get('Source Title', '').strip(), "issn": issn
+        })
+
+        # --- Process Record ---
+        record_id = self._record_id(row)
+        
+        # Map publication type code to full name
+        pub_type_code = row.get('Publication Type', '').strip()
+        document_type = self.document_type_mapping.get(pub_type_code, pub_type_code)
+        
+        parsed_rows.append(("records", {
+            "record_id": record_id, 
+            "title": row.get('Article Title', '').strip(),
+            "document_type": document_type,
+            "year": row.get('Publication Year'), 
+            "doi": row.get('DOI'),
+            "wos_ut": row.get('UT (Unique WOS ID)'), 
+            "venue_id": venue["venue_id"]
+        }))
+        
+        # --- Process and Link Keywords (Author Keywords, plus Keywords Plus when enabled) ---
+        keywords_str = row.get('Author Keywords', '')
+        if self.keywords_plus and row.get(self.KEYWORDS_PLUS_COLUMN):
+            keywords_str = f"{keywords_str};{row[self.KEYWORDS_PLUS_COLUMN]}"
+        if keywords_str:
+            parsed_rows.extend(self._keyword_links(record_id, keywords_str))
+
+        # --- Process and Link Authors & Affiliations from 'Addresses' column ---
+        addresses_str = row.get('Addresses', '')
+        # "[Author list] Affiliation" blocks, with the affiliation text already cleaned
+        if self.metrics.enabled:
+            with self.metrics.timer('wos.addresses_split'):
+                address_blocks = list(iter_address_blocks(addresses_str))
+        else:
+            address_blocks = iter_address_blocks(addresses_str)
+        for author_list_str, affil_text in address_blocks:
+            # Get Affiliation
+            normalized_affil = affil_text.lower()
+            affiliation = self._get_or_create_entity("affiliations", normalized_affil, lambda: {
+                "affiliation_id": stable_id("affiliations", normalized_affil),
+                **self.affiliation_parser.parse(affil_text)
+            })
+
+            # Link all authors in the list to this affiliation
+            for author_name in author_list_str.split('; '):
+                details = author_details_map.get(author_name)
+                if not details: continue
+
+                # Parse author name into first and last name (format: "Last Name, First Name")
+                name_parts = author_name.split(',', 1)
+                last_name = name_parts[0].strip() if len(name_parts) > 0 else author_name
+                first_name = name_parts[1].strip() if len(name_parts) > 1 else ""
+
+                # Use Researcher ID as the primary key for deduplication
+                author_key = details["researcher_id"] or details["orcid"] or author_name.lower()
+                author = self._get_or_create_entity("authors", author_key, lambda: {
+                    "author_id": stable_id("authors", author_key),
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "wos_researcher_id": details["researcher_id"], 
+                    "orcid": details["orcid"]
                 })
-                
-                # --- Process and Link Keywords (Using Author Keywords only, per prior request) ---
-                keywords_str = row.get('Author Keywords', '')
-                if keywords_str:
-                    for kw_text in keywords_str.split(';'):
-                        normalized_kw = kw_text.strip().lower()
-                        if normalized_kw:
-                            keyword = self._get_or_create_entity(self._keywords, normalized_kw, lambda: {
-                                "keyword_id": str(uuid.uuid4()), "keyword": normalized_kw
-                            })
-                            processed_data["record_keywords"].append({"record_id": record_id, "keyword_id": keyword["keyword_id"]})
-
-                # --- Process and Link Authors & Affiliations from 'Addresses' column ---
-                addresses_str = row.get('Addresses', '')
-                # Regex to find "[Author list] Affiliation" patterns
-                address_matches = re.findall(r'\[(.*?)\]\s*(.*?)(?=\s*\[|$)', addresses_str)
-                for match in address_matches:
-                    author_list_str, affil_text = match
-                    
-                    # Clean affiliation text: strip whitespace and trailing semicolons
-                    affil_text = affil_text.strip().rstrip(';').strip()
-                    
-                    # Get Affiliation
-                    normalized_affil = affil_text.lower()
-                    affiliation = self._get_or_create_entity(self._affiliations, normalized_affil, lambda: {
-                        "affiliation_id": str(uuid.uuid4()),
-                        **self.affiliation_parser.parse(affil_text)
-                    })
-
-                    # Link all authors in the list to this affiliation
-                    for author_name in author_list_str.split('; '):
-                        details = author_details_map.get(author_name)
-                        if not details: continue
+                parsed_rows.append(("record_authors", {
+                    "record_id": record_id, "author_id": author["author_id"],
+                    "affiliation_id": affiliation["affiliation_id"]
+                }))
+        return parsed_rows
 
-                        # Parse author name into first and last name (format: "Last Name, First Name")
-                        name_parts = author_name.split(',', 1)
-                        last_name = name_parts[0].strip() if len(name_parts) > 0 else author_name
-                        first_name = name_parts[1].strip() if len(name_parts) > 1 else ""
 
-                        # Use Researcher ID as the primary key for deduplication
-                        author_key = details["researcher_id"] or details["orcid"] or author_name.lower()
-                        author = self._get_or_create_entity(self._authors, author_key, lambda: {
-                            "author_id": str(uuid.uuid4()), 
-                            "first_name": first_name,
-                            "last_name": last_name,
-                            "wos_researcher_id": details["researcher_id"], 
-                            "orcid": details["orcid"]
-                        })
-                        processed_data["record_authors"].append({
-                            "record_id": record_id, "author_id": author["author_id"],
-                            "affiliation_id": affiliation["affiliation_id"]
-                        })
-
-        # Finalize the data by converting helper dicts to lists
-        processed_data['authors'] = list(self._authors.values())
-        processed_data['venues'] = list(self._venues.values())
-        processed_data['keywords'] = list(self._keywords.values())
-        processed_data['affiliations'] = list(self._affiliations.values())
-        print("✅ Parsing complete!")
-        return processed_data
+@register_format
+class WebOfScienceTabParser(WebOfScienceParser):
+    """
+    Same parser for the tab-delimited ("Tab delimited file") WoS export, which
+    uses two-letter field tags as its header and does not quote fields.
+    """
+    FORMAT_NAME = 'wos_tab'
+    CSV_OPTIONS = {'delimiter': '\t', 'quoting': csv.QUOTE_NONE}
+    COLUMN_MAP = {
+        'PT': 'Publication Type', 'AU': 'Authors', 'AF': 'Author Full Names', 'TI': 'Article Title',
+        'SO': 'Source Title', 'DT': 'Document Type', 'DE': 'Author Keywords', 'ID': 'Keywords Plus',
+        'AB': 'Abstract', 'C1': 'Addresses', 'C3': 'Affiliations', 'RI': 'Researcher Ids', 'OI': 'ORCIDs',
+        'CR': 'Cited References', 'NR': 'Cited Reference Count', 'TC': 'Times Cited, WoS Core',
+        'Z9': 'Times Cited, All Databases', 'SN': 'ISSN', 'EI': 'eISSN', 'J9': 'Journal Abbreviation',
+        'PD': 'Publication Date', 'PY': 'Publication Year', 'VL': 'Volume', 'IS': 'Issue',
+        'BP': 'Start Page', 'EP': 'End Page', 'AR': 'Article Number', 'DI': 'DOI', 'UT': 'UT (Unique WOS ID)',
+    }
 
 
 # ==============================================================================
-#  3. EXPORT DATA TO CSV FILES
+#  2. EXPORT DATA TO CSV FILES
 # ==============================================================================
-def export_data_to_csv(data, output_dir='output_csvs_wos'):
-    print(f"\n🚀 Exporting data to CSV files in '{output_dir}/' directory...")
-    if not os.path.exists(output_dir): os.makedirs(output_dir)
-    for table_name, table_data in data.items():
-        if not table_data:
-            print(f"  -> Skipping '{table_name}.csv' (no data).")
-            continue
-        file_path = os.path.join(output_dir, f"{table_name}.csv")
-        try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=table_data[0].keys())
-                writer.writeheader()
-                writer.writerows(table_data)
-            print(f"  -> Successfully wrote {len(table_data)} rows to '{file_path}'")
-        except IOError as e: print(f"  -> ERROR writing to '{file_path}': {e}")
-    print("\n✅ CSV export complete!")
+def export_data_to_csv(data, output_dir=WebOfScienceParser.DEFAULT_OUTPUT_DIR):
+    return exporters.export_data_to_csv(data, output_dir)
 
 
 # ==============================================================================
-#  4. MAIN EXECUTION BLOCK
+#  3. MAIN EXECUTION BLOCK
 # ==============================================================================
 if __name__ == "__main__":
-    wos_csv_path = 'fwos_BIM_random_1000.csv'
+    wos_csv_path = 'wos.csv'
     
     try:
         parser = WebOfScienceParser()